@@ -0,0 +1,260 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, When
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views import View
+
+from core.cache import cached_response, cached_value, tags_etag
+
+from .cache import (
+    FEED_TAG, NAMES_TAG, author_tag, category_tag, post_page_tags)
+from .models import Category, Comment, Post
+from .paginators import InvalidCursor, decode_cursor, encode_key
+
+User = get_user_model()
+
+# Поле ответа — путь в values(); поля по умолчанию — все, кроме
+# перечисленных в OPTIONAL.
+POST_FIELDS = {
+    'id': 'pk',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'public_location',
+    'image': 'image',
+    'comment_count': 'comment_count',
+    'is_published': 'is_published',
+}
+COMMENT_FIELDS = {
+    'id': 'pk',
+    'text': 'text',
+    'created_at': 'created_at',
+    'author': 'author__username',
+}
+OPTIONAL = {'is_published'}
+
+
+class ApiError(Exception):
+    """Некорректные параметры запроса к API"""
+
+
+class ApiListView(View):
+    """
+    Список объектов в JSON с курсорной пагинацией.
+
+    Строки выбираются через values() без создания объектов моделей
+    и листаются курсором ?after= по ключу (дата, id). ?fields=
+    ограничивает набор полей ответа. Ответы для всех посетителей
+    кешируются по меткам страниц сайта, ETag строится по версиям
+    меток, и совпавший If-None-Match получает 304 без запросов к базе.
+    """
+
+    fields = None
+    key_field = None
+    descending = True
+
+    def get_cache_tags(self):
+        """Метки, по которым сбрасывается кеш ответа"""
+
+        raise NotImplementedError
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def is_private(self):
+        """Ответ зависит от пользователя (например, автор видит скрытое)"""
+
+        return False
+
+    def requested_fields(self):
+        fields = self.request.GET.get('fields')
+        if not fields:
+            return [name for name in self.fields if name not in OPTIONAL]
+        names = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise ApiError(
+                f'Неизвестные поля: {", ".join(sorted(unknown))}')
+        return names
+
+    def page_size(self):
+        default = getattr(settings, 'API_PAGE_SIZE', 20)
+        try:
+            size = int(self.request.GET.get('limit', default))
+        except ValueError:
+            raise ApiError('limit должен быть числом')
+        return max(1, min(size, getattr(settings, 'API_MAX_PAGE_SIZE', 100)))
+
+    def rows(self, names, limit):
+        """Строки страницы после курсора ?after= и признак продолжения"""
+
+        queryset = self.get_queryset()
+        after = self.request.GET.get('after')
+        if after:
+            try:
+                moment, pk = decode_cursor(after)
+            except InvalidCursor:
+                raise ApiError('Некорректный курсор страницы')
+            if self.descending:
+                queryset = queryset.filter(
+                    **{f'{self.key_field}__lte': moment}).exclude(
+                    **{self.key_field: moment, 'pk__gte': pk})
+            else:
+                queryset = queryset.filter(
+                    **{f'{self.key_field}__gte': moment}).exclude(
+                    **{self.key_field: moment, 'pk__lte': pk})
+        order = '-' if self.descending else ''
+        paths = dict.fromkeys(
+            ['pk', self.key_field, *(self.fields[name] for name in names)])
+        rows = list(
+            queryset.order_by(f'{order}{self.key_field}', f'{order}pk')
+            .values(*paths)[:limit + 1])
+        return rows[:limit], len(rows) > limit
+
+    def serialize(self, row, names):
+        item = {name: row[self.fields[name]] for name in names}
+        if 'image' in item:
+            item['image'] = (
+                Post._meta.get_field('image').storage.url(item['image'])
+                if item['image'] else None)
+        return item
+
+    def build_response(self):
+        try:
+            names = self.requested_fields()
+            rows, has_next = self.rows(names, self.page_size())
+        except ApiError as error:
+            return JsonResponse({'detail': str(error)}, status=400)
+        next_url = None
+        if has_next:
+            query = self.request.GET.copy()
+            query['after'] = encode_key(
+                rows[-1][self.key_field], rows[-1]['pk'])
+            next_url = self.request.build_absolute_uri(
+                f'{self.request.path}?{query.urlencode()}')
+        return JsonResponse({
+            'results': [self.serialize(row, names) for row in rows],
+            'next': next_url,
+        }, json_dumps_params={'ensure_ascii': False})
+
+    def get(self, request, *args, **kwargs):
+        """Отдаёт страницу списка или 304, если она не изменилась"""
+
+        if self.is_private():
+            response = self.build_response()
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        etag = tags_etag(request, self.get_cache_tags())
+        response = None
+        if request.META.get('HTTP_IF_NONE_MATCH'):
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = cached_response(
+                request, self.get_cache_tags(), self.build_response)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(
+                response, public=True,
+                max_age=getattr(settings, 'API_MAX_AGE', 60))
+        return response
+
+
+class PostListMixin:
+    """Поля и ключ пагинации списков постов"""
+
+    fields = POST_FIELDS
+    key_field = 'pub_date'
+
+    def posts(self, queryset):
+        """Место выводится, только если оно опубликовано"""
+
+        return queryset.annotate(public_location=Case(
+            When(location__is_published=True, then=F('location__name'))))
+
+
+class PostListApiView(PostListMixin, ApiListView):
+    """Посты ленты — как на главной странице"""
+
+    def get_cache_tags(self):
+        return [FEED_TAG, NAMES_TAG]
+
+    def get_queryset(self):
+        return self.posts(Post.objects.visible())
+
+
+class CategoryPostsApiView(PostListMixin, ApiListView):
+    """Посты опубликованной категории"""
+
+    def get_cache_tags(self):
+        return [category_tag(self.kwargs['category_slug']), NAMES_TAG]
+
+    def get_queryset(self):
+        category = get_object_or_404(
+            Category, slug=self.kwargs['category_slug'], is_published=True)
+        return self.posts(category.posts.visible())
+
+
+class UserPostsApiView(PostListMixin, ApiListView):
+    """Посты автора; сам автор видит и скрытые"""
+
+    def get_cache_tags(self):
+        return [author_tag(self.kwargs['username']), NAMES_TAG]
+
+    def is_private(self):
+        return self.request.user.username == self.kwargs['username']
+
+    def get_queryset(self):
+        author = get_object_or_404(User, username=self.kwargs['username'])
+        posts = author.posts.all()
+        if not self.is_private():
+            posts = posts.visible()
+        return self.posts(posts)
+
+
+class CommentListApiView(ApiListView):
+    """Комментарии поста, доступного как на странице поста"""
+
+    fields = COMMENT_FIELDS
+    key_field = 'created_at'
+    descending = False
+
+    def get_cache_tags(self):
+        return post_page_tags(self.kwargs['id'])
+
+    def post_access(self):
+        """
+        Виден ли пост всем и id его автора; None, если поста нет.
+
+        Кешируется по меткам страницы: повторная проверка ETag обходится
+        без запросов к базе.
+        """
+
+        pk = self.kwargs['id']
+
+        def get_access():
+            post = Post.objects.filter(pk=pk).values('author_id').first()
+            if post is None:
+                return None
+            public = Post.objects.visible().filter(pk=pk).exists()
+            return public, post['author_id']
+
+        return cached_value(
+            f'post-access:{pk}', self.get_cache_tags(), get_access)
+
+    def is_private(self):
+        if not hasattr(self, '_private'):
+            access = self.post_access()
+            if access is None:
+                raise Http404('Пост не найден')
+            public, author_id = access
+            if not public and author_id != self.request.user.id:
+                raise Http404('Пост не найден')
+            self._private = not public
+        return self._private
+
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['id'])
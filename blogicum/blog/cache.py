@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+
+from core.cache import (
+    SITE_TAG, cached_value, invalidate_tags, invalidate_tags_on_commit)
+
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+FEED_TAG = 'feed'
+# Списки постов: в них выводятся названия категорий и мест, имена авторов.
+NAMES_TAG = 'names'
+
+
+def category_tag(slug):
+    return f'category:{slug}'
+
+
+def author_tag(username):
+    return f'author:{username}'
+
+
+def post_tag(pk):
+    return f'post:{pk}'
+
+
+def post_cache_tags(post_ids):
+    """Метки всех страниц, на которых выводятся указанные посты"""
+
+    tags = set()
+    rows = Post.objects.filter(pk__in=post_ids).values_list(
+        'pk', 'category__slug', 'author__username')
+    for pk, slug, username in rows:
+        tags.update((FEED_TAG, post_tag(pk), author_tag(username)))
+        if slug:
+            tags.add(category_tag(slug))
+    return tags
+
+
+def object_tag(model, pk):
+    """Метка страниц, на которых выводится объект model с этим pk"""
+
+    return f'{model._meta.model_name}#{pk}'
+
+
+def post_page_tags(pk):
+    """
+    Метки страницы поста: сам пост, его категория, место, автор
+    и авторы комментариев.
+
+    Связи кешируются по метке поста: она сбрасывается при изменении
+    поста и его комментариев, и страница из кеша отдаётся без запросов.
+    """
+
+    def get_related():
+        post = Post.objects.filter(pk=pk).values(
+            'category_id', 'location_id', 'author_id').first()
+        if post is None:
+            return []
+        commenters = Comment.objects.filter(post_id=pk).values_list(
+            'author_id', flat=True).distinct()
+        related = [
+            (Category, post['category_id']),
+            (Location, post['location_id']),
+            *((User, author_id) for author_id in {
+                post['author_id'], *commenters}),
+        ]
+        return [
+            object_tag(model, related_pk) for model, related_pk in related
+            if related_pk is not None]
+
+    return [post_tag(pk), *cached_value(
+        f'post-tags:{pk}', [post_tag(pk)], get_related)]
+
+
+def related_cache_tags(obj, listed=True):
+    """
+    Метки страниц, где выводится категория, место или пользователь.
+
+    listed — изменились поля, которые видны в списках постов и на
+    страницах постов; иначе сбрасывается только страница самого объекта.
+    """
+
+    tags = set()
+    if isinstance(obj, Category):
+        tags.add(category_tag(obj.slug))
+    elif isinstance(obj, User):
+        tags.add(author_tag(obj.username))
+    if listed:
+        tags.update((NAMES_TAG, object_tag(type(obj), obj.pk)))
+    return tags
+
+
+def invalidate_posts(post_ids):
+    """Сбрасывает кеш страниц с указанными постами после фиксации"""
+
+    invalidate_tags_on_commit(*post_cache_tags(post_ids))
+
+
+def invalidate_site():
+    """Сбрасывает кеш всех страниц"""
+
+    invalidate_tags(SITE_TAG)
@@ -0,0 +1,49 @@
+import csv
+
+from django.conf import settings
+from django.db import transaction
+
+POST_EXPORT_COLUMNS = (
+    ('pk', 'id'),
+    ('title', 'Заголовок'),
+    ('pub_date', 'Дата публикации'),
+    ('author__username', 'Автор'),
+    ('category__title', 'Категория'),
+    ('location__name', 'Местоположение'),
+    ('is_published', 'Опубликовано'),
+    ('comment_count', 'Комментариев'),
+)
+
+
+class _Echo:
+    """Файлоподобный объект, который возвращает записанную строку"""
+
+    def write(self, value):
+        return value
+
+
+def iter_post_rows(queryset, chunk_size=None):
+    """
+    Строки выгрузки публикаций: заголовок, затем по строке на пост.
+
+    Записи читаются через iterator(chunk_size): на PostgreSQL это
+    курсор на сервере, и в памяти одновременно не больше chunk_size
+    строк. Чтение идёт в транзакции — иначе за pgbouncer в режиме
+    transaction курсор не переживёт переключения соединения.
+    """
+
+    chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    fields = [field for field, _ in POST_EXPORT_COLUMNS]
+    yield [title for _, title in POST_EXPORT_COLUMNS]
+    with transaction.atomic(using=queryset.db):
+        yield from (
+            queryset.order_by('pk').values_list(*fields)
+            .iterator(chunk_size=chunk_size))
+
+
+def stream_csv(rows):
+    """Превращает строки в поток строк CSV без буфера на весь файл"""
+
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(row)
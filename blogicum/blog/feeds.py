@@ -0,0 +1,169 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe
+from django.utils.text import Truncator
+
+from core.cache import cached_response, tags_etag
+
+from .cache import FEED_TAG, NAMES_TAG, author_tag, category_tag
+from .models import Category, Post
+
+User = get_user_model()
+
+
+class CachedFeedMixin:
+    """
+    Кеширует XML ленты и отвечает 304 на условные запросы.
+
+    ETag строится из версий меток кеша ленты, поэтому совпадение
+    If-None-Match проверяется без обращения к базе. Last-Modified —
+    дата самого нового поста ленты — берётся из сохранённого ответа.
+    """
+
+    def get_cache_tags(self, **kwargs):
+        """Метки, по которым сбрасывается кеш ленты"""
+
+        raise NotImplementedError
+
+    def __call__(self, request, *args, **kwargs):
+        tags = self.get_cache_tags(**kwargs)
+        etag = tags_etag(request, tags)
+        response = None
+        if request.META.get('HTTP_IF_NONE_MATCH'):
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = cached_response(
+                request, tags,
+                lambda: super(CachedFeedMixin, self).__call__(
+                    request, *args, **kwargs))
+            response = get_conditional_response(
+                request, etag=etag,
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified', '')),
+                response=response)
+        response['ETag'] = etag
+        patch_cache_control(
+            response, public=True,
+            max_age=getattr(settings, 'FEED_MAX_AGE', 300))
+        return response
+
+
+class PostFeed(CachedFeedMixin, Feed):
+    """Общая часть лент публикаций"""
+
+    def posts(self, queryset):
+        """Последние видимые посты для ленты"""
+
+        return (
+            queryset.visible()
+            .select_related('author', 'category')
+            .only('title', 'text', 'pub_date',
+                  'author__username', 'category__title')
+            .order_by('-pub_date', '-id')
+            [:getattr(settings, 'FEED_ITEMS', 20)])
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(
+            getattr(settings, 'FEED_DESCRIPTION_WORDS', 50))
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return [item.category.title]
+
+
+class AtomFeedMixin:
+    """Та же лента в формате Atom"""
+
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsFeed(PostFeed):
+    """Лента всех публикаций сайта"""
+
+    title = 'Блогикум: новые публикации'
+    description = 'Последние публикации всех авторов'
+
+    def get_cache_tags(self, **kwargs):
+        return [FEED_TAG, NAMES_TAG]
+
+    def link(self):
+        return reverse('blog:index')
+
+    def items(self):
+        return self.posts(Post.objects.all())
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryFeed(PostFeed):
+    """Лента публикаций опубликованной категории"""
+
+    def get_cache_tags(self, category_slug):
+        return [category_tag(category_slug), NAMES_TAG]
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True)
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=[category.slug])
+
+    def items(self, category):
+        return self.posts(category.posts.all())
+
+
+class CategoryAtomFeed(AtomFeedMixin, CategoryFeed):
+    pass
+
+
+class AuthorFeed(PostFeed):
+    """Лента публикаций автора"""
+
+    def get_cache_tags(self, username):
+        return [author_tag(username), NAMES_TAG]
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Блогикум: публикации @{author.username}'
+
+    def description(self, author):
+        return f'Последние публикации автора @{author.username}'
+
+    def link(self, author):
+        return reverse('blog:profile', args=[author.username])
+
+    def items(self, author):
+        return self.posts(author.posts.all())
+
+
+class AuthorAtomFeed(AtomFeedMixin, AuthorFeed):
+    pass
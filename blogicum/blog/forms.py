@@ -1,10 +1,12 @@
 from django import forms
 from .models import Post, Comment
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserChangeForm
 
+from core.mail import enqueue_mail
+from core.tasks import enqueue
+
 
 User = get_user_model()
 
@@ -45,15 +47,16 @@ class PostForm(forms.ModelForm):
         super().clean()
         title = self.cleaned_data['title']
         if f'{title}' in BEATLES:
-            # Отправляем письмо, если кто-то представляется
-            # именем одного из участников Beatles.
-            send_mail(
+            # Ставим в очередь письмо, если кто-то представляется
+            # именем одного из участников Beatles; отправит его
+            # фоновая задача, не задерживая запрос.
+            enqueue_mail(
                 subject='Another Beatles member',
                 message=f'{title} пытался опубликовать запись!',
                 from_email='Blog_form@acme.not',
                 recipient_list=['admin@acme.not'],
-                fail_silently=True,
             )
+            enqueue('core.deliver_outbox')
             raise ValidationError(
                 'Мы тоже любим Битлз, но введите, пожалуйста, настоящее имя!'
             )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.tasks import build_image_variants
+from core.tasks import enqueue
+
+
+class Command(BaseCommand):
+    help = ('Строит уменьшенные копии фото для постов, у которых '
+            'их ещё нет (например, загруженных до появления копий)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить копии у всех постов с фото.')
+        parser.add_argument(
+            '--sync', action='store_true',
+            help='Строить копии сразу, а не через очередь задач.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['force']:
+            posts = posts.filter(image_variants__isnull=True)
+        total = 0
+        for pk, image in posts.values_list('pk', 'image').iterator():
+            if options['sync']:
+                try:
+                    build_image_variants(post_id=pk, image=image)
+                except OSError as error:
+                    self.stderr.write(f'Пост {pk}: {error}')
+                    continue
+            else:
+                enqueue('blog.build_image_variants',
+                        {'post_id': pk, 'image': image})
+            total += 1
+        action = 'Обработано' if options['sync'] else 'Поставлено в очередь'
+        self.stdout.write(f'{action} постов: {total}')
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import build_sitemaps, sitemap_root
+
+
+class Command(BaseCommand):
+    help = ('Строит сжатые карты сайта и их индекс в MEDIA_ROOT; '
+            'перезаписываются только изменившиеся страницы')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Перестроить все страницы, а не только изменившиеся.')
+        parser.add_argument(
+            '--base-url', default=None,
+            help='Адрес сайта для ссылок (по умолчанию SITE_URL).')
+
+    def handle(self, *args, **options):
+        base_url = (options['base_url'] or settings.SITE_URL).rstrip('/')
+        written, total = build_sitemaps(base_url, full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Страниц карты сайта: {total}, перезаписано: {written} '
+            f'({sitemap_root()})'))
@@ -0,0 +1,71 @@
+import posixpath
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Post
+from core.images import variant_pattern
+from core.models import ContentBlob
+from core.storage import collect_blob, grace_cutoff
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает ссылки на файлы фото по постам и удаляет '
+            'файлы, на которые больше никто не ссылается')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.')
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        references = dict(
+            Post.objects.exclude(image='')
+            .values_list('image')
+            .annotate(total=Count('pk'))
+            .order_by())
+        with transaction.atomic():
+            blobs = dict(ContentBlob.objects.select_for_update()
+                         .values_list('name', 'refcount'))
+            fixed = 0
+            for name, total in references.items():
+                if blobs.get(name) == total:
+                    continue
+                fixed += 1
+                if not options['dry_run']:
+                    ContentBlob.objects.update_or_create(
+                        name=name, defaults={'refcount': total})
+            unreferenced = set(blobs) - set(references)
+            if not options['dry_run']:
+                ContentBlob.objects.filter(name__in=unreferenced).update(
+                    refcount=0)
+        # Недавно сохранённые файлы могут ждать ссылки от новой записи:
+        # collect_blob их не удаляет.
+        stale = ContentBlob.objects.filter(
+            name__in=unreferenced, touched_at__lt=grace_cutoff())
+        deleted = 0
+        for name in sorted(stale.values_list('name', flat=True)):
+            self.stdout.write(f'Удаляется {name}')
+            if options['dry_run'] or collect_blob(
+                    name, storage,
+                    on_collect=lambda: self._delete_variants(storage, name)):
+                deleted += 1
+        self.stdout.write(
+            f'Исправлено счётчиков: {fixed}, '
+            f'удалено файлов: {deleted}')
+
+    @staticmethod
+    def _delete_variants(storage, name):
+        """Удаляет уменьшенные копии файла name_w<ширина>.*"""
+
+        directory, filename = posixpath.split(name)
+        variant = variant_pattern(filename)
+        try:
+            _, files = storage.listdir(directory)
+        except FileNotFoundError:
+            return
+        for other in files:
+            if variant.match(other):
+                storage.delete(posixpath.join(directory, other))
@@ -0,0 +1,41 @@
+import csv
+
+from django.core.management.base import BaseCommand
+
+from blog.exports import iter_post_rows
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Выгружает публикации в CSV (по умолчанию в stdout)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', help='Путь к файлу CSV вместо stdout.')
+        parser.add_argument(
+            '--published', action='store_true',
+            help='Только видимые на сайте публикации.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Сколько строк читать из курсора за раз.')
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['published']:
+            queryset = queryset.visible()
+        rows = iter_post_rows(queryset, options['chunk_size'])
+        if options['output'] is None:
+            written = self._write(rows, self.stdout)
+        else:
+            with open(options['output'], 'w', newline='',
+                      encoding='utf-8') as file:
+                written = self._write(rows, file)
+            self.stderr.write(f'Выгружено публикаций: {written}')
+
+    def _write(self, rows, file):
+        writer = csv.writer(file)
+        written = -1
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+        return written
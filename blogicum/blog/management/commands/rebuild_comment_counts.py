@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Проверяет и пересчитывает счётчики комментариев у публикаций'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счётчики, завершиться с ошибкой '
+                 'при расхождении.',
+        )
+
+    def handle(self, *args, **options):
+        stale = (
+            Post.objects.with_actual_comment_count()
+            .exclude(comment_count=F('actual_comment_count'))
+            .values_list('pk', 'comment_count', 'actual_comment_count'))
+        if options['check']:
+            mismatches = list(stale[:20])
+            for pk, stored, actual in mismatches:
+                self.stdout.write(
+                    f'Пост {pk}: сохранено {stored}, фактически {actual}')
+            if mismatches:
+                raise CommandError('Счётчики комментариев расходятся.')
+            self.stdout.write(self.style.SUCCESS('Счётчики в порядке.'))
+            return
+        with transaction.atomic():
+            updated = Post.objects.rebuild_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Заново заполняет индекс полнотекстового поиска по публикациям'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            indexed = rebuild_index()
+        if indexed is None:
+            self.stdout.write('Индекс поиска поддерживает СУБД, '
+                              'перестраивать нечего.')
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {indexed}'))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduler import next_release_at, release_due_posts
+
+
+class Command(BaseCommand):
+    help = ('Публикует отложенные посты, дата которых наступила; '
+            'с --loop работает как планировщик')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.')
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Максимальная пауза между проверками в секундах.')
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_due_posts()
+            if released:
+                self.stdout.write(f'Опубликовано постов: {released}')
+            if not options['loop']:
+                return
+            time.sleep(self._pause(options['interval']))
+
+    @staticmethod
+    def _pause(interval):
+        """Спит до ближайшей публикации, но не дольше interval"""
+
+        upcoming = next_release_at()
+        if upcoming is None:
+            return interval
+        until = (upcoming - timezone.now()).total_seconds()
+        return min(interval, max(until, 0.1))
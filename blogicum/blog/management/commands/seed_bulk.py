@@ -0,0 +1,177 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from blog.cache import invalidate_site
+from blog.models import Category, Comment, Location, Post
+from blog.paginators import invalidate_post_counts
+from blog.search import rebuild_index
+from blog.suggest import suggestions
+
+User = get_user_model()
+
+# Сколько готовых фраз Faker генерирует заранее: вызывать Faker
+# на каждую из миллионов строк слишком медленно.
+PHRASE_POOL_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу большим объёмом синтетических данных '
+            'для воспроизведения планов запросов продакшена')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument(
+            '--users', type=int,
+            help='По умолчанию — один автор на 100 постов.')
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--chunk-size', type=int, default=10_000)
+        parser.add_argument('--years', type=int, default=5,
+                            help='Глубина истории публикаций в годах.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.phrases = [
+            self.faker.sentence(nb_words=12) for _ in range(PHRASE_POOL_SIZE)
+        ]
+        n_users = options['users'] or max(options['posts'] // 100, 1)
+
+        users = self._seed(User, n_users, self._user_rows)
+        categories = self._seed(
+            Category, options['categories'], self._category_rows)
+        locations = self._seed(
+            Location, options['locations'], self._location_rows)
+        posts = self._seed(
+            Post, options['posts'],
+            lambda start, n: self._post_rows(
+                start, n, users, categories, locations, options['years']))
+        self._seed(
+            Comment, options['comments'],
+            lambda start, n: self._comment_rows(start, n, users, posts))
+
+        started = time.monotonic()
+        with transaction.atomic():
+            Post.objects.filter(
+                pk__gte=posts.start).rebuild_comment_counts()
+        self._reset_sequences()
+        # bulk_create не отправляет сигналов: индекс поиска и подсказки
+        # строятся заново по всем постам.
+        with transaction.atomic():
+            rebuild_index()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        invalidate_post_counts()
+        invalidate_site()
+        suggestions.invalidate()
+        self.stdout.write(
+            f'Счётчики, индекс поиска и статистика: '
+            f'{time.monotonic() - started:.1f} с')
+
+    def _seed(self, model, total, make_rows):
+        """Вставляет total строк пачками, каждая пачка — в транзакции"""
+
+        start = (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        started = time.monotonic()
+        for offset in range(0, total, self.chunk_size):
+            size = min(self.chunk_size, total - offset)
+            with transaction.atomic():
+                model.objects.bulk_create(make_rows(start + offset, size))
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {total} строк за '
+            f'{time.monotonic() - started:.1f} с')
+        return range(start, start + total)
+
+    @staticmethod
+    def _skewed(ids, rnd, alpha=1.2):
+        """Выбирает id по степенному закону: первые id встречаются чаще"""
+
+        index = int(rnd.paretovariate(alpha)) - 1
+        return ids[index % len(ids)]
+
+    def _user_rows(self, start, n):
+        password = make_password(None)
+        now = timezone.now()
+        for pk in range(start, start + n):
+            yield User(
+                pk=pk,
+                username=f'{self.faker.user_name()}{pk}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                password=password,
+                date_joined=now,
+            )
+
+    def _category_rows(self, start, n):
+        for pk in range(start, start + n):
+            yield Category(
+                pk=pk,
+                title=self.faker.word().capitalize(),
+                slug=f'category-{pk}',
+                description=self.rnd.choice(self.phrases),
+                # Небольшая доля категорий снята с публикации.
+                is_published=self.rnd.random() > 0.05,
+            )
+
+    def _location_rows(self, start, n):
+        for pk in range(start, start + n):
+            yield Location(pk=pk, name=self.faker.city())
+
+    def _post_rows(self, start, n, users, categories, locations, years):
+        now = timezone.now()
+        history = timedelta(days=365 * years).total_seconds()
+        for pk in range(start, start + n):
+            # Новых постов больше, чем старых; ~1% запланированы на будущее.
+            if self.rnd.random() < 0.01:
+                age = -self.rnd.uniform(0, 30 * 24 * 3600)
+            else:
+                age = history * self.rnd.betavariate(1, 3)
+            pub_date = now - timedelta(seconds=age)
+            yield Post(
+                pk=pk,
+                title=self.rnd.choice(self.phrases)[:256],
+                text=' '.join(self.rnd.choices(self.phrases, k=5)),
+                pub_date=pub_date,
+                # bulk_create не вызывает Post.save().
+                is_released=pub_date <= now,
+                is_published=self.rnd.random() > 0.03,
+                author_id=self._skewed(users, self.rnd),
+                category_id=self._skewed(categories, self.rnd, alpha=0.8),
+                location_id=(
+                    self.rnd.choice(locations)
+                    if self.rnd.random() < 0.7 else None),
+            )
+
+    def _comment_rows(self, start, n, users, posts):
+        # Свежие посты (с большими id) обсуждают активнее.
+        newest_first = posts[::-1]
+        for pk in range(start, start + n):
+            yield Comment(
+                pk=pk,
+                text=self.rnd.choice(self.phrases),
+                post_id=self._skewed(newest_first, self.rnd, alpha=0.6),
+                author_id=self._skewed(users, self.rnd),
+            )
+
+    def _reset_sequences(self):
+        """Сдвигает последовательности id после вставки с явными pk"""
+
+        sql = connection.ops.sequence_reset_sql(
+            no_style(), [User, Category, Location, Post, Comment])
+        with connection.cursor() as cursor:
+            for statement in sql:
+                cursor.execute(statement)
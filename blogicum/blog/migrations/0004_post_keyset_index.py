@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_auto_20250508_1653'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date', '-id'], name='blog_post_pub_dat_70aa74_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:24
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def release_past_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(pub_date__lte=timezone.now()).update(is_released=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_visible_post_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_category_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_author_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_released',
+            field=models.BooleanField(default=False, editable=False, help_text='Выставляется при сохранении поста и планировщиком release_posts для отложенных публикаций.', verbose_name='Дата публикации наступила'),
+        ),
+        migrations.RunPython(release_past_posts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True), ('is_released', True)), fields=['-pub_date', '-id'], name='post_published_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True), ('is_released', True)), fields=['category', '-pub_date', '-id'], name='post_published_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True), ('is_released', True)), fields=['author', '-pub_date', '-id'], name='post_published_author_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_released', False)), fields=['pub_date'], name='post_unreleased_idx'),
+        ),
+    ]
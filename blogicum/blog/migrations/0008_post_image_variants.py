@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_is_released'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, editable=False, help_text='Заполняется фоновой задачей после загрузки фото; пока копий нет, выводится оригинал.', null=True, verbose_name='Уменьшенные копии фото'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:41
+
+import core.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_image_references(apps, schema_editor):
+    ContentBlob = apps.get_model('core', 'ContentBlob')
+    Post = apps.get_model('blog', 'Post')
+    references = (
+        Post.objects.exclude(image='')
+        .values('image')
+        .annotate(total=Count('pk'))
+        .order_by())
+    ContentBlob.objects.bulk_create(
+        [
+            ContentBlob(name=row['image'], refcount=row['total'])
+            for row in references.iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_image_variants'),
+        ('core', '0003_contentblob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='post_images', verbose_name='Фото'),
+        ),
+        migrations.RunPython(
+            count_image_references, migrations.RunPython.noop),
+    ]
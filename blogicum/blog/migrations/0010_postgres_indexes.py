@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# Индексы, которых нет в SQLite. Создаются только на PostgreSQL;
+# на других базах миграция ничего не делает.
+POSTGRES_INDEXES = (
+    # Лента: покрывающий частичный индекс отдаёт страницу по ключу
+    # (pub_date, id) вместе с внешними ключами карточки без чтения
+    # строк таблицы (index-only scan).
+    ('post_feed_covering_idx',
+     'CREATE INDEX IF NOT EXISTS post_feed_covering_idx '
+     'ON blog_post (pub_date DESC, id DESC) '
+     'INCLUDE (author_id, category_id, location_id) '
+     'WHERE is_published AND is_released'),
+    # Комментарии добавляются по возрастанию created_at: BRIN-индекс
+    # в сотни раз меньше B-дерева и годится для выборок по периоду.
+    ('comment_created_brin_idx',
+     'CREATE INDEX IF NOT EXISTS comment_created_brin_idx '
+     'ON blog_comment USING brin (created_at)'),
+)
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, sql in POSTGRES_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Синхронизируется с blog.search; на SQLite это таблица FTS5,
+# на PostgreSQL — GIN-индекс по тому же выражению tsvector, что
+# строит blog.search._postgres_search.
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5("
+    "title, text, "
+    "tokenize = 'unicode61 remove_diacritics 2', "
+    # Префиксные индексы ускоряют поиск по началу последнего слова.
+    "prefix = '2 3')",
+    'INSERT INTO blog_post_fts (rowid, title, text) '
+    'SELECT id, title, text FROM blog_post',
+)
+SQLITE_DROP = ('DROP TABLE IF EXISTS blog_post_fts',)
+POSTGRES_CREATE = (
+    'CREATE INDEX IF NOT EXISTS post_search_idx ON blog_post USING gin (('
+    "setweight(to_tsvector('russian'::regconfig, COALESCE(title, '')), 'A')"
+    " || "
+    "setweight(to_tsvector('russian'::regconfig, COALESCE(text, '')), 'B')"
+    '))',
+)
+POSTGRES_DROP = ('DROP INDEX IF EXISTS post_search_idx',)
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, ()):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_postgres_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_CREATE, 'postgresql': POSTGRES_CREATE}),
+            _run({'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}),
+        ),
+    ]
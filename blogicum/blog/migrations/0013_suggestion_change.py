@@ -0,0 +1,25 @@
+# Generated by Django 3.2.16 on 2026-10-17 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_category_options_and_author_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuggestionChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(blank=True, max_length=16, verbose_name='Вид объекта')),
+                ('ident', models.CharField(blank=True, max_length=150, verbose_name='Идентификатор объекта')),
+            ],
+            options={
+                'verbose_name': 'изменение подсказок',
+                'verbose_name_plural': 'Изменения подсказок',
+            },
+        ),
+    ]
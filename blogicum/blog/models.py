@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from core.models import PublishedCreatedModel
+from core.storage import post_image_storage
 
 User = get_user_model()
 
@@ -52,6 +56,65 @@ class Location(PublishedCreatedModel):
         ordering = ('name',)
 
 
+class PostQuerySet(models.QuerySet):
+    """Набор запросов для публикаций"""
+
+    # Поля, которые выводит карточка поста (includes/post_card.html).
+    CARD_FIELDS = (
+        'title', 'text', 'pub_date', 'image', 'image_variants',
+        'is_published', 'comment_count',
+        'author__username',
+        'category__title', 'category__slug', 'category__is_published',
+        'location__name', 'location__is_published',
+    )
+
+    def visible(self):
+        """Опубликованные посты опубликованных категорий с прошедшей датой"""
+
+        return self.filter(
+            is_published=True,
+            is_released=True,
+            category__is_published=True,
+        )
+
+    def due_for_release(self, now=None):
+        """Отложенные посты, дата публикации которых уже наступила"""
+
+        return self.filter(
+            is_released=False, pub_date__lte=now or timezone.now())
+
+    def for_cards(self):
+        """Подгружает связанные объекты одним JOIN и только нужные поля"""
+
+        return (
+            self.select_related('author', 'category', 'location')
+            .only(*self.CARD_FIELDS)
+            .order_by('-pub_date', '-id'))
+
+    @staticmethod
+    def _actual_comment_count():
+        """Подзапрос с фактическим числом комментариев к посту"""
+
+        counts = (
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total'))
+        return Coalesce(Subquery(counts), 0)
+
+    def with_actual_comment_count(self):
+        """Добавляет фактическое число комментариев из таблицы комментариев"""
+
+        return self.annotate(
+            actual_comment_count=self._actual_comment_count())
+
+    def rebuild_comment_counts(self):
+        """Пересчитывает счётчики комментариев одним UPDATE"""
+
+        return self.update(comment_count=self._actual_comment_count())
+
+
 class Post(PublishedCreatedModel):
     """Основная модель публикации (поста)"""
 
@@ -91,20 +154,90 @@ class Post(PublishedCreatedModel):
     image = models.ImageField(
         'Фото',
         upload_to='post_images',
+        storage=post_image_storage,
         blank=True
     )
+    image_variants = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото',
+        help_text=('Заполняется фоновой задачей после загрузки фото; '
+                   'пока копий нет, выводится оригинал.')
+    )
+    is_released = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Дата публикации наступила',
+        help_text=('Выставляется при сохранении поста и планировщиком '
+                   'release_posts для отложенных публикаций.')
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         """Строковое представление публикации"""
 
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Отмечает, наступила ли дата публикации.
+
+        Счётчик комментариев меняют только сигналы через F(): при
+        обновлении поста он не записывается, чтобы устаревшее значение
+        из загруженного объекта не затёрло новые комментарии.
+        """
+
+        self.is_released = self.pub_date <= timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not (
+                self._state.adding or self.pk is None
+                or kwargs.get('force_insert')):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count']
+        if update_fields is not None:
+            update_fields = set(update_fields) - {'comment_count'}
+            if 'pub_date' in update_fields:
+                update_fields.add('is_released')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         indexes = [
             models.Index(fields=['-pub_date', 'author']),
+            # Частичные индексы под условие видимости поста (visible())
+            # и курсорную пагинацию по (pub_date, id).
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True, is_released=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True, is_released=True),
+                name='post_published_category_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                condition=models.Q(is_published=True, is_released=True),
+                name='post_published_author_idx',
+            ),
+            # Отложенные посты для планировщика release_posts.
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_released=False),
+                name='post_unreleased_idx',
+            ),
         ]
 
 
@@ -134,10 +267,38 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
         indexes = [
-            models.Index(fields=['created_at', 'author'])
+            models.Index(fields=['created_at', 'author']),
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx',
+            ),
         ]
 
     def __str__(self):
         """Строковое представление комментария"""
 
         return f"Комментарий пользователя {self.author}"
+
+
+class SuggestionChange(models.Model):
+    """
+    Запись журнала изменений подсказок (blog.suggest).
+
+    По журналу каждый процесс обновляет свой индекс подсказок в памяти:
+    вид и идентификатор изменённого объекта, пустой вид — полный сброс.
+    """
+
+    kind = models.CharField(
+        max_length=16,
+        blank=True,
+        verbose_name='Вид объекта'
+    )
+    ident = models.CharField(
+        max_length=150,
+        blank=True,
+        verbose_name='Идентификатор объекта'
+    )
+
+    class Meta:
+        verbose_name = 'изменение подсказок'
+        verbose_name_plural = 'Изменения подсказок'
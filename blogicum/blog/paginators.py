@@ -0,0 +1,214 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+from core.cache import get_tag_versions, invalidate_tags
+
+# Метка кеша, версия которой — поколение кешированных счётчиков.
+COUNT_TAG = 'post-count'
+
+
+class InvalidCursor(Exception):
+    """Курсор пагинации не удалось разобрать"""
+
+
+def encode_key(moment, pk):
+    """Упаковывает ключ (дата, id) в непрозрачный токен"""
+
+    raw = f'{moment.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def encode_cursor(post):
+    """Упаковывает ключ (pub_date, id) поста в непрозрачный токен"""
+
+    return encode_key(post.pub_date, post.pk)
+
+
+def decode_cursor(token):
+    """Распаковывает токен курсора обратно в пару (pub_date, id)"""
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        pub_date, pk = raw.split('|')
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor(token)
+
+
+class KeysetPage:
+    """Страница курсорной пагинации с интерфейсом, похожим на Page"""
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        """Токен для ссылки на следующую (более старую) страницу"""
+
+        if self.has_next() and self.object_list:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        """Токен для ссылки на предыдущую (более новую) страницу"""
+
+        if self.has_previous() and self.object_list:
+            return encode_cursor(self.object_list[0])
+        return None
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по ключу (pub_date, id) вместо OFFSET.
+
+    Не считает общее количество записей: для определения следующей
+    страницы выбирается на одну запись больше, чем помещается на странице,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def page(self, after=None, before=None):
+        """Возвращает страницу после/до указанного курсора"""
+
+        if before:
+            pub_date, pk = decode_cursor(before)
+            rows = list(
+                self.queryset.filter(pub_date__gte=pub_date)
+                .exclude(pub_date=pub_date, pk__lte=pk)
+                .order_by('pub_date', 'pk')[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(rows, has_next=True, has_previous=has_previous)
+
+        queryset = self.queryset.order_by('-pub_date', '-pk')
+        if after:
+            pub_date, pk = decode_cursor(after)
+            queryset = (
+                queryset.filter(pub_date__lte=pub_date)
+                .exclude(pub_date=pub_date, pk__gte=pk))
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page],
+            has_next=len(rows) > self.per_page,
+            has_previous=bool(after),
+        )
+
+
+def _count_generation():
+    """Текущее поколение кешированных счётчиков"""
+
+    return get_tag_versions([COUNT_TAG])[0]
+
+
+def invalidate_post_counts():
+    """Сбрасывает все кешированные счётчики публикаций"""
+
+    invalidate_tags(COUNT_TAG)
+
+
+def estimate_table_rows(model):
+    """
+    Оценка числа строк таблицы по статистике СУБД без COUNT(*).
+
+    Возвращает None, если статистика недоступна
+    (например, для SQLite до выполнения ANALYZE).
+    """
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    return int(str(row[0]).split()[0])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который хранит общее количество записей в кеше.
+
+    Ключ строится из области видимости списка (лента, категория, профиль)
+    и поколения счётчиков, которое сдвигается при изменении публикаций
+    и категорий. Если записей больше PAGINATOR_EXACT_COUNT_LIMIT,
+    точный COUNT(*) не выполняется: используется оценка по статистике
+    таблицы.
+    """
+
+    def __init__(self, *args, count_scope=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_scope = count_scope
+
+    def _capped_count(self):
+        """Считает записи, но не дальше порога точного подсчёта"""
+
+        limit = getattr(settings, 'PAGINATOR_EXACT_COUNT_LIMIT', 100_000)
+        count = self.object_list.order_by()[:limit + 1].count()
+        if count <= limit:
+            return count
+        estimate = estimate_table_rows(self.object_list.model)
+        return max(limit, estimate or 0)
+
+    @cached_property
+    def count(self):
+        """Количество записей из кеша или с ограниченным подсчётом"""
+
+        if self.count_scope is None:
+            return super().count
+        key = f'blog:post-count:{_count_generation()}:{self.count_scope}'
+        count = cache.get(key)
+        if count is None:
+            count = self._capped_count()
+            cache.set(
+                key, count,
+                getattr(settings, 'PAGINATOR_COUNT_CACHE_TIMEOUT', 300))
+        return count
@@ -0,0 +1,49 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_posts
+from .models import Post
+from .paginators import invalidate_post_counts
+from .suggest import suggestions
+
+logger = logging.getLogger(__name__)
+
+
+def release_due_posts(now=None, batch_size=1000):
+    """
+    Открывает отложенные посты, дата публикации которых наступила.
+
+    Обновление идёт через UPDATE без сигналов, поэтому кеш страниц,
+    счётчиков и подсказок для затронутых постов сбрасывается здесь же.
+    Возвращает число открытых постов.
+    """
+
+    now = now or timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Post.objects.due_for_release(now)
+                .values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            Post.objects.filter(pk__in=ids).update(is_released=True)
+        invalidate_posts(ids)
+        suggestions.update_posts(ids)
+        released += len(ids)
+    if released:
+        invalidate_post_counts()
+        logger.info('Опубликовано отложенных постов: %s', released)
+    return released
+
+
+def next_release_at():
+    """Дата ближайшей отложенной публикации или None"""
+
+    return (
+        Post.objects.filter(is_released=False)
+        .order_by('pub_date')
+        .values_list('pub_date', flat=True)
+        .first())
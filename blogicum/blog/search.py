@@ -0,0 +1,240 @@
+import base64
+import binascii
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Category, Post
+from .paginators import InvalidCursor, KeysetPage
+
+User = get_user_model()
+
+# Таблица FTS5 с копией заголовка и текста постов, rowid — id поста.
+SEARCH_TABLE = 'blog_post_fts'
+# Метки подсветки совпадений: заменяются на <mark> после экранирования.
+MARK_START = '\x02'
+MARK_END = '\x03'
+# Слов запроса больше этого отбрасываются.
+MAX_QUERY_TERMS = 8
+
+TERM_RE = re.compile(r'\w+')
+
+
+def match_query(text):
+    """
+    Запрос FTS5 из пользовательского ввода.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5 во вводе
+    не интерпретируются; последнее слово ищется по префиксу.
+    Пустая строка — в запросе нет ни одного слова.
+    """
+
+    terms = TERM_RE.findall(text)[:MAX_QUERY_TERMS]
+    if not terms:
+        return ''
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+def highlight(text):
+    """Экранирует фрагмент и превращает метки совпадений в <mark>"""
+
+    return mark_safe(
+        escape(text)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>'))
+
+
+def encode_search_cursor(hit):
+    """Упаковывает ключ (score, id) результата в непрозрачный токен"""
+
+    raw = f'{hit.score!r}|{hit.pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_search_cursor(token):
+    """Распаковывает токен курсора поиска в пару (score, id)"""
+
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        score, pk = raw.split('|')
+        return float(score), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor(token)
+
+
+class SearchHit:
+    """Найденный пост с подсвеченными заголовком и фрагментом текста"""
+
+    def __init__(self, pk, title, pub_date, username, category_slug,
+                 category_title, snippet, score):
+        self.pk = pk
+        self.title = highlight(title)
+        self.pub_date = pub_date
+        self.username = username
+        self.category_slug = category_slug
+        self.category_title = category_title
+        self.snippet = highlight(snippet)
+        self.score = score
+
+
+class SearchPage(KeysetPage):
+    """Страница результатов поиска; листается только вперёд"""
+
+    @property
+    def next_cursor(self):
+        """Токен для ссылки на следующую страницу результатов"""
+
+        if self.has_next() and self.object_list:
+            return encode_search_cursor(self.object_list[-1])
+        return None
+
+
+def _sqlite_search(connection, query, after, limit):
+    post = Post._meta.db_table
+    params = [MARK_START, MARK_END, MARK_START, MARK_END, query]
+    keyset = ''
+    if after is not None:
+        keyset = 'AND (score > %s OR (score = %s AND p.id > %s))'
+        params += [after[0], after[0], after[1]]
+    # Видимость проверяется при поиске, а не при индексации: снятие
+    # категории с публикации и выход отложенных постов не требуют
+    # переиндексации.
+    sql = f'''
+        SELECT p.id, highlight({SEARCH_TABLE}, 0, %s, %s),
+               p.pub_date, u.username, c.slug, c.title,
+               snippet({SEARCH_TABLE}, 1, %s, %s, '…', 24),
+               bm25({SEARCH_TABLE}, 10.0, 1.0) AS score
+        FROM {SEARCH_TABLE}
+        JOIN {post} p ON p.id = {SEARCH_TABLE}.rowid
+        JOIN {Category._meta.db_table} c ON c.id = p.category_id
+        JOIN {User._meta.db_table} u ON u.id = p.author_id
+        WHERE {SEARCH_TABLE} MATCH %s
+          AND p.is_published AND p.is_released AND c.is_published
+          {keyset}
+        ORDER BY score, p.id
+        LIMIT %s
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit])
+        rows = cursor.fetchall()
+    # Сырой курсор SQLite возвращает дату строкой.
+    convert = connection.ops.convert_datetimefield_value
+    return [
+        SearchHit(pk, title, convert(pub_date, None, connection), *rest)
+        for pk, title, pub_date, *rest in rows]
+
+
+def _postgres_search(alias, text, after, limit):
+    from django.contrib.postgres.search import (
+        SearchHeadline, SearchQuery, SearchRank, SearchVector)
+    from django.db.models import F, Q
+
+    config = getattr(settings, 'SEARCH_CONFIG', 'russian')
+    # Выражение совпадает с индексом post_search_idx (миграция 0011).
+    vector = (
+        SearchVector('title', weight='A', config=config)
+        + SearchVector('text', weight='B', config=config))
+    query = SearchQuery(text, search_type='websearch', config=config)
+    options = {'start_sel': MARK_START, 'stop_sel': MARK_END}
+    queryset = (
+        Post.objects.using(alias).visible()
+        .annotate(search=vector)
+        .filter(search=query)
+        .annotate(
+            # Порядок как у bm25: меньше — релевантнее.
+            score=-SearchRank(F('search'), query),
+            title_headline=SearchHeadline(
+                'title', query, config=config, highlight_all=True,
+                **options),
+            text_headline=SearchHeadline(
+                'text', query, config=config, max_words=24, **options))
+        .order_by('score', 'pk'))
+    if after is not None:
+        queryset = queryset.filter(
+            Q(score__gt=after[0]) | Q(score=after[0], pk__gt=after[1]))
+    rows = queryset.values_list(
+        'pk', 'title_headline', 'pub_date', 'author__username',
+        'category__slug', 'category__title', 'text_headline', 'score')
+    return [SearchHit(*row) for row in rows[:limit]]
+
+
+def search_posts(text, after=None, per_page=None):
+    """
+    Страница видимых постов, найденных по заголовку и тексту.
+
+    Результаты упорядочены по релевантности (BM25 на SQLite,
+    ts_rank на PostgreSQL) и листаются курсором after по ключу
+    (релевантность, id) без OFFSET.
+    """
+
+    per_page = per_page or getattr(settings, 'SEARCH_RESULTS_PER_PAGE', 10)
+    if after is not None:
+        after = decode_search_cursor(after)
+    alias = router.db_for_read(Post)
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        hits = _postgres_search(alias, text, after, per_page + 1)
+    else:
+        query = match_query(text)
+        hits = (
+            _sqlite_search(connection, query, after, per_page + 1)
+            if query else [])
+    return SearchPage(
+        hits[:per_page],
+        has_next=len(hits) > per_page,
+        has_previous=after is not None)
+
+
+def index_post(post, using=None):
+    """Добавляет пост в индекс поиска или обновляет его запись"""
+
+    connection = connections[using or router.db_for_write(Post)]
+    if connection.vendor != 'sqlite':
+        # На PostgreSQL индекс по выражению обновляет сама СУБД.
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [post.pk, post.title, post.text])
+
+
+def unindex_post(pk, using=None):
+    """Удаляет пост из индекса поиска"""
+
+    connection = connections[using or router.db_for_write(Post)]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_index(using=None):
+    """
+    Заполняет индекс поиска заново одним INSERT ... SELECT.
+
+    Возвращает число проиндексированных постов; на PostgreSQL индекс
+    строится СУБД, и функция возвращает None.
+    """
+
+    connection = connections[using or router.db_for_write(Post)]
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            f'SELECT id, title, text FROM {Post._meta.db_table}')
+        indexed = cursor.rowcount
+        # Сливает сегменты индекса, накопленные построчными вставками.
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) "
+            "VALUES ('optimize')")
+    return indexed
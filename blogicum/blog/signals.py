@@ -0,0 +1,257 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from core.cache import invalidate_tags_on_commit
+from core.images import delete_variants
+from core.routers import replica_synced
+from core.storage import acquire_blob, release_blob
+from core.tasks import enqueue
+
+from .cache import invalidate_site, post_cache_tags, related_cache_tags
+from .models import Category, Comment, Location, Post
+from .paginators import invalidate_post_counts
+from .search import index_post, unindex_post
+from .suggest import suggestions
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария"""
+
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев поста при удалении комментария.
+
+    Срабатывает и при каскадном удалении (например, вместе с автором);
+    если пост удаляется вместе с комментарием, UPDATE не затронет строк.
+    """
+
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_post_counts(sender, **kwargs):
+    """Сбрасывает кешированные счётчики постов после фиксации"""
+
+    transaction.on_commit(invalidate_post_counts)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_pages(sender, instance, **kwargs):
+    """Запоминает страницы, где пост выводился до изменения"""
+
+    instance._cached_pages = (
+        post_cache_tags([instance.pk]) if instance.pk else set())
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_pages(sender, instance, **kwargs):
+    """Сбрасывает кеш страниц, где пост выводился до и после изменения"""
+
+    tags = getattr(instance, '_cached_pages', set())
+    invalidate_tags_on_commit(*tags, *post_cache_tags([instance.pk]))
+
+
+@receiver(pre_save, sender=Post)
+def reset_image_variants(sender, instance, **kwargs):
+    """Запоминает прежнее фото, если его заменили или удалили"""
+
+    previous = ('', None)
+    if instance.pk:
+        previous = Post.objects.filter(pk=instance.pk).values_list(
+            'image', 'image_variants').first() or previous
+    if previous[0] == instance.image.name:
+        return
+    instance._previous_image = previous
+    instance.image_variants = None
+
+
+def _release_image(name, variants):
+    """Снимает ссылку на фото; ненужное фото удаляется вместе с копиями"""
+
+    storage = Post._meta.get_field('image').storage
+    release_blob(
+        name, storage, on_collect=lambda: delete_variants(variants, storage))
+
+
+@receiver(post_save, sender=Post)
+def track_post_image(sender, instance, **kwargs):
+    """Учитывает ссылки на фото и ставит построение копий в очередь"""
+
+    previous = instance.__dict__.pop('_previous_image', None)
+    if previous is None:
+        return
+    old_name, old_variants = previous
+    new_name = instance.image.name
+    if new_name == old_name:
+        # Загрузили тот же файл: имя по содержимому не изменилось.
+        Post.objects.filter(pk=instance.pk).update(
+            image_variants=old_variants)
+        instance.image_variants = old_variants
+        return
+    if new_name:
+        acquire_blob(new_name, instance.image.storage)
+        payload = {'post_id': instance.pk, 'image': new_name}
+        transaction.on_commit(
+            lambda: enqueue('blog.build_image_variants', payload))
+    if old_name:
+        _release_image(old_name, old_variants)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    """Снимает ссылку на фото удалённого поста"""
+
+    if instance.image:
+        _release_image(instance.image.name, instance.image_variants)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, using, update_fields=None,
+                        **kwargs):
+    """Обновляет запись поста в индексе поиска"""
+
+    if update_fields is not None and not {'title', 'text'} & update_fields:
+        return
+    index_post(instance, using)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    """Удаляет пост из индекса поиска"""
+
+    unindex_post(instance.pk, using)
+
+
+@receiver(post_save, sender=Post)
+def update_post_suggestion(sender, instance, **kwargs):
+    """Обновляет подсказку с заголовком поста после фиксации"""
+
+    transaction.on_commit(lambda: suggestions.update_post(instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_suggestion(sender, instance, **kwargs):
+    """Убирает подсказку удалённого поста после фиксации"""
+
+    pk = instance.pk
+    transaction.on_commit(lambda: suggestions.remove_post(pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_comment_pages(sender, instance, **kwargs):
+    """Сбрасывает кеш поста и списков, где выводится число комментариев"""
+
+    invalidate_tags_on_commit(*post_cache_tags([instance.post_id]))
+
+
+# Поля, которые выводятся в списках постов и на страницах постов.
+LISTED_FIELDS = {
+    Category: ('title', 'slug', 'is_published'),
+    Location: ('name', 'is_published'),
+    User: ('username',),
+}
+
+
+def _is_login(update_fields):
+    return update_fields == frozenset({'last_login'})
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+@receiver(pre_save, sender=User)
+def remember_related_pages(sender, instance, update_fields=None, **kwargs):
+    """Запоминает объект до изменения: прежние адрес и название"""
+
+    if instance.pk is None or _is_login(update_fields):
+        return
+    instance._original = sender._default_manager.filter(
+        pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=User)
+def reset_related_pages(sender, instance, created, update_fields=None,
+                        **kwargs):
+    """
+    Сбрасывает кеш страниц, где выводится изменённый объект.
+
+    Страницы сами перечисляют метки того, что на них выводится, поэтому
+    изменение стоит нескольких меток независимо от числа постов. Новый
+    объект ещё нигде не выводится, а вход пользователя на сайт (смена
+    last_login) не меняет страниц.
+    """
+
+    if created or _is_login(update_fields):
+        return
+    original = instance.__dict__.pop('_original', None)
+    listed = original is None or any(
+        getattr(original, field) != getattr(instance, field)
+        for field in LISTED_FIELDS[sender])
+    tags = related_cache_tags(instance, listed)
+    if original is not None:
+        tags |= related_cache_tags(original, listed)
+    invalidate_tags_on_commit(*tags)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=User)
+def reset_deleted_pages(sender, instance, **kwargs):
+    """Сбрасывает кеш страниц, где выводился удалённый объект"""
+
+    invalidate_tags_on_commit(*related_cache_tags(instance))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_suggestions(sender, **kwargs):
+    """От публикации категории зависит видимость всех её постов"""
+
+    transaction.on_commit(suggestions.invalidate)
+
+
+@receiver(post_save, sender=User)
+def update_user_suggestion(sender, instance, update_fields=None, **kwargs):
+    """Обновляет подсказку с именем пользователя после фиксации"""
+
+    if _is_login(update_fields):
+        return
+    transaction.on_commit(lambda: suggestions.update_user(instance))
+
+
+@receiver(post_delete, sender=User)
+def remove_user_suggestion(sender, instance, **kwargs):
+    """Убирает подсказку удалённого пользователя после фиксации"""
+
+    pk = instance.pk
+    transaction.on_commit(lambda: suggestions.remove_user(pk))
+
+
+@receiver(replica_synced)
+def reset_after_replica_sync(sender, **kwargs):
+    """Сбрасывает страницы и счётчики, построенные по старой реплике"""
+
+    invalidate_post_counts()
+    invalidate_site()
+    suggestions.reload()
@@ -0,0 +1,237 @@
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    Count, ExpressionWrapper, F, IntegerField, Max, Sum)
+from django.urls import reverse
+
+from .models import Category, Post
+
+User = get_user_model()
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = (
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+INDEX_OPEN = (
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+INDEX_FILE = 'sitemap.xml'
+MANIFEST_FILE = 'manifest.json'
+
+
+def _lastmod(value):
+    return f'<lastmod>{value.date().isoformat()}</lastmod>' if value else ''
+
+
+class SitemapSection:
+    """
+    Раздел карты сайта, разбитый на страницы по диапазонам id.
+
+    Страница N содержит объекты с id от N * page_size до
+    (N + 1) * page_size: номер страницы вычисляется из id, поэтому
+    страницы строятся без OFFSET и не сдвигаются при удалении
+    объектов. Строки читаются через values_list().iterator() без
+    создания объектов моделей.
+    """
+
+    name = None
+    lastmod_field = None
+    # Ключ адреса можно изменить (slug, имя пользователя): тогда
+    # в подпись страницы входит хеш её строк.
+    digest_keys = False
+
+    def queryset(self):
+        raise NotImplementedError
+
+    def location(self, row):
+        """Путь страницы объекта по строке (pk, ключ, lastmod)"""
+
+        raise NotImplementedError
+
+    @property
+    def page_size(self):
+        return getattr(settings, 'SITEMAP_PAGE_SIZE', 50000)
+
+    def pages(self):
+        """
+        Непустые страницы раздела: {номер: (подпись, lastmod)}.
+
+        Подпись (число объектов, сумма id, самый поздний lastmod,
+        для digest_keys — хеш ключей) меняется, когда на странице
+        добавился, пропал, обновился или сменил адрес объект; по ней
+        команда build_sitemaps пропускает неизменные страницы.
+        """
+
+        page = ExpressionWrapper(
+            F('pk') / self.page_size, output_field=IntegerField())
+        aggregates = {'count': Count('pk'), 'ids': Sum('pk')}
+        if self.lastmod_field:
+            aggregates['lastmod'] = Max(self.lastmod_field)
+        rows = (
+            self.queryset().annotate(page=page).values('page')
+            .annotate(**aggregates).order_by('page'))
+        pages = {}
+        for row in rows:
+            lastmod = row.get('lastmod')
+            signature = [row['count'], row['ids'],
+                         lastmod.isoformat() if lastmod else None]
+            if self.digest_keys:
+                signature.append(self.digest(row['page']))
+            pages[row['page']] = (signature, lastmod)
+        return pages
+
+    def digest(self, page):
+        """Хеш пар (id, ключ) страницы page"""
+
+        digest = hashlib.md5()
+        for row in self.rows(page):
+            digest.update(f'{row[0]}:{row[1]}\n'.encode())
+        return digest.hexdigest()
+
+    def rows(self, page):
+        """Строки объектов страницы page в порядке id"""
+
+        start = page * self.page_size
+        fields = ['pk', self.key_field]
+        if self.lastmod_field:
+            fields.append(self.lastmod_field)
+        return (
+            self.queryset()
+            .filter(pk__gte=start, pk__lt=start + self.page_size)
+            .order_by('pk')
+            .values_list(*fields)
+            .iterator(
+                chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)))
+
+    def iter_xml(self, page, base_url):
+        """XML страницы карты сайта частями по одной записи"""
+
+        yield XML_HEADER
+        yield URLSET_OPEN
+        for row in self.rows(page):
+            lastmod = row[2] if self.lastmod_field else None
+            loc = escape(base_url + self.location(row))
+            yield f'<url><loc>{loc}</loc>{_lastmod(lastmod)}</url>\n'
+        yield '</urlset>\n'
+
+
+class PostSection(SitemapSection):
+    name = 'posts'
+    key_field = 'id'
+    lastmod_field = 'pub_date'
+
+    def queryset(self):
+        return Post.objects.visible()
+
+    def location(self, row):
+        return reverse('blog:post_detail', args=[row[0]])
+
+
+class CategorySection(SitemapSection):
+    name = 'categories'
+    key_field = 'slug'
+    digest_keys = True
+
+    def queryset(self):
+        return Category.objects.filter(is_published=True)
+
+    def location(self, row):
+        return reverse('blog:category_posts', args=[row[1]])
+
+
+class ProfileSection(SitemapSection):
+    name = 'profiles'
+    key_field = 'username'
+    digest_keys = True
+
+    def queryset(self):
+        return User.objects.filter(is_active=True)
+
+    def location(self, row):
+        return reverse('blog:profile', args=[row[1]])
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def page_filename(section, page):
+    return f'sitemap-{section}-{page}.xml.gz'
+
+
+def iter_index_xml(entries):
+    """XML индекса карт сайта по парам (адрес, lastmod)"""
+
+    yield XML_HEADER
+    yield INDEX_OPEN
+    for loc, lastmod in entries:
+        yield (f'<sitemap><loc>{escape(loc)}</loc>'
+               f'{_lastmod(lastmod)}</sitemap>\n')
+    yield '</sitemapindex>\n'
+
+
+def sitemap_root():
+    """Каталог заранее построенных карт сайта внутри MEDIA_ROOT"""
+
+    return Path(settings.MEDIA_ROOT) / getattr(
+        settings, 'SITEMAP_DIR', 'sitemaps')
+
+
+def _write_atomic(path, chunks, compress):
+    tmp = path.with_name(path.name + '.tmp')
+    if compress:
+        # mtime=0: одинаковое содержимое даёт одинаковый файл.
+        file = gzip.GzipFile(tmp, 'wb', mtime=0)
+    else:
+        file = open(tmp, 'wb')
+    with file:
+        for chunk in chunks:
+            file.write(chunk.encode())
+    os.replace(tmp, path)
+
+
+def build_sitemaps(base_url, full=False):
+    """
+    Пишет сжатые страницы карты сайта и индекс в sitemap_root().
+
+    Перестраиваются только страницы, подпись которых изменилась
+    с прошлого запуска (или все при full=True); файлы исчезнувших
+    страниц удаляются. Возвращает (записано, всего страниц).
+    """
+
+    root = sitemap_root()
+    root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / MANIFEST_FILE
+    try:
+        previous = json.loads(manifest_path.read_text())
+    except (FileNotFoundError, ValueError):
+        previous = {}
+    files_url = base_url + settings.MEDIA_URL + f'{root.name}/'
+
+    manifest, index, written = {}, [], 0
+    for name, section in SECTIONS.items():
+        known = previous.get(name, {})
+        manifest[name] = {}
+        for page, (signature, lastmod) in section.pages().items():
+            filename = page_filename(name, page)
+            if (full or known.get(str(page)) != signature
+                    or not (root / filename).exists()):
+                _write_atomic(
+                    root / filename, section.iter_xml(page, base_url),
+                    compress=True)
+                written += 1
+            manifest[name][str(page)] = signature
+            index.append((files_url + filename, lastmod))
+        for page in set(known) - set(manifest[name]):
+            (root / page_filename(name, page)).unlink(missing_ok=True)
+
+    _write_atomic(root / INDEX_FILE, iter_index_xml(index), compress=False)
+    manifest_path.write_text(json.dumps(manifest))
+    return written, len(index)
@@ -0,0 +1,342 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router
+from django.db.models import Max
+from django.urls import reverse
+
+from .models import Category, Post, SuggestionChange
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Сколько слов заголовка индексируется: подсказка ищет и по началу
+# любого из них, не только по началу заголовка.
+MAX_INDEXED_WORDS = 8
+
+WORD_START_RE = re.compile(r'\b\w')
+SPACES_RE = re.compile(r'\s+')
+
+POST, CATEGORY, USER = 'post', 'category', 'user'
+
+
+def normalize(text):
+    """Ключ поиска: без учёта регистра и лишних пробелов"""
+
+    return SPACES_RE.sub(' ', text).strip().casefold()
+
+
+def prefix_keys(label):
+    """Ключи записи: хвосты строки, начинающиеся с каждого слова"""
+
+    text = normalize(label)
+    starts = [match.start() for match in WORD_START_RE.finditer(text)]
+    return {text[start:] for start in starts[:MAX_INDEXED_WORDS]} or {text}
+
+
+class PrefixIndex:
+    """
+    Отсортированный массив ключей для поиска по префиксу.
+
+    Ключи и записи хранятся в двух параллельных списках; поиск —
+    двоичный по списку ключей, добавление и удаление — вставка
+    в отсортированный список. Запись — кортеж (вид, идентификатор,
+    подпись); для пользователей идентификатор — pk, а имя — подпись,
+    чтобы смена имени не оставляла прежнюю запись.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._items = []
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def add(self, kind, ident, label):
+        """Добавляет (или заменяет) запись об объекте"""
+
+        item = (kind, ident, label)
+        with self._lock:
+            self._remove((kind, ident))
+            keys = prefix_keys(label)
+            for key in keys:
+                index = bisect_left(self._keys, key)
+                self._keys.insert(index, key)
+                self._items.insert(index, item)
+            self._objects[kind, ident] = keys
+
+    def remove(self, kind, ident):
+        """Удаляет запись об объекте, если она есть"""
+
+        with self._lock:
+            self._remove((kind, ident))
+
+    def _remove(self, obj):
+        for key in self._objects.pop(obj, ()):
+            index = bisect_left(self._keys, key)
+            while index < len(self._keys) and self._keys[index] == key:
+                if self._items[index][:2] == obj:
+                    del self._keys[index]
+                    del self._items[index]
+                    break
+                index += 1
+
+    def load(self, items):
+        """Заменяет содержимое индекса записями items разом"""
+
+        pairs = []
+        objects = {}
+        for item in items:
+            keys = prefix_keys(item[2])
+            objects[item[:2]] = keys
+            pairs.extend((key, item) for key in keys)
+        pairs.sort()
+        with self._lock:
+            self._keys = [key for key, _ in pairs]
+            self._items = [item for _, item in pairs]
+            self._objects = objects
+
+    def search(self, prefix, limit):
+        """Первые limit разных записей с ключом, начинающимся на prefix"""
+
+        prefix = normalize(prefix)
+        found = {}
+        with self._lock:
+            index = bisect_left(self._keys, prefix)
+            # Одна запись может встретиться под несколькими ключами:
+            # просмотр ограничен, чтобы время ответа не зависело
+            # от числа совпадений.
+            end = min(len(self._keys), index + limit * MAX_INDEXED_WORDS)
+            while index < end and self._keys[index].startswith(prefix):
+                item = self._items[index]
+                found.setdefault(item[:2], item)
+                if len(found) == limit:
+                    break
+                index += 1
+        return list(found.values())
+
+
+class Suggestions:
+    """
+    Подсказки по заголовкам постов, категорий и именам пользователей.
+
+    Индекс строится в памяти процесса при первом обращении. Изменения
+    объектов пишутся в журнал SuggestionChange в основной базе; каждый
+    процесс не чаще раза в SUGGEST_REFRESH_SECONDS читает новые записи
+    и обновляет в своём индексе только изменившиеся объекты. Записи
+    перечитываются с запасом SUGGEST_JOURNAL_WINDOW id назад: на
+    PostgreSQL транзакция с меньшим id может зафиксироваться позже
+    записей с большими, такие записи применяются, когда станут видны.
+    Полный
+    сброс или отставание больше чем на SUGGEST_MAX_CHANGES записей
+    перестраивает индекс в фоновом потоке: до замены подсказки
+    отдаются из прежнего индекса.
+    """
+
+    def __init__(self, background=True):
+        self.index = PrefixIndex()
+        self.background = background
+        # Наибольший id применённой записи журнала; None — индекса нет.
+        self._seen = None
+        # id применённых записей в окне перед _seen.
+        self._applied = set()
+        self._checked = None
+        self._rebuilding = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _journal():
+        # Журнал читается там же, где пишется: реплика может отставать.
+        return SuggestionChange.objects.using(
+            router.db_for_write(SuggestionChange))
+
+    def _latest(self):
+        return self._journal().aggregate(latest=Max('pk'))['latest'] or 0
+
+    @staticmethod
+    def _window():
+        return getattr(settings, 'SUGGEST_JOURNAL_WINDOW', 100)
+
+    def _mark(self):
+        """Текущий конец журнала и id записей в окне перед ним"""
+
+        seen = self._latest()
+        applied = set(self._journal().filter(
+            pk__gt=seen - self._window(), pk__lte=seen,
+        ).values_list('pk', flat=True))
+        return seen, applied
+
+    @staticmethod
+    def _build():
+        """Новый индекс по текущим данным"""
+
+        posts = Post.objects.visible().values_list('pk', 'title')
+        categories = Category.objects.filter(
+            is_published=True).values_list('slug', 'title')
+        users = User.objects.filter(
+            is_active=True).values_list('pk', 'username')
+        index = PrefixIndex()
+        index.load([
+            *((POST, pk, title) for pk, title in posts.iterator()),
+            *((CATEGORY, slug, title) for slug, title in categories),
+            *((USER, pk, username) for pk, username in users.iterator()),
+        ])
+        return index
+
+    def _due(self):
+        interval = getattr(settings, 'SUGGEST_REFRESH_SECONDS', 1)
+        return not self._rebuilding and (
+            self._checked is None
+            or time.monotonic() - self._checked >= interval)
+
+    def _ensure_current(self):
+        if self._seen is not None and not self._due():
+            return
+        with self._lock:
+            if self._seen is None:
+                mark = self._mark()
+                self.index = self._build()
+                self._seen, self._applied = mark
+                self._checked = time.monotonic()
+            elif self._due():
+                self._checked = time.monotonic()
+                self._catch_up()
+
+    def _catch_up(self):
+        """Применяет новые записи журнала к индексу"""
+
+        limit = getattr(settings, 'SUGGEST_MAX_CHANGES', 500)
+        window = self._window()
+        rows = list(
+            self._journal().filter(pk__gt=self._seen - window).order_by('pk')
+            .values_list('pk', 'kind', 'ident')[:window + limit + 1])
+        changes = [row for row in rows if row[0] not in self._applied]
+        if not changes:
+            return
+        if len(changes) > limit or any(not kind for _, kind, _ in changes):
+            self._rebuild(self._mark())
+            return
+        idents = {POST: set(), USER: set()}
+        for _, kind, ident in changes:
+            idents[kind].add(int(ident))
+        self._refresh(idents[POST], idents[USER])
+        self._seen = max(self._seen, rows[-1][0])
+        self._applied = {
+            pk for pk, _, _ in rows if pk > self._seen - window}
+
+    def _refresh(self, post_ids, user_ids):
+        """Перечитывает объекты: видимые добавляет, остальные убирает"""
+
+        titles = dict(Post.objects.visible().filter(
+            pk__in=post_ids).values_list('pk', 'title'))
+        usernames = dict(User.objects.filter(
+            pk__in=user_ids, is_active=True).values_list('pk', 'username'))
+        for kind, pks, labels in (
+                (POST, post_ids, titles), (USER, user_ids, usernames)):
+            for pk in pks:
+                if pk in labels:
+                    self.index.add(kind, pk, labels[pk])
+                else:
+                    self.index.remove(kind, pk)
+
+    def _rebuild(self, mark):
+        if not self.background:
+            self.index = self._build()
+            self._seen, self._applied = mark
+            return
+        self._rebuilding = True
+        threading.Thread(
+            target=self._rebuild_in_background, args=(mark,),
+            name='suggest-rebuild', daemon=True).start()
+
+    def _rebuild_in_background(self, mark):
+        try:
+            index = self._build()
+        except Exception:
+            # Журнал не отмечен прочитанным: сброс повторится.
+            logger.exception('Не удалось перестроить индекс подсказок')
+        else:
+            self.index = index
+            self._seen, self._applied = mark
+        finally:
+            self._rebuilding = False
+            connections.close_all()
+
+    def search(self, prefix, limit=None):
+        """Подсказки для начала ввода prefix"""
+
+        limit = limit or getattr(settings, 'SUGGEST_LIMIT', 10)
+        self._ensure_current()
+        return self.index.search(prefix, limit)
+
+    def _record(self, kind, idents):
+        """Пишет изменения в журнал и удаляет из него старые записи"""
+
+        journal = self._journal()
+        journal.bulk_create(
+            SuggestionChange(kind=kind, ident=str(ident))
+            for ident in idents)
+        # Отставший больше чем на SUGGEST_MAX_CHANGES процесс всё равно
+        # перестроит индекс целиком, более старые записи не нужны.
+        keep = 2 * getattr(settings, 'SUGGEST_MAX_CHANGES', 500) + (
+            self._window())
+        journal.filter(pk__lte=self._latest() - keep).delete()
+
+    def update_posts(self, pks):
+        """Обновляет подсказки постов: видимые добавляет, остальные убирает"""
+
+        if pks:
+            self._record(POST, pks)
+
+    def update_post(self, pk):
+        """Добавляет пост, если он виден на сайте, иначе убирает"""
+
+        self.update_posts([pk])
+
+    def remove_post(self, pk):
+        """Убирает пост из подсказок"""
+
+        self.update_posts([pk])
+
+    def update_user(self, user):
+        """Добавляет активного пользователя, неактивного убирает"""
+
+        self._record(USER, [user.pk])
+
+    def remove_user(self, pk):
+        """Убирает пользователя из подсказок"""
+
+        self._record(USER, [pk])
+
+    def invalidate(self):
+        """Перестраивает индекс во всех процессах"""
+
+        self._record('', [''])
+
+    def reload(self):
+        """Перестраивает индекс этого процесса, если он уже построен"""
+
+        with self._lock:
+            if self._seen is not None and not self._rebuilding:
+                self._rebuild(self._mark())
+
+
+suggestions = Suggestions()
+
+
+def suggestion_url(kind, ident, label):
+    """Адрес страницы, на которую ведёт подсказка"""
+
+    if kind == POST:
+        return reverse('blog:post_detail', args=[ident])
+    if kind == CATEGORY:
+        return reverse('blog:category_posts', args=[ident])
+    return reverse('blog:profile', args=[label])
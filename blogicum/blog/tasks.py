@@ -0,0 +1,44 @@
+from django.db import transaction
+
+from core.images import build_variants, delete_variants
+from core.tasks import task
+
+from .cache import invalidate_posts
+from .models import Post
+from .scheduler import release_due_posts
+
+
+@task('blog.rebuild_comment_counts')
+def rebuild_comment_counts():
+    """Пересчитывает денормализованные счётчики комментариев"""
+
+    with transaction.atomic():
+        Post.objects.rebuild_comment_counts()
+
+
+@task('blog.release_due_posts')
+def release_due_posts_task():
+    """Публикует отложенные посты, дата которых наступила"""
+
+    release_due_posts()
+
+
+@task('blog.build_image_variants')
+def build_image_variants(post_id, image):
+    """Строит уменьшенные копии фото поста"""
+
+    # Одинаковые фото хранятся одним файлом: копии могли уже построить
+    # для другого поста с тем же фото.
+    data = (
+        Post.objects.filter(image=image, image_variants__isnull=False)
+        .values_list('image_variants', flat=True).first())
+    built = data is None
+    if built:
+        data = build_variants(
+            image, storage=Post._meta.get_field('image').storage)
+    # Фото могли заменить, пока строились копии: тогда они не нужны.
+    if Post.objects.filter(pk=post_id, image=image).update(
+            image_variants=data):
+        invalidate_posts([post_id])
+    elif built and not Post.objects.filter(image=image).exists():
+        delete_variants(data, Post._meta.get_field('image').storage)
@@ -0,0 +1,42 @@
+from django import template
+
+register = template.Library()
+
+# Ширина карточки поста — 40rem (640px); на узких экранах —
+# во всю ширину окна.
+CARD_WIDTH = 640
+CARD_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+def _srcset(storage, variants, key):
+    return ', '.join(
+        f'{storage.url(variant[key])} {variant["width"]}w'
+        for variant in variants)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, lazy=True):
+    """
+    Фото поста с адаптивными копиями.
+
+    Пока фоновая задача не построила копии, выводится оригинал.
+    """
+
+    storage = post.image.storage
+    data = post.image_variants or {}
+    variants = data.get('variants', [])
+    # Запасной src — копия под ширину карточки, если она есть.
+    fallback = next(
+        (variant for variant in variants if variant['width'] >= CARD_WIDTH),
+        variants[-1] if variants else None)
+    return {
+        'post': post,
+        'src': (storage.url(fallback['src'])
+                if fallback else post.image.url),
+        'srcset': _srcset(storage, variants, 'src'),
+        'webp_srcset': _srcset(storage, variants, 'webp'),
+        'sizes': CARD_SIZES,
+        'width': data.get('width'),
+        'height': data.get('height'),
+        'lazy': lazy,
+    }
@@ -1,12 +1,16 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'blog'
 
 urlpatterns = [
     path('',
          views.IndexView.as_view(), name='index'),
+    path('search/',
+         views.SearchView.as_view(), name='search'),
+    path('search/suggest/',
+         views.SuggestView.as_view(), name='suggest'),
     path('posts/<int:id>/',
          views.PostDetailView.as_view(), name='post_detail'),
     path('posts/create/',
@@ -21,6 +25,30 @@ urlpatterns = [
          views.ProfileUpdateView.as_view(), name='edit_profile'),
     path('profile/<slug:username>/',
          views.ProfileView.as_view(), name='profile'),
+    path('feeds/rss/',
+         feeds.LatestPostsFeed(), name='posts_rss'),
+    path('feeds/atom/',
+         feeds.LatestPostsAtomFeed(), name='posts_atom'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.CategoryFeed(), name='category_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.CategoryAtomFeed(), name='category_atom'),
+    path('profile/<slug:username>/rss/',
+         feeds.AuthorFeed(), name='author_rss'),
+    path('profile/<slug:username>/atom/',
+         feeds.AuthorAtomFeed(), name='author_atom'),
+    path('sitemap.xml',
+         views.SitemapIndexView.as_view(), name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:page>.xml',
+         views.SitemapView.as_view(), name='sitemap'),
+    path('api/posts/',
+         api.PostListApiView.as_view(), name='api_posts'),
+    path('api/posts/<int:id>/comments/',
+         api.CommentListApiView.as_view(), name='api_comments'),
+    path('api/categories/<slug:category_slug>/posts/',
+         api.CategoryPostsApiView.as_view(), name='api_category_posts'),
+    path('api/users/<slug:username>/posts/',
+         api.UserPostsApiView.as_view(), name='api_user_posts'),
     path('posts/<int:post_id>/comment/',
          views.CommentCreateView.as_view(), name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
@@ -1,14 +1,17 @@
+import hashlib
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404, redirect
-from datetime import datetime
 from django.urls import reverse, reverse_lazy
-from django.db.models import Count
 
 from .models import Post, Category, Comment
 from .forms import PostForm, CommentForm, ProfileEditForm
+from .paginators import (
+    CachedCountPaginator, InvalidCursor, KeysetPaginator)
 from django.contrib.auth import get_user_model
-from django.http import Http404
-
-from django.utils import timezone
+from django.http import (
+    FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse)
+from django.utils.cache import patch_cache_control
 
 from django.views.generic import (
     CreateView,
@@ -16,10 +19,20 @@ from django.views.generic import (
     UpdateView,
     DeleteView,
     DetailView,
+    TemplateView,
     View
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+from core.cache import AnonymousPageCacheMixin, cached_response
+from core.writer import SerializedWriteMixin
+from .cache import (
+    FEED_TAG, NAMES_TAG, author_tag, category_tag, post_page_tags)
+from .search import search_posts
+from .sitemaps import (
+    INDEX_FILE, SECTIONS, iter_index_xml, sitemap_root)
+from .suggest import suggestion_url, suggestions
+
 
 User = get_user_model()
 
@@ -31,7 +44,8 @@ class PostMixin:
     template_name = 'blog/create.html'
 
 
-class PostCreateView(PostMixin, LoginRequiredMixin, CreateView):
+class PostCreateView(
+        PostMixin, LoginRequiredMixin, SerializedWriteMixin, CreateView):
     """Представление для создания нового поста"""
 
     form_class = PostForm
@@ -48,7 +62,8 @@ class PostCreateView(PostMixin, LoginRequiredMixin, CreateView):
         return reverse("blog:profile", args=[self.request.user])
 
 
-class PostUpdateView(PostMixin, LoginRequiredMixin, UpdateView):
+class PostUpdateView(
+        PostMixin, LoginRequiredMixin, SerializedWriteMixin, UpdateView):
     """Представление для редактирования существующего поста"""
 
     form_class = PostForm
@@ -57,7 +72,7 @@ class PostUpdateView(PostMixin, LoginRequiredMixin, UpdateView):
     def dispatch(self, request, *args, **kwargs):
         """Проверяет, является ли пользователь автором поста"""
 
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.id:
             return redirect('blog:post_detail', id=self.kwargs['id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -67,7 +82,8 @@ class PostUpdateView(PostMixin, LoginRequiredMixin, UpdateView):
         return reverse('blog:post_detail', kwargs={'id': self.kwargs['id']})
 
 
-class PostDeleteView(PostMixin, LoginRequiredMixin, DeleteView):
+class PostDeleteView(
+        PostMixin, LoginRequiredMixin, SerializedWriteMixin, DeleteView):
     """Представление для удаления поста"""
 
     pk_url_kwarg = 'id'
@@ -75,7 +91,7 @@ class PostDeleteView(PostMixin, LoginRequiredMixin, DeleteView):
     def dispatch(self, request, *args, **kwargs):
         """Проверяет, является ли пользователь автором поста"""
 
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.id:
             return redirect('blog:post_detail', id=self.kwargs['id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -92,32 +108,89 @@ class PostDeleteView(PostMixin, LoginRequiredMixin, DeleteView):
         return reverse("blog:profile", kwargs={"username": self.request.user})
 
 
-class IndexView(ListView):
+class KeysetPaginationMixin:
+    """
+    Курсорная пагинация по (pub_date, id) для списков постов.
+
+    Ссылки вида ?page=N по-прежнему обслуживаются обычным Paginator,
+    остальные запросы листаются токенами ?after= / ?before=.
+    """
+
+    def paginate_queryset(self, queryset, page_size):
+        """Выбирает режим пагинации по параметрам запроса"""
+
+        if self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountMixin:
+    """Кеширует общее количество постов для постраничной навигации"""
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_scope(self, queryset):
+        """
+        Область списка, для которой кешируется количество постов.
+
+        По умолчанию — хеш SQL запроса: списки с одинаковым запросом
+        делят одно закешированное количество.
+        """
+
+        return hashlib.md5(str(queryset.query).encode()).hexdigest()
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Передаёт пагинатору ключ кеша для этого списка"""
+
+        return super().get_paginator(
+            queryset, per_page, count_scope=self.get_count_scope(queryset),
+            **kwargs)
+
+
+class IndexView(AnonymousPageCacheMixin, KeysetPaginationMixin,
+                CachedCountMixin, ListView):
     """Главная страница со списком опубликованных постов"""
 
     model = Post
     template_name = 'blog/index.html'
     paginate_by = 10
 
+    def get_cache_tags(self):
+        """Лента сбрасывается при изменении любого поста"""
+
+        return [FEED_TAG, NAMES_TAG]
+
+    def get_count_scope(self, queryset):
+        """Общее количество постов ленты"""
+
+        return 'index'
+
     def get_queryset(self):
         """Возвращает только опубликованные посты с проверенными категориями"""
 
-        return (
-            self.model.objects.select_related('location', 'author', 'category')
-            .filter(is_published=True,
-                    category__is_published=True,
-                    pub_date__lte=datetime.now())
-            .annotate(comment_count=Count("comment"))
-            .order_by("-pub_date"))
+        return self.model.objects.visible().for_cards()
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, DetailView):
     """Детальное представление поста"""
 
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'id'
 
+    def get_cache_tags(self):
+        """Пост, комментарии, категория, место и авторы на странице"""
+
+        return post_page_tags(self.kwargs['id'])
+
     def get_object(self, queryset=None):
         """Возвращает пост с проверкой прав доступа"""
 
@@ -131,7 +204,7 @@ class PostDetailView(DetailView):
             is_visible = (
                 post.is_published
                 and post.category.is_published
-                and post.pub_date <= timezone.now()
+                and post.is_released
             )
 
             # Если пост не виден и пользователь не автор - 404
@@ -152,13 +225,22 @@ class PostDetailView(DetailView):
         return context
 
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(AnonymousPageCacheMixin, KeysetPaginationMixin,
+                        CachedCountMixin, ListView):
     """Список постов в конкретной категории"""
 
     template_name = 'blog/category.html'
-    context_object_name = 'page_obj'
     paginate_by = 10
-    ordering = '-pub_date'
+
+    def get_cache_tags(self):
+        """Страница сбрасывается при изменении постов категории"""
+
+        return [category_tag(self.kwargs['category_slug']), NAMES_TAG]
+
+    def get_count_scope(self, queryset):
+        """Количество постов в категории"""
+
+        return f'category:{self.kwargs["category_slug"]}'
 
     def get_queryset(self):
         """Возвращает посты выбранной категории"""
@@ -168,11 +250,7 @@ class CategoryPostsView(ListView):
             slug=self.kwargs['category_slug'],
             is_published=True
         )
-        current_datetime = datetime.now()
-        return self.category.posts.filter(
-            pub_date__lte=current_datetime,
-            is_published=True
-        ).annotate(comment_count=Count("comment")).order_by(self.ordering)
+        return self.category.posts.visible().for_cards()
 
     def get_context_data(self, **kwargs):
         """Добавляет категорию в контекст"""
@@ -182,30 +260,46 @@ class CategoryPostsView(ListView):
         return context
 
 
-class ProfileView(ListView):
+class ProfileView(AnonymousPageCacheMixin, KeysetPaginationMixin,
+                  CachedCountMixin, ListView):
     """Профиль пользователя с его постами"""
 
     model = Post
     paginate_by = 10
     template_name = 'blog/profile.html'
-    context_object_name = 'page_obj'
+
+    def get_cache_tags(self):
+        """Страница сбрасывается при изменении постов автора"""
+
+        return [author_tag(self.kwargs['username']), NAMES_TAG]
+
+    def is_owner(self):
+        """Смотрит ли пользователь свой собственный профиль"""
+
+        return self.request.user.username == self.kwargs['username']
+
+    def get_count_scope(self, queryset):
+        """Количество постов автора; владелец видит и скрытые посты"""
+
+        audience = 'owner' if self.is_owner() else 'public'
+        return f'profile:{self.kwargs["username"]}:{audience}'
 
     def get_queryset(self):
         """Возвращает посты конкретного пользователя"""
 
-        return (
-            self.model.objects.select_related('author')
-            .filter(author__username=self.kwargs['username'])
-            .annotate(comment_count=Count("comment"))
-            .order_by("-pub_date"))
+        self.profile = get_object_or_404(
+            User,
+            username=self.kwargs['username'])
+        posts = self.profile.posts.all()
+        if not self.is_owner():
+            posts = posts.visible()
+        return posts.for_cards()
 
     def get_context_data(self, **kwargs):
         """Добавляет профиль пользователя в контекст"""
 
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User,
-            username=self.kwargs['username'])
+        context['profile'] = self.profile
         return context
 
 
@@ -228,7 +322,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return reverse('blog:profile', args=[self.request.user.username])
 
 
-class CommentCreateView(LoginRequiredMixin, CreateView):
+class CommentCreateView(LoginRequiredMixin, SerializedWriteMixin, CreateView):
     """Создание нового комментария"""
 
     model = Comment
@@ -239,13 +333,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
     def get_post_data(self, kwargs):
         """Получает пост, к которому добавляется комментарий"""
 
-        return get_object_or_404(
-            Post,
-            pk=kwargs['post_id'],
-            pub_date__lte=datetime.now(),
-            is_published=True,
-            category__is_published=True,
-        )
+        return get_object_or_404(Post.objects.visible(), pk=kwargs['post_id'])
 
     def dispatch(self, request, *args, **kwargs):
         """Сохраняет пост перед обработкой запроса"""
@@ -280,7 +368,7 @@ class CommentMixin(LoginRequiredMixin, View):
             Comment,
             pk=kwargs['comment_id'],
         )
-        if comment.author != request.user:
+        if comment.author_id != request.user.id:
             return redirect('blog:post_detail', id=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -290,18 +378,103 @@ class CommentMixin(LoginRequiredMixin, View):
         return reverse("blog:post_detail", kwargs={'id': self.kwargs['post_id']})
 
 
-class CommentUpdateView(CommentMixin, UpdateView):
+class CommentUpdateView(CommentMixin, SerializedWriteMixin, UpdateView):
     """Редактирование существующего комментария"""
 
     form_class = CommentForm
 
 
-class CommentDeleteView(CommentMixin, DeleteView):
+class CommentDeleteView(CommentMixin, SerializedWriteMixin, DeleteView):
     """Удаление комментария"""
 
-    success_url = None 
+    success_url = None
 
     def get_success_url(self):
         """Перенаправляет на страницу поста после удаления"""
 
         return reverse("blog:post_detail", kwargs={'id': self.kwargs['post_id']})
+
+
+class SearchView(TemplateView):
+    """Поиск по заголовкам и текстам опубликованных постов"""
+
+    template_name = 'blog/search.html'
+
+    def get_context_data(self, **kwargs):
+        """Добавляет страницу результатов поиска по запросу ?q="""
+
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        if query:
+            try:
+                context['page_obj'] = search_posts(
+                    query, after=self.request.GET.get('after'))
+            except InvalidCursor:
+                raise Http404('Некорректный курсор страницы')
+        return context
+
+
+class SuggestView(View):
+    """Подсказки при вводе поискового запроса (JSON)"""
+
+    def get(self, request):
+        """Возвращает записи, начинающиеся с ?q=, из индекса в памяти"""
+
+        query = request.GET.get('q', '').strip()
+        results = []
+        if query:
+            results = [
+                {'type': kind, 'label': label,
+                 'url': suggestion_url(kind, ident, label)}
+                for kind, ident, label in suggestions.search(query)]
+        response = JsonResponse({'query': query, 'results': results})
+        patch_cache_control(
+            response, public=True,
+            max_age=getattr(settings, 'SUGGEST_MAX_AGE', 60))
+        return response
+
+
+class SitemapIndexView(View):
+    """
+    Индекс карт сайта.
+
+    Если команда build_sitemaps уже построила карты, индекс отдаётся
+    с диска и ссылается на сжатые файлы — без запросов к базе.
+    Иначе индекс строится по статистике разделов и кешируется.
+    """
+
+    def get(self, request):
+        """Отдаёт построенный индекс или строит его по разделам"""
+
+        path = sitemap_root() / INDEX_FILE
+        if path.exists():
+            return FileResponse(
+                open(path, 'rb'), content_type='application/xml')
+        return cached_response(request, [FEED_TAG], self.render_index)
+
+    def render_index(self):
+        """Индекс со ссылками на страницы карт, которые строятся на лету"""
+
+        entries = [
+            (self.request.build_absolute_uri(
+                reverse('blog:sitemap', args=[name, page])), lastmod)
+            for name, section in SECTIONS.items()
+            for page, (_, lastmod) in section.pages().items()]
+        return HttpResponse(
+            ''.join(iter_index_xml(entries)),
+            content_type='application/xml')
+
+
+class SitemapView(View):
+    """Страница карты сайта, которая отдаётся потоком по мере чтения"""
+
+    def get(self, request, section, page):
+        """Отдаёт адреса объектов раздела с id из диапазона страницы"""
+
+        if section not in SECTIONS:
+            raise Http404('Раздел карты сайта не найден')
+        return StreamingHttpResponse(
+            SECTIONS[section].iter_xml(
+                page, request.build_absolute_uri('/').rstrip('/')),
+            content_type='application/xml')
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ReadAfterWriteMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,11 +88,143 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite с выбором режима BEGIN для потока записи (core.writer).
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переиспользуется между запросами вместо открытия
+        # нового (и повторной настройки PRAGMA) на каждый запрос.
+        'CONN_MAX_AGE': 600,
     }
 }
 
+# Профиль PostgreSQL: BLOG_DB_ENGINE=postgresql и параметры POSTGRES_*.
+# Пул соединений — постоянные соединения Django (CONN_MAX_AGE) или
+# pgbouncer. За pgbouncer в режиме transaction курсор на сервере
+# живёт только внутри транзакции: с POSTGRES_PGBOUNCER=1 серверные
+# курсоры отключаются, выгрузки (blog.exports) открывают транзакцию сами.
+if os.getenv('BLOG_DB_ENGINE') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB', 'blogicum'),
+        'USER': os.getenv('POSTGRES_USER', 'blogicum'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': int(os.getenv('POSTGRES_CONN_MAX_AGE', '600')),
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('POSTGRES_PGBOUNCER') == '1',
+        'OPTIONS': {
+            'connect_timeout': 5,
+            # Долгий запрос не держит соединение из пула бесконечно, мс.
+            'options': '-c statement_timeout={}'.format(
+                os.getenv('POSTGRES_STATEMENT_TIMEOUT', '30000')),
+        },
+    }
+
+# Реплика для чтения (core.routers). Локально это копия db.sqlite3,
+# которую обновляет команда sync_replica; без BLOG_REPLICA_DB
+# всё читается из основной базы.
+DATABASE_REPLICAS = []
+if os.getenv('BLOG_REPLICA_DB'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        # Для SQLite — путь к файлу копии, для PostgreSQL — хост реплики.
+        ('HOST' if 'postgresql' in DATABASES['default']['ENGINE']
+         else 'NAME'): os.getenv('BLOG_REPLICA_DB'),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# С реплик читаются только модели этих приложений:
+REPLICA_APPS = ('blog',)
+# Сколько секунд после записи пользователь читает с основной базы:
+REPLICA_PIN_SECONDS = 10
+
+# Выполняются для каждого нового соединения SQLite (core.db):
+SQLITE_PRAGMAS = {
+    # Читатели не блокируются пишущей транзакцией.
+    'journal_mode': 'wal',
+    # В режиме WAL достаточно для целостности; fsync только на checkpoint.
+    'synchronous': 'normal',
+    # Ожидание блокировки писателем, мс.
+    'busy_timeout': 5000,
+    # Размер кеша страниц: отрицательное значение — в КиБ (64 МиБ).
+    'cache_size': -64000,
+    # Чтение файла базы через mmap, байт.
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+# Запись из представлений создания, правки и удаления постов
+# и комментариев идёт через единственный в процессе поток (core.writer):
+# сколько записей он фиксирует одной транзакцией и сколько секунд запрос
+# ждёт фиксации.
+# PostgreSQL допускает параллельную запись, поток нужен только SQLite.
+DB_WRITER_ENABLED = DATABASES['default']['ENGINE'].endswith('sqlite3')
+DB_WRITER_BATCH_SIZE = 50
+DB_WRITER_TIMEOUT = 30
+# Сколько строк выгрузки (blog.exports) читается из курсора за раз:
+EXPORT_CHUNK_SIZE = 2000
+# Поиск по публикациям (blog.search): результатов на странице и
+# конфигурация текстового поиска PostgreSQL (должна совпадать
+# с индексом post_search_idx).
+SEARCH_RESULTS_PER_PAGE = 10
+SEARCH_CONFIG = 'russian'
+# Подсказки при вводе запроса (blog.suggest): сколько вариантов
+# отдавать и сколько секунд браузер может кешировать ответ.
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_AGE = 60
+# Как часто процесс проверяет журнал изменений подсказок (секунды),
+# при отставании больше чем на сколько записей перестраивает индекс
+# целиком и на сколько id назад перечитывает журнал (записи
+# транзакций, зафиксированных не в порядке id).
+SUGGEST_REFRESH_SECONDS = 1
+SUGGEST_MAX_CHANGES = 500
+SUGGEST_JOURNAL_WINDOW = 100
+# Ленты RSS/Atom (blog.feeds): число постов, длина описания в словах
+# и сколько секунд агрегатор может не перезапрашивать ленту.
+FEED_ITEMS = 20
+FEED_DESCRIPTION_WORDS = 50
+FEED_MAX_AGE = 300
+# Карты сайта (blog.sitemaps): адресов на странице (не больше 50 000
+# по протоколу) и каталог в MEDIA_ROOT для файлов build_sitemaps.
+SITEMAP_PAGE_SIZE = 50000
+SITEMAP_DIR = 'sitemaps'
+# Адрес сайта для ссылок, которые строятся вне запроса:
+SITE_URL = os.getenv('BLOG_SITE_URL', 'http://127.0.0.1:8000')
+# JSON API (blog.api): записей на странице по умолчанию и максимум
+# для ?limit=, сколько секунд клиент может кешировать ответ.
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+API_MAX_AGE = 60
+
+
+# Кеш общий для всех процессов: веб-воркеров, release_posts,
+# run_workers. В нём версии меток страниц (core.cache), от которых
+# зависят кеш страниц и ETag, поэтому у каждого процесса свой
+# LocMemCache не подходит. По умолчанию — файлы в BLOG_CACHE_DIR,
+# BLOG_MEMCACHED задаёт адрес memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('BLOG_CACHE_DIR', str(BASE_DIR / 'cache')),
+        # Без срока по умолчанию: incr сохраняет значение заново,
+        # и версии меток не должны истекать.
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+if os.getenv('BLOG_MEMCACHED'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('BLOG_MEMCACHED'),
+    }
+
+# Сколько секунд хранить страницы для анонимных посетителей:
+PAGE_CACHE_TIMEOUT = 600
+# Сколько секунд хранить количество постов для постраничной навигации:
+PAGINATOR_COUNT_CACHE_TIMEOUT = 300
+# Больше этого числа постов точный COUNT(*) не выполняется:
+PAGINATOR_EXACT_COUNT_LIMIT = 100_000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -139,6 +274,15 @@ STATICFILES_DIRS = [
 ]
 
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = '/media/'
+# Загруженные файлы отдаёт core.views.serve_media. Срок кеширования
+# в браузере для файлов без хеша содержимого в имени:
+MEDIA_MAX_AGE = 3600
+# За прокси отдачу файлов можно передать ему: 'nginx' (X-Accel-Redirect
+# на internal-location MEDIA_ACCEL_REDIRECT_PREFIX) или 'apache'
+# (X-Sendfile с путём к файлу). None — отдаёт Django.
+MEDIA_SENDFILE_BACKEND = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
 
 #  AUTH_USER_MODEL = 'users.MyUser'
 
@@ -146,6 +290,52 @@ MEDIA_ROOT = BASE_DIR / 'media'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # Указываем директорию, в которую будут сохраняться файлы писем:
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+# Очередь исходящих писем (core.mail, команда send_outbox):
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_LEASE_SECONDS = 600
+# Фоновые задачи (core.tasks, команда run_workers): на сколько секунд
+# задача закрепляется за обработчиком (аренда продлевается каждую треть
+# срока, пока задача выполняется) и как часто опрашивается очередь.
+JOB_LEASE_SECONDS = 300
+JOB_POLL_INTERVAL = 1
+# Ширины уменьшенных копий фото постов (core.images) и качество сжатия:
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+IMAGE_VARIANT_QUALITY = 80
+# Файл без ссылок (core.storage) удаляется, только если его не сохраняли
+# столько секунд: загрузка того же файла успевает взять на него ссылку.
+CONTENT_BLOB_GRACE_SECONDS = 3600
+# Копии фото по запросу /media/resized/<w>x<h>/... (core.views):
+# каталог дискового кеша, его предельный размер в байтах,
+# допустимые рамки (остальные — 404) и срок кеширования в браузере.
+RESIZED_IMAGE_CACHE_DIR = BASE_DIR / 'resized_cache'
+RESIZED_IMAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESIZED_IMAGE_SIZES = [(width, width) for width in IMAGE_VARIANT_WIDTHS]
+RESIZED_IMAGE_MAX_AGE = 7 * 24 * 3600
+
+# Запросы дольше этого порога (мс) логируются вместе с выполненным SQL:
+SERVER_TIMING_SLOW_MS = 500
+# Сколько SQL-запросов одного запроса сохранять для такого лога:
+SERVER_TIMING_MAX_SQL = 100
+# Заголовок Server-Timing раскрывает число запросов и время БД, поэтому
+# всем он отдаётся только при True; иначе — лишь при DEBUG и сотрудникам.
+SERVER_TIMING_HEADER = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
 
 LOGIN_REDIRECT_URL = 'blog:index'
 
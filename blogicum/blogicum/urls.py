@@ -15,12 +15,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path, reverse_lazy
-from django.conf.urls.static import static
 from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 from django.conf.urls import handler404, handler500
 
+from core.views import resized_image, serve_media
+
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
@@ -29,6 +30,17 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('blog.urls')),
     path('pages/', include('pages.urls')),
+    path(
+        f'{settings.MEDIA_URL.lstrip("/")}resized/'
+        '<int:width>x<int:height>/<path:path>',
+        resized_image,
+        name='resized_image',
+    ),
+    path(
+        f'{settings.MEDIA_URL.lstrip("/")}<path:path>',
+        serve_media,
+        name='media',
+    ),
     path('auth/', include('django.contrib.auth.urls')),
     path(
         'auth/registration/',
@@ -39,4 +51,4 @@ urlpatterns = [
         ),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
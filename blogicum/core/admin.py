@@ -0,0 +1,7 @@
+from django.contrib import admin
+
+from .models import ContentBlob, Job, OutboxMessage
+
+admin.site.register(ContentBlob)
+admin.site.register(Job)
+admin.site.register(OutboxMessage)
@@ -0,0 +1,35 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с выбором режима начала транзакции.
+
+    Атрибут transaction_mode соединения (DEFERRED, IMMEDIATE или
+    EXCLUSIVE) задаёт, каким BEGIN открывает транзакцию
+    transaction.atomic(); None — обычный BEGIN. Так поток записи
+    (core.writer) берёт блокировку на запись сразу, не меняя режим
+    остальных соединений.
+    """
+
+    TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._transaction_mode = None
+
+    @property
+    def transaction_mode(self):
+        return self._transaction_mode
+
+    @transaction_mode.setter
+    def transaction_mode(self, mode):
+        if mode is not None and mode not in self.TRANSACTION_MODES:
+            raise ValueError(f'Неизвестный режим транзакции: {mode}')
+        self._transaction_mode = mode
+
+    def _start_transaction_under_autocommit(self):
+        if self._transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {self._transaction_mode}')
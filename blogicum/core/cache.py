@@ -0,0 +1,167 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import quote_etag
+
+TAG_KEY_PREFIX = 'page-cache:tag:'
+PAGE_KEY_PREFIX = 'page-cache:page:'
+VALUE_KEY_PREFIX = 'page-cache:value:'
+# Общая метка всех закешированных страниц.
+SITE_TAG = 'site'
+
+
+def _new_version():
+    # Версия после вытеснения метки из кеша не должна совпасть
+    # с одной из прежних, поэтому отсчёт начинается от текущего времени.
+    return time.time_ns()
+
+
+def get_tag_versions(tags):
+    """Текущие версии меток; отсутствующие метки заводятся заново"""
+
+    keys = {TAG_KEY_PREFIX + tag: tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        # Метку мог только что завести другой процесс: add не перезапишет
+        # его версию, и ETag у всех процессов совпадёт.
+        cache.add(key, _new_version(), None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Делает недействительными все страницы с любой из меток"""
+
+    for tag in set(tags):
+        try:
+            cache.incr(TAG_KEY_PREFIX + tag)
+        except ValueError:
+            # Метки нет — нет и страниц с её текущей версией: новая
+            # версия заведётся при следующем обращении.
+            pass
+
+
+def invalidate_tags_on_commit(*tags):
+    """
+    Сбрасывает метки после фиксации текущей транзакции.
+
+    До фиксации параллельный запрос видит старые данные и сохранил бы
+    страницу под новой версией метки. Вне транзакции метки
+    сбрасываются сразу.
+    """
+
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def tags_etag(request, tags):
+    """
+    Значение ETag ответа по адресу и версиям его меток.
+
+    Меняется при сбросе любой из меток (и общей метки сайта), поэтому
+    If-None-Match проверяется без обращения к базе.
+    """
+
+    versions = get_tag_versions([SITE_TAG, *tags])
+    raw = ':'.join([request.get_full_path(), *map(str, versions)])
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def page_cache_key(request, tags):
+    """Ключ страницы: путь с параметрами и версии всех её меток"""
+
+    versions = ':'.join(map(str, get_tag_versions(tags)))
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'{PAGE_KEY_PREFIX}{url}:{versions}'
+
+
+def cached_value(name, tags, get_value):
+    """
+    Значение из кеша, действительное до сброса любой из меток.
+
+    get_value вызывается только при промахе; None тоже кешируется.
+    Ключ включает версии меток, поэтому срок хранения не нужен:
+    устаревшее значение просто перестаёт читаться.
+    """
+
+    versions = ':'.join(map(str, get_tag_versions([SITE_TAG, *tags])))
+    key = f'{VALUE_KEY_PREFIX}{name}:{versions}'
+    missing = object()
+    value = cache.get(key, missing)
+    if value is missing:
+        value = get_value()
+        cache.set(key, value, None)
+    return value
+
+
+def _is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # Страница с CSRF-токеном требует выставить cookie каждому
+        # посетителю, такую страницу нельзя отдавать из кеша.
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def cached_response(request, tags, get_response):
+    """
+    Отдаёт страницу из кеша или строит и сохраняет её.
+
+    get_response вызывается только при промахе; ответ-шаблон
+    сохраняется в кеш после рендеринга.
+    """
+
+    key = page_cache_key(request, [SITE_TAG, *tags])
+    response = cache.get(key)
+    if response is not None:
+        response['X-Page-Cache'] = 'hit'
+        return response
+
+    response = get_response()
+    timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+
+    def store(rendered):
+        if _is_cacheable(request, rendered):
+            cache.set(key, rendered, timeout)
+
+    if hasattr(response, 'render') and callable(response.render):
+        response.add_post_render_callback(store)
+    else:
+        store(response)
+    response['X-Page-Cache'] = 'miss'
+    return response
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеширует страницу целиком для анонимных GET-запросов.
+
+    Авторизованным пользователям страница всегда строится заново,
+    поэтому персональная шапка сайта им не попадает из чужого кеша.
+    Представление перечисляет метки страницы в get_cache_tags(),
+    а обработчики сигналов сбрасывают их через invalidate_tags().
+    """
+
+    def get_cache_tags(self):
+        """Метки, по которым сбрасывается кеш этой страницы"""
+
+        raise NotImplementedError
+
+    def dispatch(self, request, *args, **kwargs):
+        """Отдаёт анонимным посетителям страницу из кеша"""
+
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        return cached_response(
+            request,
+            self.get_cache_tags(),
+            lambda: super(AnonymousPageCacheMixin, self).dispatch(
+                request, *args, **kwargs),
+        )
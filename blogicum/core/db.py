@@ -0,0 +1,24 @@
+import re
+
+from django.conf import settings
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Применяет SQLITE_PRAGMAS к каждому новому соединению SQLite.
+
+    В режиме WAL читатели не ждут пишущую транзакцию, а busy_timeout
+    заставляет писателя подождать освобождения блокировки вместо
+    немедленной ошибки «database is locked».
+    """
+
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not PRAGMA_NAME.match(name):
+                raise ValueError(f'Недопустимое имя PRAGMA: {name}')
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class DiskLRUCache:
+    """
+    Файловый кеш с ограничением общего размера.
+
+    Чтение обновляет время доступа файла (mtime), при переполнении
+    удаляются файлы, к которым дольше всего не обращались. Запись
+    атомарна: файл пишется во временный и переименовывается, поэтому
+    читатель не увидит недописанный файл даже из другого процесса.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size = None
+        self._size_lock = threading.Lock()
+        self._key_locks = {}
+        self._key_locks_guard = threading.Lock()
+
+    def path(self, key, suffix=''):
+        """Путь файла по ключу; ключи раскладываются по подкаталогам"""
+
+        return self.directory / key[:2] / f'{key}{suffix}'
+
+    def get(self, key, suffix=''):
+        """Путь закешированного файла или None"""
+
+        path = self.path(key, suffix)
+        try:
+            self._touch(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    @staticmethod
+    def _touch(path):
+        # Время файловой системы по умолчанию грубое (тики ядра),
+        # поэтому время доступа выставляется явно с точностью до нс.
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def put(self, key, data, suffix=''):
+        """Сохраняет данные и при необходимости вытесняет старые файлы"""
+
+        path = self.path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(tmp, path)
+        self._touch(path)
+        with self._size_lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    @contextmanager
+    def lock(self, key):
+        """
+        Блокировка ключа внутри процесса.
+
+        Параллельные запросы одного ключа ждут первый, а не строят
+        файл одновременно: после ожидания нужно снова вызвать get().
+        """
+
+        with self._key_locks_guard:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._key_locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def _files(self):
+        if not self.directory.exists():
+            return []
+        return [
+            path for path in self.directory.glob('*/*')
+            if path.is_file() and path.suffix != '.tmp'
+        ]
+
+    def _scan_size(self):
+        return sum(path.stat().st_size for path in self._files())
+
+    def _evict(self):
+        # Освобождаем с запасом, чтобы не чистить кеш на каждой записи.
+        target = self.max_bytes * 0.9
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, path in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= file_size
+        self._size = size
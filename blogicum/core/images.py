@@ -0,0 +1,140 @@
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Форматы, которые браузеры показывают без конвертации; остальное
+# (TIFF, BMP...) приводится к JPEG.
+FALLBACK_FORMATS = {'JPEG': '.jpg', 'PNG': '.png', 'GIF': '.gif'}
+
+
+def variant_name(name, width, extension):
+    """Имя уменьшенной копии рядом с оригиналом: photo_w640.webp"""
+
+    stem, _ = os.path.splitext(name)
+    return f'{stem}_w{width}{extension}'
+
+
+def variant_pattern(name):
+    """Регулярное выражение для имён копий файла name без каталога"""
+
+    stem = os.path.splitext(os.path.basename(name))[0]
+    extensions = '|'.join(sorted(
+        re.escape(extension[1:])
+        for extension in {*FALLBACK_FORMATS.values(), '.webp'}))
+    return re.compile(rf'^{re.escape(stem)}_w\d+\.(?:{extensions})$')
+
+
+def resize_to_width(image, width):
+    """Пропорционально уменьшает изображение до заданной ширины"""
+
+    height = max(round(image.height * width / image.width), 1)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def fit_within(image, width, height):
+    """Уменьшает изображение, чтобы оно поместилось в рамку; не увеличивает"""
+
+    image = image.copy()
+    image.thumbnail((width, height), Image.LANCZOS)
+    return image
+
+
+def open_image(name, storage=None):
+    """Открывает изображение из хранилища с учётом EXIF-поворота"""
+
+    storage = storage or default_storage
+    with storage.open(name) as file:
+        with Image.open(file) as original:
+            original_format = original.format
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    if image.mode == 'P':
+        image = image.convert('RGBA')
+    fallback_format = (
+        original_format if original_format in FALLBACK_FORMATS else 'JPEG')
+    return image, fallback_format
+
+
+def encode(image, image_format):
+    """Сжимает изображение в байты в нужном формате"""
+
+    quality = getattr(settings, 'IMAGE_VARIANT_QUALITY', 80)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    options = {
+        'JPEG': {'quality': quality, 'optimize': True, 'progressive': True},
+        'WEBP': {'quality': quality, 'method': 4},
+        'PNG': {'optimize': True},
+    }.get(image_format, {})
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _store(storage, name, data):
+    # Повторная генерация перезаписывает файл, а не создаёт photo_w640_abc.
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(data))
+
+
+def build_variants(name, storage=None, widths=None):
+    """
+    Строит уменьшенные копии изображения и их WebP-версии.
+
+    Копии сохраняются в хранилище рядом с оригиналом. Возвращает
+    описание для шаблона: размеры оригинала и список вариантов
+    по возрастанию ширины. Последний вариант имеет ширину оригинала
+    и ссылается на сам оригинал, для него строится только WebP.
+    """
+
+    storage = storage or default_storage
+    widths = widths or getattr(
+        settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 960))
+    image, fallback_format = open_image(name, storage)
+    extension = FALLBACK_FORMATS[fallback_format]
+    variants = []
+    for width in sorted(set(widths)):
+        if width >= image.width:
+            break
+        resized = resize_to_width(image, width)
+        variants.append({
+            'width': resized.width,
+            'height': resized.height,
+            'src': _store(
+                storage, variant_name(name, width, extension),
+                encode(resized, fallback_format)),
+            'webp': _store(
+                storage, variant_name(name, width, '.webp'),
+                encode(resized, 'WEBP')),
+        })
+    variants.append({
+        'width': image.width,
+        'height': image.height,
+        'src': name,
+        'webp': _store(
+            storage, variant_name(name, image.width, '.webp'),
+            encode(image, 'WEBP')),
+    })
+    return {
+        'width': image.width,
+        'height': image.height,
+        'variants': variants,
+    }
+
+
+def delete_variants(data, storage=None):
+    """Удаляет уменьшенные копии, кроме самого оригинала"""
+
+    storage = storage or default_storage
+    variants = (data or {}).get('variants', [])
+    for variant in variants:
+        storage.delete(variant['webp'])
+    # Последний вариант ссылается на оригинал — его не трогаем.
+    for variant in variants[:-1]:
+        storage.delete(variant['src'])
@@ -0,0 +1,120 @@
+import logging
+from datetime import timedelta
+from smtplib import SMTPException
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь вместо отправки в рамках запроса"""
+
+    return OutboxMessage.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=list(recipient_list),
+    )
+
+
+def _retry_delay(attempts):
+    # Экспоненциальная пауза: 1, 2, 4, 8... минут.
+    return timedelta(minutes=2 ** (attempts - 1))
+
+
+def _claim_batch(now, batch_size, max_attempts):
+    """Забирает пачку писем, откладывая их повтор на время отправки"""
+
+    lease = getattr(settings, 'OUTBOX_LEASE_SECONDS', 600)
+    with transaction.atomic():
+        batch = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(
+                sent_at__isnull=True,
+                next_attempt_at__lte=now,
+                attempts__lt=max_attempts)
+            .order_by('next_attempt_at')[:batch_size])
+        # Пока письма отправляются, другой обработчик их не возьмёт;
+        # если этот упадёт, письма вернутся в очередь после аренды.
+        OutboxMessage.objects.filter(pk__in=[m.pk for m in batch]).update(
+            next_attempt_at=now + timedelta(seconds=lease))
+    return batch
+
+
+def _postpone_batch(batch, now, error):
+    """
+    Возвращает в очередь пачку, которую не удалось начать отправлять.
+
+    Письма не виноваты в недоступности сервера, поэтому попытка
+    не засчитывается: повтор откладывается на паузу следующей попытки.
+    """
+
+    logger.warning('Почтовый сервер недоступен: %s', error)
+    for outgoing in batch:
+        outgoing.last_error = str(error)
+        outgoing.next_attempt_at = now + _retry_delay(outgoing.attempts + 1)
+    OutboxMessage.objects.bulk_update(batch, ['last_error', 'next_attempt_at'])
+
+
+def deliver_outbox(batch_size=None, max_attempts=None):
+    """
+    Отправляет пачку писем из очереди через одно SMTP-соединение.
+
+    Письмо, которое не удалось отправить, откладывается с растущей
+    паузой; после max_attempts попыток оно остаётся в очереди
+    с текстом ошибки и больше не отправляется. Если почтовый сервер
+    недоступен, вся пачка откладывается и возвращается 0, чтобы
+    send_outbox --loop продолжал работу.
+    Возвращает число отправленных писем.
+    """
+
+    batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', 100)
+    max_attempts = max_attempts or getattr(
+        settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+    now = timezone.now()
+    batch = _claim_batch(now, batch_size, max_attempts)
+    if not batch:
+        return 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except (OSError, SMTPException) as error:
+        _postpone_batch(batch, now, error)
+        return 0
+
+    sent = []
+    failed = []
+    with connection:
+        for outgoing in batch:
+            message = EmailMessage(
+                subject=outgoing.subject,
+                body=outgoing.body,
+                from_email=outgoing.from_email,
+                to=outgoing.recipients,
+                connection=connection,
+            )
+            outgoing.attempts += 1
+            try:
+                message.send()
+            except Exception as error:
+                logger.warning(
+                    'Не удалось отправить письмо %s: %s', outgoing.pk, error)
+                outgoing.last_error = str(error)
+                outgoing.next_attempt_at = (
+                    now + _retry_delay(outgoing.attempts))
+                failed.append(outgoing)
+            else:
+                outgoing.sent_at = timezone.now()
+                sent.append(outgoing)
+    with transaction.atomic():
+        OutboxMessage.objects.bulk_update(sent, ['attempts', 'sent_at'])
+        OutboxMessage.objects.bulk_update(
+            failed, ['attempts', 'last_error', 'next_attempt_at'])
+    return len(sent)
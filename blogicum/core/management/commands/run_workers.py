@@ -0,0 +1,67 @@
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from core.tasks import claim_job, run_job, worker_id
+
+
+class Command(BaseCommand):
+    help = ('Запускает пул потоков, выполняющих фоновые задачи '
+            'из очереди core.tasks')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument(
+            '--poll-interval', type=float,
+            help='Пауза между опросами пустой очереди в секундах.')
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, как только очередь опустеет.')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+        interval = options['poll_interval']
+        if interval is None:
+            interval = getattr(settings, 'JOB_POLL_INTERVAL', 1)
+        threads = [
+            threading.Thread(
+                target=self._work, args=(interval, options['burst']),
+                name=f'worker-{number}')
+            for number in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                # join с таймаутом, чтобы Ctrl+C доходил до главного потока.
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            self.stdout.write('Завершаем текущие задачи...')
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write(f'Выполнено задач: {self.processed}')
+
+    def _work(self, interval, burst):
+        """Цикл одного обработчика: забрать задачу, выполнить, повторить"""
+
+        worker = worker_id()
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim_job(worker)
+                if job is None:
+                    if burst:
+                        return
+                    self.stop.wait(interval)
+                    continue
+                run_job(job)
+                with self.lock:
+                    self.processed += 1
+        finally:
+            connection.close()
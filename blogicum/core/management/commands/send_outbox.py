@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.')
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = deliver_outbox(batch_size=options['batch_size'])
+            while sent:
+                self.stdout.write(f'Отправлено писем: {sent}')
+                sent = deliver_outbox(batch_size=options['batch_size'])
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import replica_synced
+
+
+def copy_sqlite_database(source, target_path):
+    """Копирует базу SQLite через backup API в файл target_path"""
+
+    target = sqlite3.connect(str(target_path))
+    try:
+        # Копия одним шагом — согласованный снимок; в режиме WAL
+        # он не блокирует писателей основной базы.
+        source.backup(target)
+    finally:
+        target.close()
+    # Время изменения файла — отметка обновления для веб-процессов
+    # (core.routers.ReplicaWatcher); в режиме WAL сама копия могла
+    # остаться в журнале, не изменив основной файл.
+    os.utime(target_path)
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в реплики DATABASE_REPLICAS '
+            '(для проверки маршрутизации чтения локально)')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а копировать каждые --interval с.')
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if primary.vendor != 'sqlite':
+            raise CommandError('Копирование поддерживается только для SQLite.')
+        if not replicas:
+            raise CommandError('Реплики не настроены (DATABASE_REPLICAS).')
+        while True:
+            started = time.monotonic()
+            primary.ensure_connection()
+            for alias in replicas:
+                copy_sqlite_database(
+                    primary.connection, settings.DATABASES[alias]['NAME'])
+            replica_synced.send(sender=self.__class__, replicas=replicas)
+            self.stdout.write(
+                f'Реплики обновлены за {time.monotonic() - started:.2f} с')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,177 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .routers import pin_to_primary, replica_watcher
+
+logger = logging.getLogger('core.timing')
+
+
+class RequestTiming:
+    """Счётчики времени одного запроса"""
+
+    def __init__(self, max_sql):
+        self.started = time.perf_counter()
+        self.max_sql = max_sql
+        self.queries = 0
+        self.db = 0.0
+        self.sql = []
+        self.view_started = None
+        self.view_finished = None
+        self.render_started = None
+        self.render_finished = None
+
+    def execute(self, execute, sql, params, many, context):
+        """Обёртка cursor.execute, считающая запросы и их время"""
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db += duration
+            if len(self.sql) < self.max_sql:
+                self.sql.append((round(duration * 1000, 2), sql))
+
+    @staticmethod
+    def _span(start, end):
+        if start is None or end is None:
+            return None
+        return (end - start) * 1000
+
+    def metrics(self, finished):
+        """Длительности в миллисекундах; None — этап не выполнялся"""
+
+        return {
+            'db': self.db * 1000,
+            'view': self._span(
+                self.view_started, self.view_finished or finished),
+            'tpl': self._span(self.render_started, self.render_finished),
+            'total': (finished - self.started) * 1000,
+        }
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет время БД, представления и рендеринга шаблона.
+
+    Результат пишется в лог `core.timing` одной JSON-строкой и
+    отдаётся в заголовке Server-Timing: всем при SERVER_TIMING_HEADER,
+    иначе только при DEBUG и сотрудникам. Запросы дольше
+    SERVER_TIMING_SLOW_MS логируются с предупреждением и списком SQL.
+    Миддлварь должна стоять первой в MIDDLEWARE, чтобы её
+    process_template_response вызывался непосредственно перед рендерингом.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SERVER_TIMING_SLOW_MS', 500)
+        self.max_sql = getattr(settings, 'SERVER_TIMING_MAX_SQL', 100)
+
+    def __call__(self, request):
+        timing = request.timing = RequestTiming(self.max_sql)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing.execute))
+            response = self.get_response(request)
+        metrics = timing.metrics(time.perf_counter())
+        if self._show_header(request):
+            response['Server-Timing'] = self._header(metrics, timing.queries)
+        self._log(request, response, timing, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = request.timing
+        timing.view_finished = timing.render_started = time.perf_counter()
+
+        def render_finished(rendered):
+            timing.render_finished = time.perf_counter()
+
+        response.add_post_render_callback(render_finished)
+        return response
+
+    @staticmethod
+    def _show_header(request):
+        if settings.DEBUG or getattr(settings, 'SERVER_TIMING_HEADER', False):
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_staff)
+
+    @staticmethod
+    def _header(metrics, queries):
+        parts = []
+        for name, duration in metrics.items():
+            if duration is None:
+                continue
+            part = f'{name};dur={duration:.1f}'
+            if name == 'db':
+                part += f';desc="{queries} queries"'
+            parts.append(part)
+        return ', '.join(parts)
+
+    def _log(self, request, response, timing, metrics):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timing.queries,
+            **{
+                f'{name}_ms': round(duration, 1)
+                for name, duration in metrics.items()
+                if duration is not None
+            },
+        }
+        if metrics['total'] < self.slow_ms:
+            logger.info(json.dumps(record, ensure_ascii=False))
+            return
+        record['sql'] = timing.sql
+        logger.warning(json.dumps(record, ensure_ascii=False))
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Закрепляет чтение пользователя за основной базой после записи.
+
+    Успешный POST (создание или правка поста, комментария) ставит
+    cookie на REPLICA_PIN_SECONDS: пока она жива, запросы читают
+    с основной базы и пользователь сразу видит свои изменения,
+    даже если реплика ещё не обновилась. Перед каждым запросом
+    проверяется, не обновила ли реплики команда sync_replica.
+    """
+
+    COOKIE_NAME = 'pin_primary'
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if getattr(settings, 'DATABASE_REPLICAS', []):
+            replica_watcher.check()
+        writing = request.method not in self.SAFE_METHODS
+        pinned = writing or self._pinned_until(request) > time.time()
+        if pinned:
+            with pin_to_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        if writing and response.status_code < 400:
+            seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+            response.set_cookie(
+                self.COOKIE_NAME, str(int(time.time() + seconds)),
+                max_age=seconds, httponly=True, samesite='Lax')
+        return response
+
+    def _pinned_until(self, request):
+        try:
+            return int(request.COOKIES.get(self.COOKIE_NAME, 0))
+        except ValueError:
+            return 0
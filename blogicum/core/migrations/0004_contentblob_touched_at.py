@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-17 09:24
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_contentblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentblob',
+            name='touched_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Последнее сохранение'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class PublishedCreatedModel(models.Model):
@@ -16,3 +17,203 @@ class PublishedCreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class OutboxMessage(models.Model):
+    """Письмо в очереди на отправку"""
+
+    subject = models.CharField(
+        max_length=256,
+        verbose_name='Тема'
+    )
+    body = models.TextField(
+        verbose_name='Текст'
+    )
+    from_email = models.CharField(
+        max_length=256,
+        verbose_name='Отправитель'
+    )
+    recipients = models.JSONField(
+        verbose_name='Получатели'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+
+    class Meta:
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        """Строковое представление письма"""
+
+        return self.subject
+
+
+class Job(models.Model):
+    """Фоновая задача в очереди core.tasks"""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=128,
+        verbose_name='Задача'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Аргументы'
+    )
+    priority = models.SmallIntegerField(
+        default=0,
+        verbose_name='Приоритет',
+        help_text='Задачи с большим приоритетом выполняются раньше.'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+        verbose_name='Максимум попыток'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Не раньше'
+    )
+    locked_by = models.CharField(
+        max_length=128,
+        blank=True,
+        verbose_name='Обработчик'
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Аренда до'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Начало выполнения'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Окончание выполнения'
+    )
+    wait_ms = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Ожидание в очереди, мс'
+    )
+    duration_ms = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Длительность, мс'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(
+                fields=['-priority', 'run_after', 'id'],
+                condition=models.Q(status='queued'),
+                name='job_queued_idx',
+            ),
+            models.Index(
+                fields=['locked_until'],
+                condition=models.Q(status='running'),
+                name='job_running_idx',
+            ),
+        ]
+
+    def __str__(self):
+        """Строковое представление задачи"""
+
+        return f'{self.name} #{self.pk}'
+
+
+class ContentBlob(models.Model):
+    """Файл в хранилище по содержимому и число ссылок на него"""
+
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Имя файла'
+    )
+    size = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Размер, байт'
+    )
+    refcount = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Ссылок'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    touched_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Последнее сохранение'
+    )
+
+    class Meta:
+        verbose_name = 'файл по содержимому'
+        verbose_name_plural = 'Файлы по содержимому'
+
+    def __str__(self):
+        """Строковое представление файла"""
+
+        return self.name
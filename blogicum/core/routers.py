@@ -0,0 +1,111 @@
+import os
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.dispatch import Signal
+
+# Реплики обновлены командой sync_replica: закешированное по старым
+# данным нужно сбросить. Команда отправляет сигнал в своём процессе,
+# веб-процессы — сами, заметив обновление (ReplicaWatcher).
+replica_synced = Signal()
+
+_pinned = ContextVar('pinned_to_primary', default=False)
+
+
+def is_pinned():
+    """Читает ли текущий запрос только с основной базы"""
+
+    return _pinned.get()
+
+
+@contextmanager
+def pin_to_primary():
+    """Направляет все чтения внутри блока в основную базу"""
+
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись — в основную базу, чтение — в случайную реплику.
+
+    На реплики уходит только чтение моделей из REPLICA_APPS: сессии,
+    пользователи и очереди core читаются с основной базы, иначе
+    вход на сайт или захват задачи видели бы устаревшие данные.
+    Чтение остаётся на основной базе и внутри транзакции, и пока
+    запрос закреплён за ней (см. ReadAfterWriteMiddleware).
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if (not replicas
+                or model._meta.app_label not in settings.REPLICA_APPS
+                or is_pinned()
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными при синхронизации.
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaWatcher:
+    """
+    Замечает в текущем процессе, что sync_replica обновила реплики.
+
+    Сигнал команды не доходит до веб-процессов, а индекс подсказок
+    у каждого процесса свой. Поэтому процесс сравнивает время изменения
+    файлов реплик SQLite с запомненным и, увидев новое, сам отправляет
+    replica_synced. Первая проверка только запоминает состояние.
+    """
+
+    def __init__(self):
+        self._generation = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def generation():
+        """Времена изменения файлов реплик SQLite"""
+
+        stamps = []
+        for alias in getattr(settings, 'DATABASE_REPLICAS', []):
+            database = settings.DATABASES[alias]
+            if not database['ENGINE'].endswith('sqlite3'):
+                continue
+            try:
+                stamps.append(os.stat(database['NAME']).st_mtime_ns)
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def check(self):
+        """Отправляет replica_synced, если реплики обновились"""
+
+        generation = self.generation()
+        with self._lock:
+            if generation == self._generation:
+                return
+            previous, self._generation = self._generation, generation
+        if previous is not None:
+            replica_synced.send(
+                sender=self.__class__,
+                replicas=getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+replica_watcher = ReplicaWatcher()
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import posixpath
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+from .models import ContentBlob
+
+CHUNK_SIZE = 64 * 1024
+# Имя по содержимому: ab/cd/abcd...; файлы, чьё имя уже начинается
+# с хеша (копии <sha256>_w640.jpg), производны от него и сохраняются
+# под своим именем.
+DIGEST_NAME = re.compile(
+    r'(?:^|/)(?P<a>[0-9a-f]{2})/(?P<b>[0-9a-f]{2})/(?P=a)(?P=b)[0-9a-f]{60}')
+
+
+def file_digest(content):
+    """SHA-256 содержимого файла, прочитанного порциями"""
+
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, где имя файла — хеш его содержимого.
+
+    Файл upload_to/photo.jpg сохраняется как upload_to/ab/cd/<sha256>.jpg;
+    если такой файл уже есть, повторно он не записывается. Одинаковые
+    загрузки получают одно имя, поэтому и браузер кеширует их один раз.
+    Сколько записей ссылается на файл, учитывают acquire_blob()
+    и release_blob(); сохранение отмечается в ContentBlob.touched_at,
+    чтобы файл, который снова загрузили, не удалили до acquire_blob().
+    """
+
+    def save(self, name, content, max_length=None):
+        """Сохраняет файл под именем по хешу содержимого"""
+
+        if name is None:
+            name = content.name
+        if DIGEST_NAME.search(name.replace('\\', '/')):
+            return super().save(name, content, max_length)
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = file_digest(content)
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        name = posixpath.join(
+            directory, digest[:2], digest[2:4], f'{digest}{extension}')
+        # Сначала отметка, потом проверка: удаление файла без ссылок
+        # идёт в одной транзакции с удалением его записи, поэтому файл
+        # либо ещё не удалён и уже защищён, либо уже удалён целиком.
+        touch_blob(name, content.size)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+
+def grace_cutoff():
+    """Файлы, сохранённые раньше этого момента, можно удалять"""
+
+    return timezone.now() - timedelta(
+        seconds=getattr(settings, 'CONTENT_BLOB_GRACE_SECONDS', 3600))
+
+
+def touch_blob(name, size=0):
+    """Отмечает сохранение файла: сборщик пока его не удалит"""
+
+    now = timezone.now()
+    if not ContentBlob.objects.filter(name=name).update(touched_at=now):
+        ContentBlob.objects.get_or_create(
+            name=name, defaults={'size': size, 'touched_at': now})
+
+
+def acquire_blob(name, storage):
+    """Учитывает ещё одну запись, ссылающуюся на файл"""
+
+    try:
+        size = storage.size(name)
+    except OSError:
+        # Запись может ссылаться на файл, которого уже нет на диске.
+        size = 0
+    blob, _ = ContentBlob.objects.get_or_create(
+        name=name, defaults={'size': size})
+    ContentBlob.objects.filter(pk=blob.pk).update(
+        refcount=F('refcount') + 1)
+
+
+def release_blob(name, storage, on_collect=None):
+    """
+    Снимает ссылку на файл; без ссылок файл удаляется.
+
+    Удаление выполняется после фиксации транзакции (collect_blob)
+    и только если файл за CONTENT_BLOB_GRACE_SECONDS не сохраняли
+    снова; иначе его удалит команда collect_image_blobs. on_collect
+    вызывается перед удалением файла, например, чтобы удалить его копии.
+    Возвращает True, если ссылок на файл не осталось.
+    """
+
+    ContentBlob.objects.filter(name=name, refcount__gt=0).update(
+        refcount=F('refcount') - 1)
+    if not ContentBlob.objects.filter(name=name, refcount=0).exists():
+        return False
+    transaction.on_commit(lambda: collect_blob(name, storage, on_collect))
+    return True
+
+
+def collect_blob(name, storage, on_collect=None):
+    """
+    Удаляет файл без ссылок, давно не сохранявшийся.
+
+    Запись и файл удаляются в одной транзакции: сохранение того же
+    файла (touch_blob) ждёт её фиксации и затем записывает файл заново.
+    Возвращает True, если файл удалён.
+    """
+
+    with transaction.atomic():
+        collected, _ = ContentBlob.objects.filter(
+            name=name, refcount=0, touched_at__lt=grace_cutoff()).delete()
+        if collected:
+            if on_collect is not None:
+                on_collect()
+            storage.delete(name)
+    return bool(collected)
+
+
+post_image_storage = ContentAddressedStorage()
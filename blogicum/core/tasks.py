@@ -0,0 +1,241 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .mail import deliver_outbox
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name):
+    """Регистрирует функцию как фоновую задачу с указанным именем"""
+
+    def register(func):
+        _registry[name] = func
+        return func
+    return register
+
+
+def enqueue(name, payload=None, priority=0, delay=None, max_attempts=3):
+    """Ставит задачу в очередь; payload передаётся в функцию как kwargs"""
+
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def worker_id():
+    """Имя обработчика: хост, процесс и поток"""
+
+    return (f'{socket.gethostname()}:{os.getpid()}:'
+            f'{threading.current_thread().name}')
+
+
+def _claimable(now):
+    # Задачи в очереди и задачи, чья аренда истекла (обработчик упал).
+    return (
+        Q(status=Job.QUEUED, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_until__lt=now)
+    )
+
+
+def _lease(seconds=None):
+    return timedelta(seconds=seconds or getattr(
+        settings, 'JOB_LEASE_SECONDS', 300))
+
+
+def claim_job(worker, lease_seconds=None):
+    """
+    Забирает самую приоритетную готовую задачу.
+
+    Захват — условный UPDATE по id кандидата: если другой обработчик
+    успел раньше, UPDATE не изменит строк и берётся следующий кандидат.
+    Блокировок на время выбора не требуется, поэтому схема работает
+    и в SQLite между процессами. Повторный захват задачи с истёкшей
+    арендой тоже считается попыткой: если попытки исчерпаны, задача
+    отмечается как упавшая и не выполняется.
+    """
+
+    for _ in range(5):
+        now = timezone.now()
+        candidate = (
+            Job.objects.filter(_claimable(now))
+            .order_by('-priority', 'run_after', 'id')
+            .values_list('pk', flat=True)
+            .first())
+        if candidate is None:
+            return None
+        claimed = Job.objects.filter(_claimable(now), pk=candidate).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            locked_until=now + _lease(lease_seconds),
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if not claimed:
+            continue
+        job = Job.objects.get(pk=candidate)
+        if job.attempts <= job.max_attempts:
+            return job
+        _finish(job, Job.FAILED, 'Аренда задачи истекла: обработчик упал '
+                                 'или завис на последней попытке.')
+        logger.error('Задача %s исчерпала попытки', job)
+    return None
+
+
+class Heartbeat:
+    """
+    Продлевает аренду выполняемой задачи.
+
+    Пока задача выполняется, фоновый поток раз в треть срока аренды
+    сдвигает locked_until, поэтому долгая задача не достаётся другому
+    обработчику. Продление условное: если задачу уже перехватили,
+    оно ничего не меняет.
+    """
+
+    def __init__(self, job, lease_seconds=None):
+        self.job = job
+        self.lease = _lease(lease_seconds)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, name=f'heartbeat-{job.pk}', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        try:
+            while not self.stopped.wait(self.lease.total_seconds() / 3):
+                try:
+                    _owned(self.job).update(
+                        locked_until=timezone.now() + self.lease)
+                except Exception:
+                    logger.exception(
+                        'Не удалось продлить аренду задачи %s', self.job)
+        finally:
+            connections.close_all()
+
+
+def _owned(job):
+    # Строка задачи, пока её держит захвативший обработчик: повторный
+    # захват меняет locked_by или увеличивает attempts.
+    return Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by,
+        attempts=job.attempts)
+
+
+def _finish(job, status, error=''):
+    job.status = status
+    job.last_error = error
+    job.finished_at = timezone.now()
+    job.locked_until = None
+    return _owned(job).update(
+        status=job.status, last_error=job.last_error,
+        finished_at=job.finished_at, locked_until=None)
+
+
+def _retry_delay(attempts):
+    # Экспоненциальная пауза: 2, 4, 8... секунд.
+    return timedelta(seconds=2 ** attempts)
+
+
+def _save_result(job, retries=3):
+    """
+    Записывает итог задачи, пока она за этим обработчиком.
+
+    Задача уже выполнена, поэтому занятая база не должна терять
+    результат: запись повторяется с короткой паузой. Иначе задача
+    осталась бы «выполняющейся» и после аренды запустилась бы снова.
+    """
+
+    for attempt in range(1, retries + 1):
+        try:
+            return _owned(job).update(
+                status=job.status, run_after=job.run_after,
+                last_error=job.last_error, finished_at=job.finished_at,
+                wait_ms=job.wait_ms, duration_ms=job.duration_ms,
+                locked_until=None)
+        except OperationalError:
+            if attempt == retries:
+                raise
+            time.sleep(0.05 * attempt)
+
+
+def run_job(job):
+    """
+    Выполняет задачу и записывает результат и время выполнения.
+
+    Пока задача выполняется, её аренда продлевается. Результат
+    записывается, только если задача всё ещё за этим обработчиком:
+    если аренду перехватили, итог пишет новый владелец.
+    """
+
+    func = _registry.get(job.name)
+    started = time.perf_counter()
+    job.wait_ms = (job.started_at - job.run_after).total_seconds() * 1000
+    try:
+        if func is None:
+            raise LookupError(f'Задача {job.name} не зарегистрирована')
+        with Heartbeat(job):
+            func(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + _retry_delay(job.attempts)
+        else:
+            job.status = Job.FAILED
+        logger.exception('Задача %s завершилась ошибкой', job)
+    else:
+        job.status = Job.DONE
+        job.last_error = ''
+    job.finished_at = timezone.now()
+    job.duration_ms = (time.perf_counter() - started) * 1000
+    job.locked_until = None
+    if not _save_result(job):
+        logger.warning(
+            'Аренду задачи %s перехватили, результат не записан', job)
+    return job
+
+
+def run_pending(worker=None, limit=None):
+    """Выполняет готовые задачи, пока очередь не опустеет"""
+
+    worker = worker or worker_id()
+    done = 0
+    while limit is None or done < limit:
+        job = claim_job(worker)
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
+
+
+@task('core.deliver_outbox')
+def deliver_outbox_task(batch_size=None):
+    """Отправляет накопившиеся письма из очереди исходящих"""
+
+    while deliver_outbox(batch_size=batch_size):
+        pass
@@ -0,0 +1,265 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+from PIL import UnidentifiedImageError
+
+from .disk_cache import DiskLRUCache
+from .images import FALLBACK_FORMATS, encode, fit_within, open_image
+from .storage import DIGEST_NAME
+
+# Уменьшать разрешено только загруженные фото постов.
+RESIZABLE_PREFIX = 'post_images/'
+
+
+@lru_cache(maxsize=None)
+def _resize_cache(directory, max_bytes):
+    return DiskLRUCache(directory, max_bytes)
+
+
+def get_resize_cache():
+    """Дисковый кеш уменьшенных копий из настроек"""
+
+    return _resize_cache(
+        str(settings.RESIZED_IMAGE_CACHE_DIR),
+        settings.RESIZED_IMAGE_CACHE_MAX_BYTES)
+
+
+def _source_name(path):
+    name = posixpath.normpath(path)
+    if name != path or not name.startswith(RESIZABLE_PREFIX):
+        raise Http404('Изображение не найдено')
+    return name
+
+
+def _check_size(width, height):
+    """Разрешены только рамки из RESIZED_IMAGE_SIZES"""
+
+    if (width, height) not in set(map(tuple, settings.RESIZED_IMAGE_SIZES)):
+        raise Http404('Недопустимый размер')
+
+
+def _resize_key(width, height, name):
+    """Ключ копии: исходный файл, время его изменения и размер рамки"""
+
+    try:
+        modified = default_storage.get_modified_time(name)
+    except FileNotFoundError:
+        raise Http404('Изображение не найдено')
+    raw = f'{name}|{modified.timestamp()}|{width}x{height}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _suffix(name):
+    extension = posixpath.splitext(name)[1].lower()
+    if extension == '.jpeg':
+        return '.jpg'
+    return extension if extension in FALLBACK_FORMATS.values() else '.jpg'
+
+
+def _open_resized(cache, key, name, width, height):
+    """Открывает копию из кеша; при промахе её строит один поток"""
+
+    suffix = _suffix(name)
+    for _ in range(2):
+        path = cache.get(key, suffix)
+        if path is None:
+            with cache.lock(key):
+                path = cache.get(key, suffix)
+                if path is None:
+                    try:
+                        image, image_format = open_image(name)
+                    except (FileNotFoundError, UnidentifiedImageError):
+                        raise Http404('Изображение не найдено')
+                    path = cache.put(
+                        key,
+                        encode(fit_within(image, width, height), image_format),
+                        suffix)
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            # Копию успели вытеснить между проверкой и чтением.
+            continue
+    raise Http404('Изображение не найдено')
+
+
+@require_safe
+def resized_image(request, width, height, path):
+    """
+    Уменьшенная копия фото, вписанная в рамку width x height.
+
+    Копия строится при первом запросе и хранится в дисковом кеше
+    с вытеснением давно не запрашиваемых файлов. Рамки ограничены
+    списком RESIZED_IMAGE_SIZES, чтобы перебором размеров нельзя было
+    заполнить кеш и нагрузить сервер.
+    """
+
+    _check_size(width, height)
+    name = _source_name(path)
+    key = _resize_key(width, height, name)
+    etag = quote_etag(key)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        file = _open_resized(get_resize_cache(), key, name, width, height)
+        response = FileResponse(
+            file, content_type=mimetypes.guess_type(file.name)[0])
+    response['ETag'] = etag
+    patch_cache_control(
+        response, public=True,
+        max_age=getattr(settings, 'RESIZED_IMAGE_MAX_AGE', 86400))
+    return response
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Год — максимум, который имеет смысл указывать в max-age.
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _media_path(path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, posixpath.normpath(path))
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден')
+    return full_path
+
+
+def parse_range(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном.
+
+    Возвращает (начало, длина), None — отдать файл целиком (заголовка
+    нет или диапазонов несколько), ValueError — диапазон вне файла.
+    """
+
+    match = RANGE_RE.match(header or '')
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = min(int(end), size)
+        if not length:
+            raise ValueError('Пустой диапазон')
+        return size - length, length
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError('Диапазон вне файла')
+    return start, end - start + 1
+
+
+def _read_range(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _delegated_response(full_path, path):
+    """Ответ, который отдаст сам прокси по X-Accel-Redirect/X-Sendfile"""
+
+    backend = getattr(settings, 'MEDIA_SENDFILE_BACKEND', None)
+    if backend is None:
+        return None
+    response = HttpResponse()
+    if backend == 'nginx':
+        prefix = getattr(
+            settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix + path
+    else:
+        response['X-Sendfile'] = full_path
+    # Тип файла определит прокси.
+    del response['Content-Type']
+    return response
+
+
+def _file_response(request, full_path, size, etag, last_modified):
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+    try:
+        requested = parse_range(request.META.get('HTTP_RANGE'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if requested is None or not _if_range_matches(
+            request, etag, last_modified):
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, length = requested
+        response = StreamingHttpResponse(
+            _read_range(open(full_path, 'rb'), start, length),
+            status=206, content_type=content_type)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = (
+            f'bytes {start}-{start + length - 1}/{size}')
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Отдаёт загруженный файл из MEDIA_ROOT.
+
+    Поддерживает условные запросы (ETag, If-Modified-Since) и Range
+    с одним диапазоном. Файлы с хешем содержимого в имени кешируются
+    браузером навсегда. Файл целиком отдаётся через FileResponse:
+    WSGI-сервер с wsgi.file_wrapper передаёт его через os.sendfile
+    без копирования в Python. За прокси отдачу можно передать ему,
+    указав MEDIA_SENDFILE_BACKEND.
+    """
+
+    full_path = _media_path(path)
+    stat = os.stat(full_path)
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _delegated_response(full_path, path)
+    if response is None:
+        response = _file_response(request, full_path, stat.st_size, etag,
+                                  last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if DIGEST_NAME.search(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(
+            response, public=True,
+            max_age=getattr(settings, 'MEDIA_MAX_AGE', 3600))
+    return response
@@ -0,0 +1,188 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import HttpResponse, HttpResponseRedirect
+
+logger = logging.getLogger(__name__)
+
+
+class _Write:
+    __slots__ = ('func', 'args', 'kwargs', 'future')
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class WriteTimeout(Exception):
+    """Запись не зафиксирована за DB_WRITER_TIMEOUT секунд"""
+
+    def __init__(self, started):
+        self.started = started
+        super().__init__(
+            'Изменения ещё сохраняются: обновите страницу через несколько '
+            'секунд.' if started else
+            'Сервер перегружен, изменения не сохранены. Попробуйте ещё раз.')
+
+
+class DatabaseWriter:
+    """
+    Единственный в процессе поток, выполняющий запись в базу.
+
+    Записи из разных запросов ставятся в очередь и выполняются пачкой
+    в одной транзакции: каждая — в своей точке сохранения, так что
+    ошибка одной записи не отменяет остальные. Результат (например,
+    сохранённый объект) возвращается вызывающему после фиксации
+    транзакции.
+    """
+
+    def __init__(self, batch_size=None, timeout=None):
+        self.batch_size = batch_size or getattr(
+            settings, 'DB_WRITER_BATCH_SIZE', 50)
+        self.timeout = timeout or getattr(settings, 'DB_WRITER_TIMEOUT', 30)
+        self.batches = 0
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, func, *args, **kwargs):
+        """Ставит запись в очередь и возвращает Future с её результатом"""
+
+        self._ensure_thread()
+        item = _Write(func, args, kwargs)
+        self._queue.put(item)
+        return item.future
+
+    def run(self, func, *args, **kwargs):
+        """Выполняет запись в потоке записи и ждёт её фиксации"""
+
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            # Ещё не начатая запись отменяется, чтобы не выполниться после
+            # ответа пользователю; начатая будет зафиксирована.
+            raise WriteTimeout(started=not future.cancel())
+
+    def _ensure_thread(self):
+        # После fork (например, gunicorn --preload) поток не наследуется.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.SimpleQueue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._loop, name='db-writer', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        if connection.vendor == 'sqlite':
+            # Блокировка на запись берётся сразу при BEGIN: иначе две
+            # транзакции, начавшие с чтения, не смогут повысить блокировку
+            # и одна получит «database is locked» без ожидания busy_timeout.
+            connection.transaction_mode = 'IMMEDIATE'
+        while True:
+            self._write_batch(self._next_batch())
+
+    def _write_batch(self, batch):
+        """Выполняет пачку записей в одной транзакции"""
+
+        try:
+            close_old_connections()
+            with transaction.atomic():
+                outcomes = [
+                    self._write_one(item) for item in batch
+                    if item.future.set_running_or_notify_cancel()]
+        except Exception as error:
+            logger.exception('Не удалось зафиксировать пачку записей')
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(error)
+            return
+        finally:
+            self.batches += 1
+        for item, result, error in outcomes:
+            if error is None:
+                item.future.set_result(result)
+            else:
+                item.future.set_exception(error)
+
+    @staticmethod
+    def _write_one(item):
+        """Выполняет запись в своей точке сохранения"""
+
+        try:
+            with transaction.atomic():
+                return item, item.func(*item.args, **item.kwargs), None
+        except Exception as error:
+            return item, None, error
+
+
+_writer = DatabaseWriter()
+
+
+def write(func, *args, **kwargs):
+    """
+    Выполняет запись func(*args, **kwargs) через поток записи.
+
+    Внутри уже открытой транзакции (и при DB_WRITER_ENABLED = False)
+    запись выполняется сразу в текущем потоке: поток записи не видит
+    незафиксированных данных вызывающего.
+    """
+
+    if (not getattr(settings, 'DB_WRITER_ENABLED', True)
+            or connection.in_atomic_block):
+        with transaction.atomic():
+            return func(*args, **kwargs)
+    return _writer.run(func, *args, **kwargs)
+
+
+class SerializedWriteMixin:
+    """
+    Сохраняет форму или удаляет объект через поток записи.
+
+    Если запись не успела зафиксироваться за DB_WRITER_TIMEOUT,
+    пользователь видит форму с сообщением, а при удалении — ответ 503.
+    """
+
+    def form_valid(self, form):
+        """Сохраняет объект и перенаправляет на success_url"""
+
+        try:
+            self.object = write(form.save)
+        except WriteTimeout as error:
+            form.add_error(None, str(error))
+            return self.form_invalid(form)
+        return HttpResponseRedirect(self.get_success_url())
+
+    def delete(self, request, *args, **kwargs):
+        """Удаляет объект и перенаправляет на success_url"""
+
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        try:
+            write(self.object.delete)
+        except WriteTimeout as error:
+            response = HttpResponse(str(error), status=503)
+            response['Retry-After'] = '5'
+            return response
+        return HttpResponseRedirect(success_url)
@@ -0,0 +1,61 @@
+import os
+import random
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+N_BULK_USERS = int(os.environ.get("BLOG_BULK_USERS", 30))
+N_BULK_POSTS = int(os.environ.get("BLOG_BULK_POSTS", 3000))
+N_BULK_COMMENTS = int(os.environ.get("BLOG_BULK_COMMENTS", 6000))
+
+
+@pytest.fixture
+def large_dataset():
+    # Возвращает один видимый пост, от которого строятся адреса страниц.
+    from blog.models import Category, Comment, Location, Post
+    from blog.scheduler import release_due_posts
+
+    rnd = random.Random(0)
+    now = timezone.now()
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f"user{i}") for i in range(N_BULK_USERS)
+    )
+    Category.objects.bulk_create(
+        Category(title=f"Категория {i}", slug=f"category-{i}",
+                 description="", is_published=i != 0)
+        for i in range(8)
+    )
+    Location.objects.bulk_create(
+        Location(name=f"Место {i}") for i in range(10)
+    )
+    # SQLite не возвращает id после bulk_create, перечитываем объекты.
+    users = list(User.objects.all())
+    categories = list(Category.objects.all())
+    locations = list(Location.objects.all())
+    Post.objects.bulk_create(
+        Post(
+            title=f"Пост {i}",
+            text="Текст",
+            pub_date=now - timedelta(minutes=rnd.randint(-1000, 10 ** 6)),
+            is_published=rnd.random() > 0.1,
+            author=rnd.choice(users),
+            category=rnd.choice(categories),
+            location=rnd.choice(locations),
+        )
+        for i in range(N_BULK_POSTS)
+    )
+    release_due_posts()
+    posts = list(Post.objects.only("id"))
+    Comment.objects.bulk_create(
+        Comment(text="Комментарий", post=rnd.choice(posts),
+                author=rnd.choice(users))
+        for _ in range(N_BULK_COMMENTS)
+    )
+    Post.objects.rebuild_comment_counts()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return Post.objects.visible().first()
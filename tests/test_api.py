@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category):
+    now = timezone.now()
+    posts = [
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=True, location=None,
+            pub_date=now - timedelta(hours=number))
+        for number in range(1, 6)
+    ]
+    hidden = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, pub_date=now - timedelta(hours=1))
+    return posts, hidden
+
+
+def _collect(client, url, **params):
+    ids, pages = [], 0
+    while url:
+        data = client.get(url, params).json()
+        params = {}
+        ids += [item["id"] for item in data["results"]]
+        url, pages = data["next"], pages + 1
+    return ids, pages
+
+
+def test_posts_paginated_by_cursor(client, api_posts):
+    posts, hidden = api_posts
+    ids, pages = _collect(client, "/api/posts/", limit=2)
+    assert ids == [post.pk for post in posts], (
+        "Убедитесь, что API отдаёт видимые посты от новых к старым."
+    )
+    assert pages == 3
+
+
+def test_sparse_fields_and_errors(client, api_posts):
+    data = client.get("/api/posts/", {"fields": "title,author"}).json()
+    assert set(data["results"][0]) == {"title", "author"}
+    response = client.get("/api/posts/", {"fields": "password"})
+    assert response.status_code == 400
+    response = client.get("/api/posts/", {"after": "!!"})
+    assert response.status_code == 400
+
+
+def test_posts_serialized_without_models(client, api_posts):
+    from blog.models import Post
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/posts/")
+    assert len(queries) == 1
+    assert Post._meta.db_table in queries[0]["sql"]
+
+
+def test_conditional_get(
+        client, api_posts, django_capture_on_commit_callbacks
+):
+    posts, _ = api_posts
+    etag = client.get("/api/posts/")["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304 and len(queries) == 0
+    posts[0].title = "Новое"
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[0].save()
+    response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"][0]["title"] == "Новое"
+
+
+def test_category_user_and_comment_endpoints(
+        client, user_client, user, mixer, api_posts
+):
+    posts, hidden = api_posts
+    slug = posts[0].category.slug
+    ids, _ = _collect(client, f"/api/categories/{slug}/posts/")
+    assert ids == [post.pk for post in posts]
+
+    public, _ = _collect(client, f"/api/users/{user.username}/posts/")
+    own, _ = _collect(user_client, f"/api/users/{user.username}/posts/")
+    assert hidden.pk not in public and hidden.pk in own
+
+    comments = mixer.cycle(3).blend("blog.Comment", post=posts[0])
+    ids, _ = _collect(client, f"/api/posts/{posts[0].pk}/comments/", limit=2)
+    assert ids == [comment.pk for comment in comments]
+    mixer.blend("blog.Comment", post=hidden)
+    assert client.get(
+        f"/api/posts/{hidden.pk}/comments/").status_code == 404
+    assert user_client.get(
+        f"/api/posts/{hidden.pk}/comments/").status_code == 200
+
+
+def test_comments_conditional_get(
+        client, mixer, api_posts, django_capture_on_commit_callbacks
+):
+    posts, _ = api_posts
+    mixer.blend("blog.Comment", post=posts[0])
+    url = f"/api/posts/{posts[0].pk}/comments/"
+    etag = client.get(url)["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304 and len(queries) == 0, (
+        "Убедитесь, что повторная проверка комментариев обходится "
+        "без запросов к базе."
+    )
+    posts[0].is_published = False
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[0].save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404, (
+        "Убедитесь, что комментарии скрытого поста недоступны."
+    )
@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_new_post_has_no_comments(post_with_published_location):
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 0
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при добавлении комментария счётчик поста"
+        " увеличивается."
+    )
+    comment = post.comment.get()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что при удалении комментария счётчик поста уменьшается."
+    )
+
+
+def test_post_save_keeps_comment_count(mixer, post_with_published_location):
+    post = type(post_with_published_location).objects.get(
+        pk=post_with_published_location.pk)
+    mixer.blend("blog.Comment", post=post)
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что сохранение поста не затирает счётчик комментариев."
+    )
+
+
+def test_comment_count_after_cascade(mixer, post_with_published_location):
+    post = post_with_published_location
+    commenter = mixer.blend("auth.User")
+    mixer.cycle(3).blend("blog.Comment", post=post, author=commenter)
+    commenter.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что счётчик комментариев пересчитывается при каскадном"
+        " удалении комментариев."
+    )
+
+
+def test_rebuild_comment_counts_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=7)
+    with pytest.raises(CommandError):
+        call_command("rebuild_comment_counts", "--check")
+    call_command("rebuild_comment_counts")
+    post.refresh_from_db()
+    assert post.comment_count == 2
+    call_command("rebuild_comment_counts", "--check")
@@ -0,0 +1,137 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.CONTENT_BLOB_GRACE_SECONDS = 0
+    return tmp_path
+
+
+def _upload(color="teal", name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (100, 80), color).save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(image):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            image=image,
+        )
+
+    return make
+
+
+def _refcount(name):
+    from core.models import ContentBlob
+
+    blob = ContentBlob.objects.filter(name=name).first()
+    return blob.refcount if blob else None
+
+
+def test_same_upload_stored_once(make_post, media_root):
+    first = make_post(_upload(name="a.JPG"))
+    second = make_post(_upload(name="b.jpg"))
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые загрузки хранятся одним файлом."
+    )
+    assert first.image.name.startswith("post_images/")
+    assert first.image.name.endswith(".jpg")
+    assert len(list(media_root.rglob("*.jpg"))) == 1
+    assert _refcount(first.image.name) == 2
+
+
+def test_blob_collected_with_last_reference(
+        make_post, media_root, django_capture_on_commit_callbacks
+):
+    first = make_post(_upload())
+    second = make_post(_upload())
+    path = media_root / first.image.name
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert path.exists() and _refcount(second.image.name) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.image = _upload("orange")
+        second.save()
+    assert not path.exists(), (
+        "Убедитесь, что файл без ссылок удаляется при замене фото."
+    )
+    assert _refcount(first.image.name) is None
+    assert _refcount(second.image.name) == 1
+
+
+def test_collect_image_blobs_repairs_counts(make_post, media_root):
+    from blog.models import Post
+    from core.models import ContentBlob
+
+    post = make_post(_upload())
+    name = post.image.name
+    ContentBlob.objects.filter(name=name).update(refcount=5)
+    ContentBlob.objects.create(name="post_images/00/00/orphan.jpg")
+    call_command("collect_image_blobs", stdout=StringIO())
+    assert _refcount(name) == 1
+    assert _refcount("post_images/00/00/orphan.jpg") is None
+
+    Post.objects.filter(pk=post.pk).update(image="")
+    call_command("collect_image_blobs", stdout=StringIO())
+    assert not (media_root / name).exists()
+
+
+def test_collect_image_blobs_keeps_unrelated_files(media_root):
+    from core.models import ContentBlob
+
+    directory = media_root / "post_images" / "00" / "00"
+    directory.mkdir(parents=True)
+    for filename in ("orphan.jpg", "orphan_w320.jpg", "orphan_w320.webp",
+                     "orphan_wide.jpg", "orphan_w320.jpg.bak"):
+        (directory / filename).write_bytes(b"x")
+    ContentBlob.objects.create(name="post_images/00/00/orphan.jpg")
+    call_command("collect_image_blobs", stdout=StringIO())
+    assert sorted(path.name for path in directory.iterdir()) == [
+        "orphan_w320.jpg.bak", "orphan_wide.jpg"
+    ], "Убедитесь, что вместе с файлом удаляются только его копии."
+
+
+def test_reupload_keeps_released_blob(
+        make_post, media_root, settings, django_capture_on_commit_callbacks
+):
+    from blog.models import Post
+
+    settings.CONTENT_BLOB_GRACE_SECONDS = 3600
+    first = make_post(_upload())
+    name = first.image.name
+    storage = Post._meta.get_field("image").storage
+    # Тот же файл загружают для нового поста, пока первый пост
+    # отказывается от него: ссылку новый пост возьмёт только при записи.
+    assert storage.save("post_images/copy.jpg", _upload()) == name
+    with django_capture_on_commit_callbacks(execute=True):
+        first.image = _upload("orange")
+        first.save()
+    assert (media_root / name).exists(), (
+        "Убедитесь, что только что сохранённый файл не удаляется,"
+        " даже если на него не осталось ссылок."
+    )
+    second = make_post(_upload())
+    assert second.image.name == name and _refcount(name) == 1
+
+    settings.CONTENT_BLOB_GRACE_SECONDS = 0
+    second.image = None
+    second.save()
+    call_command("collect_image_blobs", stdout=StringIO())
+    assert not (media_root / name).exists(), (
+        "Убедитесь, что collect_image_blobs удаляет файлы без ссылок"
+        " после истечения CONTENT_BLOB_GRACE_SECONDS."
+    )
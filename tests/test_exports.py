@@ -0,0 +1,53 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        location=None)
+
+
+def test_export_posts_command(posts):
+    out = StringIO()
+    call_command("export_posts", chunk_size=2, stdout=out)
+    rows = list(csv.reader(StringIO(out.getvalue())))
+    assert rows[0][0] == "id"
+    assert [int(row[0]) for row in rows[1:]] == sorted(p.pk for p in posts)
+    assert rows[1][3] == posts[0].author.username
+
+
+def test_admin_export_streams_csv(posts, admin_client):
+    response = admin_client.post(
+        "/admin/blog/post/",
+        {"action": "export_csv", "_selected_action": [p.pk for p in posts]},
+    )
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся потоком, а не целиком."
+    )
+    content = b"".join(response.streaming_content).decode()
+    assert len(content.splitlines()) == len(posts) + 1
+
+
+def test_admin_changelist_does_not_count_table(posts, admin_client):
+    response = admin_client.get("/admin/blog/post/")
+    assert response.status_code == 200
+    assert not response.context["cl"].show_full_result_count
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Индексы только для PostgreSQL")
+def test_postgres_feed_index_exists():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'blog_post'")
+        names = {row[0] for row in cursor.fetchall()}
+    assert "post_feed_covering_idx" in names
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    visible = mixer.blend(
+        "blog.Post", title="Видимый", author=user, is_published=True,
+        category=published_category, pub_date=now - timedelta(hours=1))
+    mixer.blend(
+        "blog.Post", title="Отложенный", author=user, is_published=True,
+        category=published_category, pub_date=now + timedelta(days=1))
+    return visible
+
+
+@pytest.mark.parametrize(
+    "url, content_type",
+    [
+        ("/feeds/rss/", "application/rss+xml"),
+        ("/feeds/atom/", "application/atom+xml"),
+    ],
+)
+def test_feed_lists_visible_posts(client, feed_posts, url, content_type):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith(content_type)
+    content = response.content.decode()
+    assert "Видимый" in content and "Отложенный" not in content
+    assert response["ETag"] and response["Last-Modified"]
+
+
+def test_category_and_author_feeds(client, feed_posts, mixer):
+    category = feed_posts.category
+    response = client.get(f"/category/{category.slug}/rss/")
+    assert "Видимый" in response.content.decode()
+    response = client.get(f"/profile/{feed_posts.author.username}/atom/")
+    assert "Видимый" in response.content.decode()
+    hidden = mixer.blend("blog.Category", is_published=False)
+    assert client.get(f"/category/{hidden.slug}/rss/").status_code == 404
+    assert client.get("/profile/nobody/rss/").status_code == 404
+
+
+def test_feed_not_modified_without_queries(client, feed_posts):
+    response = client.get("/feeds/rss/")
+    etag, last_modified = response["ETag"], response["Last-Modified"]
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert len(queries) == 0, (
+        "Убедитесь, что ответ 304 отдаётся без запросов к базе."
+    )
+    response = client.get(
+        "/feeds/rss/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+def test_feed_cache_invalidated_by_signals(
+        client, feed_posts, mixer, django_capture_on_commit_callbacks
+):
+    etag = client.get("/feeds/rss/")["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get("/feeds/rss/")["X-Page-Cache"] == "hit"
+    assert len(queries) == 0
+
+    feed_posts.title = "Переименованный"
+    with django_capture_on_commit_callbacks(execute=True):
+        feed_posts.save()
+    response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Переименованный" in response.content.decode()
+
+    etag = response["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=feed_posts)
+    response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
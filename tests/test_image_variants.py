@@ -0,0 +1,104 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PAGE_CACHE_TIMEOUT = 0
+    settings.CONTENT_BLOB_GRACE_SECONDS = 0
+    return tmp_path
+
+
+def _upload(width=1200, height=800, name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+@pytest.fixture
+def post_with_photo(
+        mixer, user, published_category, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            image=_upload(),
+            location=None,
+        )
+
+
+def test_variants_built_off_request_path(post_with_photo, media_root):
+    from core.tasks import run_pending
+
+    assert post_with_photo.image_variants is None, (
+        "Убедитесь, что копии фото строятся фоновой задачей."
+    )
+    assert run_pending() == 1
+    post_with_photo.refresh_from_db()
+    data = post_with_photo.image_variants
+    assert (data["width"], data["height"]) == (1200, 800)
+    assert [v["width"] for v in data["variants"]] == [320, 640, 960, 1200]
+    for variant in data["variants"]:
+        assert (media_root / variant["webp"]).exists()
+        assert (media_root / variant["src"]).exists()
+    with Image.open(media_root / data["variants"][0]["webp"]) as image:
+        assert image.format == "WEBP"
+        assert image.size == (320, 213)
+
+
+def test_card_renders_responsive_image(client, post_with_photo):
+    from core.tasks import run_pending
+
+    content = client.get("/").content.decode()
+    assert post_with_photo.image.url in content, (
+        "Убедитесь, что до построения копий выводится оригинал."
+    )
+    run_pending()
+    content = client.get("/").content.decode()
+    assert 'srcset="' in content and 'type="image/webp"' in content
+    assert 'width="1200" height="800"' in content
+    assert 'loading="lazy"' in content
+    assert "_w640.jpg" in content
+
+    detail = client.get(f"/posts/{post_with_photo.id}/").content.decode()
+    assert 'loading="eager"' in detail
+
+
+def test_replacing_photo_drops_old_variants(
+        post_with_photo, media_root, django_capture_on_commit_callbacks
+):
+    from core.tasks import run_pending
+
+    run_pending()
+    post_with_photo.refresh_from_db()
+    old = post_with_photo.image_variants["variants"][0]
+    with django_capture_on_commit_callbacks(execute=True):
+        post_with_photo.image = _upload(500, 500, name="other.jpg")
+        post_with_photo.save()
+    assert post_with_photo.image_variants is None
+    assert not (media_root / old["webp"]).exists()
+    run_pending()
+    post_with_photo.refresh_from_db()
+    assert [v["width"] for v in post_with_photo.image_variants["variants"]] \
+        == [320, 500]
+
+
+def test_backfill_command(post_with_photo):
+    from blog.models import Post
+
+    out = StringIO()
+    call_command("build_image_variants", "--sync", stdout=out)
+    assert "Обработано постов: 1" in out.getvalue()
+    assert Post.objects.get().image_variants["width"] == 1200
+    call_command("build_image_variants", "--sync", stdout=out)
+    assert "Обработано постов: 0" in out.getvalue()
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 4
+DIGEST = "ab" + "cd" + "0" * 60
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "post_images" / "ab" / "cd").mkdir(parents=True)
+    (tmp_path / "post_images" / "plain.jpg").write_bytes(CONTENT)
+    (tmp_path / "post_images" / "ab" / "cd" / f"{DIGEST}.jpg").write_bytes(
+        CONTENT)
+    return tmp_path
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_full_file_and_cache_headers(client):
+    response = client.get("/media/post_images/plain.jpg")
+    assert response.status_code == HTTPStatus.OK
+    assert _body(response) == CONTENT
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["Content-Type"] == "image/jpeg"
+    assert "immutable" not in response["Cache-Control"]
+
+    hashed = client.get(f"/media/post_images/ab/cd/{DIGEST}.jpg")
+    assert "immutable" in hashed["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени кешируются навсегда."
+    )
+    assert "max-age=31536000" in hashed["Cache-Control"]
+
+
+def test_conditional_get(client):
+    response = client.get("/media/post_images/plain.jpg")
+    etag, modified = response["ETag"], response["Last-Modified"]
+    assert client.get(
+        "/media/post_images/plain.jpg", HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    assert client.get(
+        "/media/post_images/plain.jpg", HTTP_IF_MODIFIED_SINCE=modified
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    assert client.get(
+        "/media/post_images/plain.jpg",
+        HTTP_IF_MODIFIED_SINCE=http_date(0),
+    ).status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    "header, start, end",
+    [
+        ("bytes=0-9", 0, 9),
+        ("bytes=1000-", 1000, 1023),
+        ("bytes=-24", 1000, 1023),
+        ("bytes=1020-5000", 1020, 1023),
+    ],
+)
+def test_range(client, header, start, end):
+    response = client.get("/media/post_images/plain.jpg", HTTP_RANGE=header)
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert _body(response) == CONTENT[start:end + 1]
+    assert response["Content-Range"] == f"bytes {start}-{end}/1024"
+    assert response["Content-Length"] == str(end - start + 1)
+
+
+def test_range_edge_cases(client):
+    response = client.get(
+        "/media/post_images/plain.jpg", HTTP_RANGE="bytes=2000-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response["Content-Range"] == "bytes */1024"
+
+    stale = client.get(
+        "/media/post_images/plain.jpg",
+        HTTP_RANGE="bytes=0-9",
+        HTTP_IF_RANGE='"stale"',
+    )
+    assert stale.status_code == HTTPStatus.OK, (
+        "Убедитесь, что при устаревшем If-Range файл отдаётся целиком."
+    )
+
+
+def test_sendfile_delegation(client, settings, media_root):
+    settings.MEDIA_SENDFILE_BACKEND = "nginx"
+    response = client.get("/media/post_images/plain.jpg")
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/post_images/plain.jpg"
+    )
+    assert response.content == b""
+
+    settings.MEDIA_SENDFILE_BACKEND = "apache"
+    response = client.get("/media/post_images/plain.jpg")
+    assert response["X-Sendfile"] == str(media_root / "post_images/plain.jpg")
+
+
+@pytest.mark.parametrize(
+    "url", ["/media/post_images/missing.jpg", "/media/../settings.py",
+            "/media/post_images/"]
+)
+def test_missing_files_are_404(client, url):
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
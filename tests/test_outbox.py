@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+BEATLES_TITLE = "Ринго Старр"
+
+
+def test_beatles_title_is_queued_not_sent(
+        user_client, published_category, mailoutbox
+):
+    from core.models import OutboxMessage
+
+    user_client.post(
+        "/posts/create/",
+        data={
+            "title": BEATLES_TITLE,
+            "text": "Текст",
+            "pub_date": "2020-01-01T00:00",
+            "category": published_category.id,
+        },
+    )
+    assert len(mailoutbox) == 0, (
+        "Убедитесь, что письмо не отправляется во время обработки формы."
+    )
+    queued = OutboxMessage.objects.get()
+    assert BEATLES_TITLE in queued.body
+
+    call_command("send_outbox", stdout=StringIO())
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].to == ["admin@acme.not"]
+    queued.refresh_from_db()
+    assert queued.sent_at is not None
+
+
+def test_failed_delivery_is_retried_later(monkeypatch, mailoutbox):
+    from core.mail import deliver_outbox, enqueue_mail
+    from core.models import OutboxMessage
+
+    enqueue_mail("Тема", "Текст", "from@acme.not", ["to@acme.not"])
+
+    def broken_send(self):
+        raise OSError("SMTP недоступен")
+
+    monkeypatch.setattr(mail.EmailMessage, "send", broken_send)
+    assert deliver_outbox() == 0
+    queued = OutboxMessage.objects.get()
+    assert queued.attempts == 1
+    assert "SMTP" in queued.last_error
+    assert deliver_outbox() == 0, (
+        "Убедитесь, что повторная отправка откладывается."
+    )
+
+    monkeypatch.undo()
+    OutboxMessage.objects.update(next_attempt_at=queued.created_at)
+    assert deliver_outbox() == 1
+    assert len(mailoutbox) == 1
+
+
+def test_unreachable_server_postpones_batch(monkeypatch, mailoutbox):
+    from django.core.mail.backends.locmem import EmailBackend
+
+    from core.mail import deliver_outbox, enqueue_mail
+    from core.models import OutboxMessage
+
+    enqueue_mail("Тема", "Текст", "from@acme.not", ["to@acme.not"])
+
+    def broken_open(self):
+        raise ConnectionRefusedError("SMTP недоступен")
+
+    monkeypatch.setattr(EmailBackend, "open", broken_open, raising=False)
+    assert deliver_outbox() == 0, (
+        "Убедитесь, что недоступный почтовый сервер не прерывает отправку"
+        " очереди исключением."
+    )
+    queued = OutboxMessage.objects.get()
+    assert queued.attempts == 0
+    assert "SMTP" in queued.last_error
+    assert queued.next_attempt_at > queued.created_at
+    assert deliver_outbox() == 0
+    assert len(mailoutbox) == 0
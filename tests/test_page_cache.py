@@ -0,0 +1,198 @@
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get_twice(client, url):
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, len(queries)
+
+
+def test_anonymous_pages_are_cached(client, post_with_published_location):
+    post = post_with_published_location
+    for url in (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ):
+        response, n_queries = _get_twice(client, url)
+        assert response["X-Page-Cache"] == "hit", (
+            f"Убедитесь, что страница `{url}` кешируется для анонимных"
+            " посетителей."
+        )
+        assert n_queries == 0
+
+
+def test_logged_in_users_bypass_cache(
+        client, user_client, user, post_with_published_location
+):
+    client.get("/")
+    response = user_client.get("/")
+    assert "X-Page-Cache" not in response
+    assert f"/profile/{user.username}/" in response.content.decode("utf-8"), (
+        "Убедитесь, что авторизованный пользователь видит свою шапку сайта."
+    )
+
+
+def test_comment_invalidates_post_and_lists(
+        client, mixer, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    urls = ("/", f"/posts/{post.id}/", f"/profile/{post.author.username}/")
+    for url in urls:
+        client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    for url in urls:
+        response = client.get(url)
+        assert response["X-Page-Cache"] == "miss", (
+            f"Убедитесь, что после комментария страница `{url}`"
+            " строится заново."
+        )
+    assert "Свежий комментарий" in client.get(
+        f"/posts/{post.id}/"
+    ).content.decode("utf-8")
+
+
+def test_unrelated_pages_stay_cached(
+        client, mixer, post_with_published_location, another_category
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    mixer.blend("blog.Post", category=another_category)
+    assert client.get(url)["X-Page-Cache"] == "hit"
+
+
+def test_category_change_invalidates_its_posts(
+        client, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    client.get(f"/posts/{post.id}/")
+    post.category.title = "Новое название"
+    with django_capture_on_commit_callbacks(execute=True):
+        post.category.save()
+    response = client.get(f"/posts/{post.id}/")
+    assert "Новое название" in response.content.decode("utf-8")
+
+
+def test_category_change_keeps_other_pages(
+        client, post_with_published_location, post_with_another_category,
+        django_capture_on_commit_callbacks
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+    category = post_with_another_category.category
+    category.title = "Другое название"
+    with django_capture_on_commit_callbacks(execute=True):
+        category.save()
+    assert client.get(url)["X-Page-Cache"] == "hit", (
+        "Убедитесь, что изменение категории не сбрасывает кеш страниц"
+        " постов других категорий."
+    )
+    response = client.get(f"/posts/{post_with_another_category.id}/")
+    assert "Другое название" in response.content.decode("utf-8")
+
+
+def test_author_rename_invalidates_commented_posts(
+        client, mixer, another_user, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    another_user.username = "renamed_commenter"
+    with django_capture_on_commit_callbacks(execute=True):
+        another_user.save()
+    assert "renamed_commenter" in client.get(url).content.decode("utf-8"), (
+        "Убедитесь, что смена имени пользователя сбрасывает кеш постов"
+        " с его комментариями."
+    )
+
+
+def test_login_keeps_pages_cached(client, user, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+    user.save(update_fields=["last_login"])
+    assert client.get(url)["X-Page-Cache"] == "hit"
+
+
+def test_tag_versions_shared_between_processes(
+        client, post_with_published_location
+):
+    from core.cache import get_tag_versions
+
+    client.get("/")
+    response, _ = _get_twice(client, "/")
+    assert response["X-Page-Cache"] == "hit"
+    [version] = get_tag_versions(["feed"])
+    subprocess.run(
+        [sys.executable, "-c",
+         "import django; django.setup();"
+         "from core.cache import invalidate_tags; invalidate_tags('feed')"],
+        check=True, cwd=settings.BASE_DIR,
+        env={"DJANGO_SETTINGS_MODULE": "blogicum.settings",
+             "PATH": "", "BLOG_CACHE_DIR": settings.CACHES["default"][
+                 "LOCATION"]},
+    )
+    assert get_tag_versions(["feed"]) != [version], (
+        "Убедитесь, что версии меток кеша общие для всех процессов."
+    )
+    assert client.get("/")["X-Page-Cache"] == "miss"
+
+
+def test_pages_invalidated_after_commit(
+        client, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.title = "Новый заголовок"
+        post.save()
+        assert client.get(url)["X-Page-Cache"] == "hit", (
+            "Убедитесь, что кеш страниц сбрасывается только после"
+            " фиксации транзакции."
+        )
+    for callback in callbacks:
+        callback()
+    assert client.get(url)["X-Page-Cache"] == "miss"
+
+
+def test_related_change_does_not_scan_posts(
+        client, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    category = post.category
+    category.description = "Новое описание"
+    with django_capture_on_commit_callbacks(execute=True):
+        with CaptureQueriesContext(connection) as queries:
+            category.save()
+    assert not any(
+        "blog_post" in query["sql"] for query in queries.captured_queries
+    ), (
+        "Убедитесь, что изменение категории не перебирает её посты:"
+        " страницы сами перечисляют метки выводимых объектов."
+    )
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    category.description = "Ещё описание"
+    with django_capture_on_commit_callbacks(execute=True):
+        category.save()
+    assert client.get(url)["X-Page-Cache"] == "hit", (
+        "Убедитесь, что описание категории не сбрасывает страницы постов."
+    )
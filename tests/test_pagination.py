@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _page_ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_keyset_pages_match_offset_pages(
+        client, many_posts_with_published_locations
+):
+    first = client.get("/")
+    assert first.status_code == HTTPStatus.OK
+    page = first.context["page_obj"]
+    assert page.has_next() and not page.has_previous(), (
+        "Убедитесь, что первая страница ленты ссылается только на следующую."
+    )
+    second = client.get(f"/?after={page.next_cursor}")
+    assert _page_ids(second) == _page_ids(client.get("/?page=2")), (
+        "Убедитесь, что курсорная и постраничная пагинация возвращают"
+        " одинаковые публикации."
+    )
+    back = client.get(
+        f"/?before={second.context['page_obj'].previous_cursor}"
+    )
+    assert _page_ids(back) == _page_ids(first)
+    assert len(_page_ids(first)) == N_PER_PAGE
+
+
+def test_keyset_links_rendered(client, many_posts_with_published_locations):
+    response = client.get("/")
+    next_cursor = response.context["page_obj"].next_cursor
+    assert f"?after={next_cursor}" in response.content.decode("utf-8"), (
+        "Убедитесь, что в пагинаторе выводится ссылка на следующую страницу."
+    )
+
+
+@pytest.mark.parametrize("token", ["garbage", "bm90LWEtY3Vyc29y"])
+def test_invalid_cursor_is_404(client, token):
+    response = client.get(f"/?after={token}")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_page_count_is_cached_and_invalidated(
+        user_client, mixer, many_posts_with_published_locations,
+        django_capture_on_commit_callbacks
+):
+    cache.clear()
+    user_client.get("/?page=1")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/?page=1")
+    assert not any("COUNT(" in q["sql"] for q in queries), (
+        "Убедитесь, что количество постов для пагинации берётся из кеша."
+    )
+    n_pages = response.context["paginator"].num_pages
+
+    post = many_posts_with_published_locations[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.cycle(N_PER_PAGE).blend(
+            "blog.Post",
+            author=post.author,
+            category=post.category,
+            pub_date=post.pub_date,
+        )
+    response = user_client.get("/?page=1")
+    assert response.context["paginator"].num_pages == n_pages + 1, (
+        "Убедитесь, что кеш количества постов сбрасывается при их создании."
+    )
+
+
+def test_default_count_scope_follows_query():
+    from blog.models import Post
+    from blog.views import CachedCountMixin
+
+    mixin = CachedCountMixin()
+    visible = Post.objects.visible()
+    assert mixin.get_count_scope(visible) == mixin.get_count_scope(
+        Post.objects.visible()
+    )
+    assert mixin.get_count_scope(visible) != mixin.get_count_scope(
+        Post.objects.all()
+    ), (
+        "Убедитесь, что по умолчанию разные списки не делят закешированное"
+        " количество постов."
+    )
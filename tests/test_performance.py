@@ -0,0 +1,202 @@
+import time
+from typing import NamedTuple
+
+import pytest
+from django.db import connection
+from django.template.response import SimpleTemplateResponse
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+class Budget(NamedTuple):
+    queries: int
+    sql_ms: float = 200
+    wall_ms: float = 1000
+
+
+class Measurement(NamedTuple):
+    status_code: int
+    queries: int
+    sql_ms: float
+    render_ms: float
+    wall_ms: float
+
+
+# Бюджеты страниц при заполненной базе (fixtures.bulk.large_dataset).
+# Число запросов включает загрузку сессии и пользователя для
+# авторизованного клиента. Ключ — имя маршрута, в скобках — вариант
+# запроса; бюджет нужен каждому маршруту blog и pages.
+BUDGETS = {
+    "blog:index": Budget(queries=1),
+    "blog:index (cursor)": Budget(queries=1),
+    "blog:index (page)": Budget(queries=2),
+    "blog:post_detail": Budget(queries=2),
+    "blog:category_posts": Budget(queries=2),
+    "blog:profile": Budget(queries=2),
+    "blog:profile (owner)": Budget(queries=4),
+    "blog:create_post": Budget(queries=4),
+    "blog:edit_post": Budget(queries=6),
+    "blog:delete_post": Budget(queries=6),
+    "blog:edit_profile": Budget(queries=2),
+    "blog:add_comment": Budget(queries=3),
+    "blog:edit_comment": Budget(queries=4),
+    "blog:delete_comment": Budget(queries=4),
+    "blog:search": Budget(queries=1),
+    "blog:suggest": Budget(queries=1),
+    "blog:posts_rss": Budget(queries=1),
+    "blog:posts_atom": Budget(queries=1),
+    "blog:category_rss": Budget(queries=2),
+    "blog:category_atom": Budget(queries=2),
+    "blog:author_rss": Budget(queries=2),
+    "blog:author_atom": Budget(queries=2),
+    "blog:sitemap_index": Budget(queries=5),
+    "blog:sitemap": Budget(queries=1),
+    "blog:api_posts": Budget(queries=1),
+    "blog:api_comments": Budget(queries=1),
+    "blog:api_category_posts": Budget(queries=2),
+    "blog:api_user_posts": Budget(queries=2),
+    "pages:about": Budget(queries=0),
+    "pages:rules": Budget(queries=0),
+}
+
+
+@pytest.fixture(autouse=True)
+def disable_page_cache(settings):
+    # Замеряются сами представления, а не отдача страниц из кеша.
+    settings.PAGE_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture
+def routes(large_dataset):
+    from blog.models import Comment
+
+    post = large_dataset
+    author = post.author
+    comment = Comment.objects.create(post=post, author=author, text="Мой")
+    author_client = Client()
+    author_client.force_login(author)
+    anonymous = Client()
+    cursor = anonymous.get("/").context["page_obj"].next_cursor
+    return {
+        "blog:index": (anonymous, "/"),
+        "blog:index (cursor)": (anonymous, f"/?after={cursor}"),
+        "blog:index (page)": (anonymous, "/?page=5"),
+        "blog:post_detail": (anonymous, f"/posts/{post.id}/"),
+        "blog:category_posts": (
+            anonymous, f"/category/{post.category.slug}/"),
+        "blog:profile": (anonymous, f"/profile/{author.username}/"),
+        "blog:profile (owner)": (
+            author_client, f"/profile/{author.username}/"),
+        "blog:create_post": (author_client, "/posts/create/"),
+        "blog:edit_post": (author_client, f"/posts/{post.id}/edit/"),
+        "blog:delete_post": (author_client, f"/posts/{post.id}/delete/"),
+        "blog:edit_profile": (author_client, "/profile/edit/"),
+        "blog:add_comment": (author_client, f"/posts/{post.id}/comment/"),
+        "blog:edit_comment": (
+            author_client, f"/posts/{post.id}/edit_comment/{comment.id}/"),
+        "blog:delete_comment": (
+            author_client, f"/posts/{post.id}/delete_comment/{comment.id}/"),
+        "blog:search": (anonymous, "/search/?q=Пост"),
+        "blog:suggest": (anonymous, "/search/suggest/?q=Пос"),
+        "blog:posts_rss": (anonymous, "/feeds/rss/"),
+        "blog:posts_atom": (anonymous, "/feeds/atom/"),
+        "blog:category_rss": (
+            anonymous, f"/category/{post.category.slug}/rss/"),
+        "blog:category_atom": (
+            anonymous, f"/category/{post.category.slug}/atom/"),
+        "blog:author_rss": (anonymous, f"/profile/{author.username}/rss/"),
+        "blog:author_atom": (
+            anonymous, f"/profile/{author.username}/atom/"),
+        "blog:sitemap_index": (anonymous, "/sitemap.xml"),
+        "blog:sitemap": (anonymous, "/sitemap-posts-0.xml"),
+        "blog:api_posts": (anonymous, "/api/posts/"),
+        "blog:api_comments": (anonymous, f"/api/posts/{post.id}/comments/"),
+        "blog:api_category_posts": (
+            anonymous, f"/api/categories/{post.category.slug}/posts/"),
+        "blog:api_user_posts": (
+            anonymous, f"/api/users/{author.username}/posts/"),
+        "pages:about": (anonymous, "/pages/about/"),
+        "pages:rules": (anonymous, "/pages/rules/"),
+    }
+
+
+def measure(client, url, monkeypatch) -> Measurement:
+    sql_times = []
+    render_times = []
+
+    def timed_execute(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            sql_times.append(time.perf_counter() - start)
+
+    original_render = SimpleTemplateResponse.render
+
+    def timed_render(response):
+        start = time.perf_counter()
+        try:
+            return original_render(response)
+        finally:
+            render_times.append(time.perf_counter() - start)
+
+    monkeypatch.setattr(SimpleTemplateResponse, "render", timed_render)
+    client.get(url)  # прогрев: сессия, кеш счётчиков, шаблоны
+    sql_times.clear()
+    render_times.clear()
+    with connection.execute_wrapper(timed_execute):
+        start = time.perf_counter()
+        response = client.get(url)
+        if response.streaming:
+            # Потоковый ответ выполняет запросы при чтении содержимого.
+            b"".join(response.streaming_content)
+        wall = time.perf_counter() - start
+    return Measurement(
+        status_code=response.status_code,
+        queries=len(sql_times),
+        sql_ms=sum(sql_times) * 1000,
+        render_ms=sum(render_times) * 1000,
+        wall_ms=wall * 1000,
+    )
+
+
+def test_every_route_has_budget():
+    from django.urls import URLPattern
+    from blog import urls as blog_urls
+    from pages import urls as pages_urls
+
+    routes = {
+        f"{urls.app_name}:{pattern.name}"
+        for urls in (blog_urls, pages_urls)
+        for pattern in urls.urlpatterns
+        if isinstance(pattern, URLPattern) and pattern.name
+    }
+    budgeted = {route.split(" (")[0] for route in BUDGETS}
+    assert not routes - budgeted, (
+        "Задайте бюджет запросов и времени для маршрутов: "
+        f"{', '.join(sorted(routes - budgeted))}."
+    )
+
+
+@pytest.mark.parametrize("route", list(BUDGETS))
+def test_view_within_budget(route, routes, monkeypatch, record_property):
+    client, url = routes[route]
+    budget = BUDGETS[route]
+    result = measure(client, url, monkeypatch)
+    for field, value in result._asdict().items():
+        record_property(field, value)
+
+    assert result.status_code == 200, f"Страница `{url}` вернула ошибку."
+    assert result.queries <= budget.queries, (
+        f"`{route}` ({url}) выполняет {result.queries} SQL-запросов,"
+        f" бюджет — {budget.queries}."
+    )
+    assert result.sql_ms <= budget.sql_ms, (
+        f"`{route}` ({url}) тратит на SQL {result.sql_ms:.1f} мс,"
+        f" бюджет — {budget.sql_ms} мс."
+    )
+    assert result.wall_ms <= budget.wall_ms, (
+        f"`{route}` ({url}) отвечает за {result.wall_ms:.1f} мс,"
+        f" бюджет — {budget.wall_ms} мс."
+    )
@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def seeded_posts(mixer, user, published_category, published_locations):
+    def seed(n):
+        return mixer.cycle(n).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=mixer.sequence(*published_locations),
+        )
+    return seed
+
+
+def _list_urls(post):
+    return {
+        "/": 1,
+        f"/category/{post.category.slug}/": 2,
+        f"/profile/{post.author.username}/": 2,
+    }
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE, N_PER_PAGE * 2])
+def test_list_pages_have_fixed_query_count(client, seeded_posts, n_posts):
+    posts = seeded_posts(n_posts)
+    for url, expected in _list_urls(posts[0]).items():
+        n_queries = _count_queries(client, url)
+        assert n_queries == expected, (
+            f"Убедитесь, что страница `{url}` выполняет {expected} SQL-запроса"
+            f" независимо от числа постов (выполнено {n_queries})."
+        )
+
+
+def test_list_pages_do_not_load_unused_columns(client, seeded_posts):
+    post = seeded_posts(1)[0]
+    for url in _list_urls(post):
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        post_query = queries[-1]["sql"]
+        assert '"auth_user"."password"' not in post_query, (
+            f"Убедитесь, что на странице `{url}` из таблицы пользователей"
+            " выбираются только нужные карточке поля."
+        )
@@ -0,0 +1,96 @@
+import re
+
+import pytest
+from django.db import connection
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN для SQLite"
+    ),
+]
+
+SCAN = re.compile(r"\bSCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+# Разрешённые обходы (таблица, индекс): любой другой SCAN таблицы —
+# даже по индексу — считается чтением таблицы целиком.
+ALLOWED_SCANS = {
+    # Лента идёт по частичному индексу в порядке сортировки
+    # и останавливается на LIMIT.
+    ("blog_post", "post_published_feed_idx"),
+    # Справочник категорий мал; по каждой строке посты ищутся
+    # через SEARCH по индексу категории.
+    ("blog_category", None),
+}
+
+
+@pytest.fixture(autouse=True)
+def disable_page_cache(settings):
+    # Замеряются сами представления, а не отдача страниц из кеша.
+    settings.PAGE_CACHE_TIMEOUT = 0
+
+
+def _plans_for(client, url):
+    statements = []
+
+    def capture(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT"):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        response = client.get(url)
+    assert response.status_code == 200, url
+
+    plans = []
+    with connection.cursor() as cursor:
+        for sql, params in statements:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plans.append(
+                (sql, "\n".join(row[-1] for row in cursor.fetchall()))
+            )
+    return plans
+
+
+def _unexpected_scans(plan):
+    tables = set(connection.introspection.table_names())
+    return [
+        match.group(0)
+        for match in SCAN.finditer(plan)
+        # Обход подзапроса (SCAN subquery) — не чтение таблицы.
+        if match.group(1) in tables and match.groups() not in ALLOWED_SCANS
+    ]
+
+
+def test_views_do_not_scan_tables(client, large_dataset):
+    post = large_dataset
+    first_page = client.get("/").context["page_obj"]
+    urls = [
+        "/",
+        f"/?after={first_page.next_cursor}",
+        "/?page=3",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    ]
+    for url in urls:
+        for sql, plan in _plans_for(client, url):
+            assert not _unexpected_scans(plan), (
+                f"Запрос страницы `{url}` читает таблицу целиком:\n"
+                f"{sql}\n{plan}"
+            )
+
+
+def test_scheduler_uses_unreleased_index():
+    from blog.models import Post
+
+    queries = [
+        Post.objects.due_for_release().values_list("pk", flat=True)[:100],
+        Post.objects.filter(is_released=False).order_by("pub_date")
+        .values_list("pub_date", flat=True)[:1],
+    ]
+    for queryset in queries:
+        plan = queryset.explain()
+        assert "post_unreleased_idx" in plan, (
+            "Убедитесь, что планировщик отложенных публикаций читает"
+            f" частичный индекс по pub_date:\n{plan}"
+        )
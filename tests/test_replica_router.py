@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import time
+
+import pytest
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_go_to_replica_writes_to_primary(replicas):
+    from blog.models import Post
+    from core.models import Job
+    from core.routers import PrimaryReplicaRouter, pin_to_primary
+
+    router = PrimaryReplicaRouter()
+    assert router.db_for_write(Post) == "default"
+    assert router.db_for_read(Post) == "replica"
+    assert router.db_for_read(Job) == "default", (
+        "Убедитесь, что очереди core читаются с основной базы."
+    )
+    with pin_to_primary():
+        assert router.db_for_read(Post) == "default"
+    assert router.allow_migrate("replica", "blog") is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_inside_transaction_stay_on_primary(replicas):
+    from blog.models import Post
+    from core.routers import PrimaryReplicaRouter
+
+    router = PrimaryReplicaRouter()
+    assert router.db_for_read(Post) == "replica"
+    with transaction.atomic():
+        assert router.db_for_read(Post) == "default"
+
+
+def test_no_replicas_means_primary():
+    from blog.models import Post
+    from core.routers import PrimaryReplicaRouter
+
+    assert PrimaryReplicaRouter().db_for_read(Post) == "default"
+
+
+def test_user_pinned_after_write():
+    from core.middleware import ReadAfterWriteMiddleware
+    from core.routers import is_pinned
+    from django.http import HttpResponse
+
+    seen = []
+
+    def view(request):
+        seen.append(is_pinned())
+        return HttpResponse()
+
+    middleware = ReadAfterWriteMiddleware(view)
+    factory = RequestFactory()
+
+    middleware(factory.get("/"))
+    response = middleware(factory.post("/posts/create/"))
+    cookie = response.cookies["pin_primary"]
+    assert int(cookie.value) > time.time()
+    middleware(factory.get("/", HTTP_COOKIE=f"pin_primary={cookie.value}"))
+    expired = int(time.time()) - 1
+    middleware(factory.get("/", HTTP_COOKIE=f"pin_primary={expired}"))
+    assert seen == [False, True, True, False], (
+        "Убедитесь, что после записи чтение закрепляется за основной базой."
+    )
+    assert not is_pinned()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_copy_database_to_replica_file(tmp_path, mixer):
+    from core.management.commands.sync_replica import copy_sqlite_database
+
+    mixer.cycle(3).blend("blog.Location")
+    connection.ensure_connection()
+    target = tmp_path / "replica.sqlite3"
+    copy_sqlite_database(connection.connection, target)
+    with sqlite3.connect(target) as replica:
+        count = replica.execute("SELECT count(*) FROM blog_location")
+        assert count.fetchone() == (3,)
+
+
+def test_replica_sync_resets_caches(client):
+    from blog.paginators import _count_generation
+    from core.routers import replica_synced
+
+    before = _count_generation()
+    replica_synced.send(sender=None, replicas=["replica"])
+    assert _count_generation() != before
+
+
+def test_web_process_notices_replica_sync(settings, tmp_path):
+    from blog.paginators import _count_generation
+    from core.routers import ReplicaWatcher
+
+    replica = tmp_path / "replica.sqlite3"
+    replica.write_bytes(b"")
+    settings.DATABASES = {
+        **settings.DATABASES,
+        "replica": {**settings.DATABASES["default"], "NAME": replica},
+    }
+    settings.DATABASE_REPLICAS = ["replica"]
+    watcher = ReplicaWatcher()
+    watcher.check()
+    before = _count_generation()
+    watcher.check()
+    assert _count_generation() == before
+
+    stat = replica.stat()
+    os.utime(replica, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    watcher.check()
+    assert _count_generation() != before, (
+        "Убедитесь, что веб-процесс сбрасывает свои кеши, заметив"
+        " обновление реплики."
+    )
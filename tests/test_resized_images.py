@@ -0,0 +1,128 @@
+import threading
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.RESIZED_IMAGE_CACHE_DIR = tmp_path / "resized"
+    (tmp_path / "media" / "post_images").mkdir(parents=True)
+    Image.new("RGB", (1200, 800), "teal").save(
+        tmp_path / "media" / "post_images" / "photo.jpg")
+    return tmp_path
+
+
+def _image(response):
+    return Image.open(BytesIO(b"".join(response.streaming_content)))
+
+
+def test_resized_copy_is_generated_and_cached(client, media, monkeypatch):
+    from core import views
+
+    response = client.get("/media/resized/320x320/post_images/photo.jpg")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"] == "image/jpeg"
+    assert _image(response).size == (320, 213), (
+        "Убедитесь, что копия вписывается в рамку с сохранением пропорций."
+    )
+    assert "max-age" in response["Cache-Control"]
+    etag = response["ETag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Копия должна браться из кеша")
+
+    monkeypatch.setattr(views, "open_image", fail)
+    again = client.get("/media/resized/320x320/post_images/photo.jpg")
+    assert _image(again).size == (320, 213)
+    not_modified = client.get(
+        "/media/resized/320x320/post_images/photo.jpg",
+        HTTP_IF_NONE_MATCH=etag,
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/media/resized/320x320/post_images/missing.jpg",
+        "/media/resized/320x320/post_images/../../secret.jpg",
+        "/media/resized/320x320/other/photo.jpg",
+        "/media/resized/0x300/post_images/photo.jpg",
+        "/media/resized/9000x300/post_images/photo.jpg",
+        "/media/resized/300x300/post_images/photo.jpg",
+    ],
+)
+def test_bad_requests_are_404(client, url):
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_source_is_checked_once_per_request(client, media, monkeypatch):
+    from core import views
+
+    calls = []
+    get_modified_time = views.default_storage.get_modified_time
+
+    def counting(name):
+        calls.append(name)
+        return get_modified_time(name)
+
+    monkeypatch.setattr(
+        views.default_storage, "get_modified_time", counting)
+    client.get("/media/resized/320x320/post_images/photo.jpg")
+    assert len(calls) == 1, (
+        "Убедитесь, что ключ копии вычисляется один раз за запрос."
+    )
+
+
+def test_lru_eviction(tmp_path):
+    from core.disk_cache import DiskLRUCache
+
+    cache = DiskLRUCache(tmp_path / "lru", max_bytes=250)
+    cache.put("aa1", b"x" * 100)
+    cache.put("bb2", b"x" * 100)
+    assert cache.get("aa1") is not None
+    cache.put("cc3", b"x" * 100)
+    assert cache.get("bb2") is None, (
+        "Убедитесь, что вытесняется давно не запрашиваемый файл."
+    )
+    assert cache.get("aa1") is not None
+    assert cache.get("cc3") is not None
+
+
+def test_concurrent_requests_decode_once(monkeypatch, tmp_path):
+    from core import disk_cache, images, views
+
+    cache = disk_cache.DiskLRUCache(tmp_path / "resized", 10 ** 6)
+    decodes = []
+    real_open = images.open_image
+
+    def slow_open(name, storage=None):
+        decodes.append(name)
+        threading.Event().wait(0.05)
+        return real_open(name, storage)
+
+    monkeypatch.setattr(views, "open_image", slow_open)
+    key = views._resize_key(100, 100, "post_images/photo.jpg")
+    files = []
+
+    def request():
+        files.append(views._open_resized(
+            cache, key, "post_images/photo.jpg", 100, 100))
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for file in files:
+        file.close()
+    assert len(files) == 4
+    assert len(decodes) == 1, (
+        "Убедитесь, что параллельные запросы одной копии ждут первый."
+    )
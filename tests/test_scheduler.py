@@ -0,0 +1,60 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def test_post_released_on_save(post_with_published_location, scheduled_post):
+    post_with_published_location.refresh_from_db()
+    scheduled_post.refresh_from_db()
+    assert post_with_published_location.is_released
+    assert not scheduled_post.is_released
+
+
+def test_scheduler_releases_due_posts(
+        client, scheduled_post, django_capture_on_commit_callbacks
+):
+    from blog.models import Post
+
+    url = f"/category/{scheduled_post.category.slug}/"
+    assert len(client.get(url).context["page_obj"]) == 0
+    # Дата публикации наступила, но пост откроет только планировщик.
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    assert client.get(url)["X-Page-Cache"] == "hit"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("release_posts", stdout=StringIO())
+
+    response = client.get(url)
+    assert response["X-Page-Cache"] == "miss", (
+        "Убедитесь, что планировщик сбрасывает кеш страниц с открытыми"
+        " постами."
+    )
+    assert [post.id for post in response.context["page_obj"]] == [
+        scheduled_post.id
+    ]
+    assert client.get(f"/posts/{scheduled_post.id}/").status_code == 200
+
+
+def test_scheduler_skips_future_posts(scheduled_post):
+    from blog.scheduler import next_release_at, release_due_posts
+
+    assert release_due_posts() == 0
+    assert next_release_at() == scheduled_post.pub_date
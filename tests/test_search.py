@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text="", **kwargs):
+        kwargs.setdefault("pub_date", timezone.now() - timedelta(days=1))
+        kwargs.setdefault("is_published", True)
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user,
+            category=published_category, **kwargs)
+
+    return make
+
+
+def _titles(page):
+    return [str(hit.title) for hit in page]
+
+
+def test_search_ranks_and_highlights(make_post):
+    from blog.search import search_posts
+
+    make_post("Прогулка", "Долгая прогулка по городу у реки")
+    make_post("Река", "Про реку")
+    make_post("Горы", "Ничего общего")
+    page = search_posts("река")
+    assert _titles(page) == ["<mark>Река</mark>"], (
+        "Убедитесь, что поиск находит совпадения в заголовке и тексте."
+    )
+    page = search_posts("реки")
+    assert "<mark>реки</mark>" in page[0].snippet
+
+
+def test_search_escapes_text_and_operators(make_post):
+    from blog.search import search_posts
+
+    make_post("Скрипт", "<script>alert(1)</script> тест")
+    page = search_posts('тест" * (')
+    assert len(page) == 1
+    assert "<script>" not in page[0].snippet
+
+
+def test_search_respects_visibility(make_post, mixer):
+    from blog.search import search_posts
+
+    hidden = make_post("Скрытый пост", is_published=False)
+    future = make_post("Будущий пост", pub_date=timezone.now() + timedelta(1))
+    visible = make_post("Видимый пост")
+    assert [hit.pk for hit in search_posts("пост")] == [visible.pk]
+
+    hidden.is_published = True
+    hidden.save()
+    visible.category.is_published = False
+    visible.category.save()
+    assert search_posts("пост").object_list == [], (
+        "Убедитесь, что посты скрытой категории не находятся поиском."
+    )
+    assert future.pk not in [hit.pk for hit in search_posts("будущий")]
+
+
+def test_index_follows_edits_and_deletes(make_post):
+    from blog.search import search_posts
+
+    post = make_post("Старое название")
+    post.title = "Новое название"
+    post.save()
+    assert search_posts("старое").object_list == []
+    assert len(search_posts("новое")) == 1
+    post.delete()
+    assert search_posts("новое").object_list == []
+
+
+def test_search_cursor_pagination(make_post):
+    from blog.search import search_posts
+
+    for number in range(5):
+        make_post(f"Заметка {number}")
+    first = search_posts("заметка", per_page=2)
+    second = search_posts("заметка", after=first.next_cursor, per_page=2)
+    third = search_posts("заметка", after=second.next_cursor, per_page=2)
+    pks = [hit.pk for page in (first, second, third) for hit in page]
+    assert len(set(pks)) == 5
+    assert not third.has_next() and second.has_previous()
+
+
+def test_search_view(client, make_post):
+    make_post("Путешествие на север")
+    response = client.get("/search/", {"q": "север"})
+    assert response.status_code == 200
+    assert "<mark>север</mark>" in response.content.decode()
+    assert client.get("/search/", {"q": "x", "after": "!!"}).status_code == 404
+
+
+def test_rebuild_search_index(make_post):
+    from blog.models import Post
+    from blog.search import search_posts
+
+    post = make_post("Заголовок")
+    Post.objects.filter(pk=post.pk).update(title="Переименовано")
+    assert search_posts("переименовано").object_list == []
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert len(search_posts("переименовано")) == 1
@@ -0,0 +1,44 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_seed_bulk_creates_consistent_data():
+    from blog.models import Comment, Post
+
+    call_command(
+        "seed_bulk", posts=300, comments=1000, chunk_size=128,
+        stdout=StringIO(),
+    )
+    assert Post.objects.count() == 300
+    assert Comment.objects.count() == 1000
+    assert Post.objects.visible().exists(), (
+        "Убедитесь, что среди сгенерированных постов есть видимые."
+    )
+    call_command("rebuild_comment_counts", "--check", stdout=StringIO())
+
+
+def test_seed_bulk_appends_to_existing_data(post_with_published_location):
+    from blog.models import Post
+
+    call_command("seed_bulk", posts=20, comments=0, stdout=StringIO())
+    call_command("seed_bulk", posts=20, comments=0, stdout=StringIO())
+    assert Post.objects.count() == 41
+
+
+def test_seed_bulk_indexes_posts_for_search():
+    from blog.models import Post, SuggestionChange
+    from blog.search import search_posts
+
+    call_command("seed_bulk", posts=50, comments=0, stdout=StringIO())
+    post = Post.objects.visible().first()
+    hits = search_posts(post.title.split()[0], per_page=50)
+    assert post.pk in [hit.pk for hit in hits], (
+        "Убедитесь, что seed_bulk заполняет индекс поиска."
+    )
+    assert SuggestionChange.objects.filter(kind="").exists(), (
+        "Убедитесь, что seed_bulk сбрасывает подсказки."
+    )
@@ -0,0 +1,54 @@
+import json
+import logging
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _timings(response):
+    result = {}
+    for part in response["Server-Timing"].split(", "):
+        name, duration, *_ = part.split(";")
+        result[name] = float(duration.split("=")[1])
+    return result
+
+
+def test_server_timing_header(client, settings, post_with_published_location):
+    settings.SERVER_TIMING_HEADER = True
+    timings = _timings(client.get("/"))
+    assert {"db", "view", "tpl", "total"} <= set(timings), (
+        "Убедитесь, что заголовок Server-Timing содержит время БД,"
+        " представления, шаблона и общее время запроса."
+    )
+    assert timings["total"] >= timings["view"]
+
+
+def test_header_hidden_from_visitors(client, admin_client):
+    assert "Server-Timing" not in client.get("/pages/about/"), (
+        "Убедитесь, что по умолчанию заголовок Server-Timing не отдаётся"
+        " посетителям."
+    )
+    assert "Server-Timing" in admin_client.get("/pages/about/"), (
+        "Убедитесь, что сотрудники видят заголовок Server-Timing."
+    )
+
+
+def test_request_is_logged(client, caplog):
+    with caplog.at_level(logging.INFO, logger="core.timing"):
+        client.get("/pages/about/")
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == "/pages/about/"
+    assert record["status"] == 200
+
+
+def test_slow_request_dumps_sql(client, settings, caplog,
+                                post_with_published_location):
+    settings.SERVER_TIMING_SLOW_MS = 0
+    with caplog.at_level(logging.INFO, logger="core.timing"):
+        client.get("/")
+    record = caplog.records[-1]
+    assert record.levelno == logging.WARNING
+    assert any(
+        "blog_post" in sql for _, sql in json.loads(record.getMessage())["sql"]
+    ), "Убедитесь, что для медленных запросов в лог выводится их SQL."
@@ -0,0 +1,103 @@
+import gzip
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.SITEMAP_PAGE_SIZE = 2
+    return tmp_path
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    now = timezone.now()
+    visible = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now - timedelta(days=1))
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, pub_date=now - timedelta(days=1))
+    return visible
+
+
+def _content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+def test_dynamic_sitemap_pages(client, posts):
+    index = client.get("/sitemap.xml").content.decode()
+    assert "/sitemap-posts-" in index and "/sitemap-profiles-" in index
+    urls = []
+    for post in posts:
+        page = post.pk // 2
+        response = client.get(f"/sitemap-posts-{page}.xml")
+        assert response.streaming, (
+            "Убедитесь, что страница карты сайта отдаётся потоком."
+        )
+        urls.append(_content(response))
+    for post in posts:
+        assert any(f"/posts/{post.pk}/</loc>" in page for page in urls)
+    assert client.get("/sitemap-unknown-0.xml").status_code == 404
+
+
+def test_hidden_posts_not_listed(client, posts):
+    from blog.models import Post
+
+    hidden = Post.objects.get(is_published=False)
+    page = _content(client.get(f"/sitemap-posts-{hidden.pk // 2}.xml"))
+    assert f"/posts/{hidden.pk}/</loc>" not in page
+
+
+def test_build_sitemaps_incrementally(client, posts, media_root):
+    call_command("build_sitemaps", base_url="https://example.com",
+                 stdout=StringIO())
+    root = media_root / "sitemaps"
+    index = client.get("/sitemap.xml")
+    content = b"".join(index.streaming_content).decode()
+    assert "https://example.com/media/sitemaps/sitemap-posts-" in content
+    page = root / f"sitemap-posts-{posts[0].pk // 2}.xml.gz"
+    with gzip.open(page, "rt") as file:
+        assert f"https://example.com/posts/{posts[0].pk}/" in file.read()
+
+    untouched = root / f"sitemap-posts-{posts[-1].pk // 2}.xml.gz"
+    before = untouched.stat().st_mtime_ns
+    deleted = posts[0].pk
+    posts[0].delete()
+    call_command("build_sitemaps", base_url="https://example.com",
+                 stdout=StringIO())
+    if page.exists():
+        with gzip.open(page, "rt") as file:
+            assert f"/posts/{deleted}/" not in file.read()
+    if posts[-1].pk // 2 != deleted // 2:
+        assert untouched.stat().st_mtime_ns == before, (
+            "Убедитесь, что неизменные страницы не перезаписываются."
+        )
+
+
+def test_build_sitemaps_follows_renamed_category(
+        posts, published_category, media_root
+):
+    call_command("build_sitemaps", base_url="https://example.com",
+                 stdout=StringIO())
+    old_slug = published_category.slug
+    published_category.slug = "renamed-category"
+    published_category.save()
+    call_command("build_sitemaps", base_url="https://example.com",
+                 stdout=StringIO())
+    page = (media_root / "sitemaps"
+            / f"sitemap-categories-{published_category.pk // 2}.xml.gz")
+    with gzip.open(page, "rt") as file:
+        content = file.read()
+    assert "/category/renamed-category/" in content, (
+        "Убедитесь, что смена slug категории перестраивает страницу"
+        " карты сайта без --full."
+    )
+    assert f"/category/{old_slug}/" not in content
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="Настройки соединения SQLite"
+    ),
+]
+
+
+def _pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_new_connection_is_tuned(settings, tmp_path):
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="pragma_test",
+    )
+    try:
+        assert _pragma(wrapper, "journal_mode") == "wal"
+        assert _pragma(wrapper, "synchronous") == 1
+        assert _pragma(wrapper, "busy_timeout") == 5000
+        assert _pragma(wrapper, "cache_size") == -64000
+        assert _pragma(wrapper, "temp_store") == 2
+    finally:
+        wrapper.close()
+
+
+def test_pragmas_are_configurable(settings, tmp_path):
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+
+    settings.SQLITE_PRAGMAS = {"busy_timeout": 1234}
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="pragma_test",
+    )
+    try:
+        assert _pragma(wrapper, "busy_timeout") == 1234
+        assert _pragma(wrapper, "journal_mode") == "delete"
+    finally:
+        wrapper.close()
+
+
+def test_invalid_pragma_name_rejected(settings):
+    from core.db import configure_sqlite
+
+    settings.SQLITE_PRAGMAS = {"busy_timeout; DROP TABLE blog_post": 1}
+    with pytest.raises(ValueError):
+        configure_sqlite(sender=None, connection=connection)
+
+
+def test_writer_commits_during_open_read(tmp_path):
+    from django.db.backends.sqlite3.base import DatabaseWrapper
+
+    def open_wrapper(alias):
+        return DatabaseWrapper(
+            {**connection.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+            alias=alias,
+        )
+
+    writer, reader = open_wrapper("writer"), open_wrapper("reader")
+    try:
+        with writer.cursor() as cursor:
+            cursor.execute("CREATE TABLE note (text TEXT)")
+            cursor.execute("INSERT INTO note VALUES ('first')")
+        reader_cursor = reader.cursor()
+        reader_cursor.execute("BEGIN")
+        with reader.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM note")
+            assert cursor.fetchone() == (1,)
+        # Без WAL фиксация ждала бы конца чтения и падала по таймауту.
+        with writer.cursor() as cursor:
+            cursor.execute("INSERT INTO note VALUES ('second')")
+        with reader.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM note")
+            assert cursor.fetchone() == (1,), (
+                "Читатель видит согласованный снимок до конца транзакции."
+            )
+        reader_cursor.execute("ROLLBACK")
+    finally:
+        writer.close()
+        reader.close()
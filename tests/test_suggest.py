@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(settings):
+    from blog.suggest import suggestions
+
+    settings.SUGGEST_REFRESH_SECONDS = 0
+    suggestions._seen = None
+    suggestions.background = False
+    yield
+    suggestions.background = True
+
+
+def _labels(client, query):
+    response = client.get("/search/suggest/", {"q": query})
+    assert response.status_code == 200
+    return [
+        (item["type"], item["label"]) for item in response.json()["results"]
+    ]
+
+
+def test_prefix_index_search_and_remove():
+    from blog.suggest import PrefixIndex
+
+    index = PrefixIndex()
+    index.load([("post", 1, "Прогулка по Городу"), ("post", 2, "Город")])
+    assert [item[1] for item in index.search("гор", 10)] == [2, 1]
+    assert [item[1] for item in index.search("прог", 10)] == [1]
+    index.add("post", 3, "Горный путь")
+    index.remove("post", 2)
+    assert [item[1] for item in index.search("гор", 10)] == [3, 1]
+    assert len(index) == 2
+
+
+def test_suggest_posts_categories_users(
+        client, mixer, user, published_category
+):
+    published_category.title = "Путешествия"
+    published_category.save()
+    mixer.blend(
+        "blog.Post", title="Путь домой", author=user, is_published=True,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1))
+    mixer.blend(
+        "blog.Post", title="Путь в будущее", author=user, is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(days=1))
+    assert sorted(_labels(client, "пу")) == [
+        ("category", "Путешествия"), ("post", "Путь домой")], (
+        "Убедитесь, что подсказки содержат только видимые посты."
+    )
+    assert ("user", user.username) in _labels(client, user.username[:3])
+    assert _labels(client, "") == []
+
+
+def test_suggest_updates_on_signals(
+        client, mixer, user, published_category,
+        django_capture_on_commit_callbacks
+):
+    assert _labels(client, "мост") == []
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            "blog.Post", title="Мост", author=user, is_published=True,
+            category=published_category,
+            pub_date=timezone.now() - timedelta(days=1))
+    assert _labels(client, "мост") == [("post", "Мост")]
+    with CaptureQueriesContext(connection) as queries:
+        assert _labels(client, "мост") == [("post", "Мост")]
+    assert not any(
+        "blog_post" in query["sql"] for query in queries.captured_queries
+    ), "Убедитесь, что подсказки не обращаются к базе на каждый запрос."
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = "Тоннель"
+        post.save()
+    assert _labels(client, "мост") == []
+    assert _labels(client, "тон") == [("post", "Тоннель")]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.is_published = False
+        published_category.save()
+    assert _labels(client, "тон") == []
+
+
+def test_change_updates_only_changed_post(
+        client, mixer, user, published_category, monkeypatch,
+        django_capture_on_commit_callbacks
+):
+    from blog.suggest import Suggestions
+
+    post = mixer.blend(
+        "blog.Post", title="Маяк", author=user, is_published=True,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1))
+    assert _labels(client, "мая") == [("post", "Маяк")]
+
+    def build():
+        raise AssertionError("Индекс перестроен целиком.")
+
+    monkeypatch.setattr(Suggestions, "_build", staticmethod(build))
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = "Пристань"
+        post.save()
+    assert _labels(client, "при") == [("post", "Пристань")], (
+        "Убедитесь, что изменение поста обновляет в индексе только его."
+    )
+    assert _labels(client, "мая") == []
+
+
+def test_reset_rebuilds_index_from_journal(client, mixer, user, settings):
+    from blog.models import SuggestionChange
+    from blog.suggest import suggestions
+
+    settings.SUGGEST_MAX_CHANGES = 2
+    settings.SUGGEST_JOURNAL_WINDOW = 1
+    assert _labels(client, "вок") == []
+    mixer.blend(
+        "blog.Post", title="Вокзал", author=user, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    suggestions.invalidate()
+    assert _labels(client, "вок") == [("post", "Вокзал")], (
+        "Убедитесь, что полный сброс перестраивает индекс."
+    )
+    suggestions.update_posts([1, 2, 3, 4, 5])
+    assert SuggestionChange.objects.count() <= 2 * 2 + 1, (
+        "Убедитесь, что старые записи журнала подсказок удаляются."
+    )
+
+
+def test_late_committed_change_is_applied(
+        client, mixer, user, published_category
+):
+    from blog.models import SuggestionChange
+    from blog.suggest import POST, suggestions
+
+    assert _labels(client, "при") == []
+    post = mixer.blend(
+        "blog.Post", title="Причал", author=user, is_published=True,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(days=1))
+    suggestions.update_post(post.pk)
+    suggestions.update_post(post.pk + 1000)
+    # Запись с меньшим id ещё не зафиксирована, когда процесс читает
+    # журнал: так бывает на PostgreSQL.
+    late_pk = SuggestionChange.objects.order_by("pk").first().pk
+    SuggestionChange.objects.filter(pk=late_pk).delete()
+    assert _labels(client, "при") == []
+    SuggestionChange.objects.create(pk=late_pk, kind=POST, ident=post.pk)
+    assert _labels(client, "при") == [("post", "Причал")], (
+        "Убедитесь, что записи журнала, зафиксированные позже записей"
+        " с большими id, не теряются."
+    )
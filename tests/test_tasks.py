@@ -0,0 +1,154 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@pytest.fixture(autouse=True)
+def registered_tasks():
+    from core.tasks import _registry, task
+
+    @task("test.record")
+    def record(value):
+        calls.append(value)
+
+    @task("test.fail")
+    def fail():
+        raise RuntimeError("сбой задачи")
+
+    calls.clear()
+    yield
+    _registry.pop("test.record")
+    _registry.pop("test.fail")
+
+
+def test_job_is_run_and_timed():
+    from core.models import Job
+    from core.tasks import enqueue, run_pending
+
+    job = enqueue("test.record", {"value": 1})
+    assert run_pending() == 1
+    assert calls == [1]
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.attempts == 1
+    assert job.duration_ms is not None and job.wait_ms is not None
+    assert job.finished_at is not None
+
+
+def test_priority_and_delay_order():
+    from core.tasks import enqueue, run_pending
+
+    enqueue("test.record", {"value": "low"})
+    enqueue("test.record", {"value": "high"}, priority=10)
+    enqueue("test.record", {"value": "later"}, delay=timedelta(hours=1))
+    assert run_pending() == 2
+    assert calls == ["high", "low"], (
+        "Убедитесь, что задачи выполняются по приоритету,"
+        " а отложенные ждут своего времени."
+    )
+
+
+def test_failed_job_is_retried_then_failed():
+    from core.models import Job
+    from core.tasks import enqueue, run_pending
+
+    job = enqueue("test.fail", max_attempts=2)
+    run_pending()
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert "сбой задачи" in job.last_error
+    assert job.run_after > timezone.now(), (
+        "Убедитесь, что повтор задачи откладывается."
+    )
+
+    Job.objects.update(run_after=timezone.now())
+    run_pending()
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+
+
+def test_expired_lease_is_reclaimed():
+    from core.models import Job
+    from core.tasks import claim_job, enqueue
+
+    job = enqueue("test.record", {"value": 1})
+    assert claim_job("first").pk == job.pk
+    assert claim_job("second") is None, (
+        "Убедитесь, что задачу не может забрать второй обработчик."
+    )
+
+    Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+    reclaimed = claim_job("second")
+    assert reclaimed.pk == job.pk
+    assert reclaimed.locked_by == "second"
+    assert reclaimed.attempts == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_workers_burst():
+    from core.models import Job
+    from core.tasks import enqueue
+
+    for value in range(5):
+        enqueue("test.record", {"value": value})
+    out = StringIO()
+    call_command(
+        "run_workers", "--burst", "--concurrency", "2", stdout=out)
+    assert sorted(calls) == list(range(5))
+    assert not Job.objects.exclude(status=Job.DONE).exists()
+    assert "Выполнено задач: 5" in out.getvalue()
+
+
+def test_reclaim_counts_as_attempt():
+    from core.models import Job
+    from core.tasks import claim_job, enqueue
+
+    job = enqueue("test.record", {"value": 1}, max_attempts=1)
+    assert claim_job("first").pk == job.pk
+    Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+    assert claim_job("second") is None, (
+        "Убедитесь, что задача с истёкшей арендой и исчерпанными попытками"
+        " не выполняется снова."
+    )
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert calls == []
+
+
+def test_stale_worker_does_not_overwrite_result():
+    from core.models import Job
+    from core.tasks import claim_job, enqueue, run_job
+
+    enqueue("test.record", {"value": 1})
+    stale = claim_job("first")
+    Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+    claim_job("second")
+    run_job(stale)
+    job = Job.objects.get()
+    assert job.status == Job.RUNNING and job.locked_by == "second", (
+        "Убедитесь, что обработчик, потерявший аренду, не записывает"
+        " результат задачи."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_heartbeat_extends_lease():
+    from core.models import Job
+    from core.tasks import Heartbeat, claim_job, enqueue
+
+    enqueue("test.record", {"value": 1})
+    job = claim_job("worker", lease_seconds=0.3)
+    with Heartbeat(job, lease_seconds=0.3):
+        time.sleep(0.5)
+    assert Job.objects.get().locked_until > job.locked_until, (
+        "Убедитесь, что аренда выполняемой задачи продлевается."
+    )
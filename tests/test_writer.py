@@ -0,0 +1,157 @@
+import threading
+
+import pytest
+from django.db import IntegrityError
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def writer():
+    from core.writer import DatabaseWriter
+
+    return DatabaseWriter(batch_size=50, timeout=10)
+
+
+def _create_location(name):
+    from blog.models import Location
+
+    return Location.objects.create(name=name).pk
+
+
+def test_concurrent_writes_are_batched(writer):
+    from blog.models import Location
+
+    pks = []
+    lock = threading.Lock()
+
+    def post_many(thread):
+        for number in range(10):
+            pk = writer.run(_create_location, f"{thread}-{number}")
+            with lock:
+                pks.append(pk)
+
+    threads = [
+        threading.Thread(target=post_many, args=(n,)) for n in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(pks)) == 80, "Убедитесь, что ни одна запись не потеряна."
+    assert Location.objects.count() == 80
+    assert writer.batches <= 80
+
+
+def test_failed_write_does_not_abort_batch(writer):
+    from blog.models import Category
+
+    release = threading.Event()
+    first = writer.submit(release.wait)
+    while not first.running():
+        threading.Event().wait(0.01)
+    good = writer.submit(_create_location, "ok")
+
+    def duplicate():
+        Category.objects.create(title="a", slug="dup", description="d")
+        Category.objects.create(title="b", slug="dup", description="d")
+
+    bad = writer.submit(duplicate)
+    after = writer.submit(_create_location, "also ok")
+    release.set()
+
+    assert first.result(10) is True
+    assert good.result(10) and after.result(10)
+    with pytest.raises(IntegrityError):
+        bad.result(10)
+    assert not Category.objects.exists(), (
+        "Убедитесь, что неудачная запись откатывается целиком."
+    )
+    assert writer.batches == 2
+
+
+def test_comment_view_uses_writer(client, django_user_model, mixer):
+    from blog.models import Comment
+
+    user = django_user_model.objects.create_user("writer", password="pass")
+    post = mixer.blend(
+        "blog.Post",
+        is_published=True,
+        category__is_published=True,
+        location=None,
+    )
+    client.force_login(user)
+    response = client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Комментарий"})
+    assert response.status_code == 302
+    comment = Comment.objects.get()
+    assert comment.author == user and comment.post == post
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_writer_begins_immediate_transactions(writer):
+    from django.db import connection
+
+    assert writer.run(lambda: connection.transaction_mode) == "IMMEDIATE"
+    assert connection.transaction_mode is None, (
+        "Убедитесь, что режим BEGIN IMMEDIATE включается только в потоке"
+        " записи."
+    )
+
+
+def test_timed_out_write_is_cancelled():
+    from blog.models import Location
+    from core.writer import DatabaseWriter, WriteTimeout
+
+    writer = DatabaseWriter(batch_size=1, timeout=0.1)
+    release = threading.Event()
+    blocker = writer.submit(release.wait)
+    with pytest.raises(WriteTimeout) as error:
+        writer.run(_create_location, "late")
+    assert not error.value.started
+    release.set()
+    assert blocker.result(10) is True
+    writer.run(lambda: None)
+    assert not Location.objects.filter(name="late").exists(), (
+        "Убедитесь, что запись, не дождавшаяся очереди, отменяется."
+    )
+
+
+def test_comment_edit_and_delete_use_writer(
+        client, django_user_model, mixer, monkeypatch
+):
+    from blog.models import Comment
+    from core import writer
+
+    calls = []
+    run = writer._writer.run
+
+    def counting_run(func, *args, **kwargs):
+        calls.append(func)
+        return run(func, *args, **kwargs)
+
+    monkeypatch.setattr(writer._writer, "run", counting_run)
+    user = django_user_model.objects.create_user("editor", password="pass")
+    post = mixer.blend(
+        "blog.Post",
+        is_published=True,
+        category__is_published=True,
+        location=None,
+    )
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    client.force_login(user)
+    client.post(
+        f"/posts/{post.id}/edit_comment/{comment.id}/",
+        data={"text": "Исправлено"},
+    )
+    assert Comment.objects.get().text == "Исправлено"
+    response = client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert response.status_code == 302
+    assert not Comment.objects.exists()
+    assert len(calls) == 2, (
+        "Убедитесь, что правка и удаление комментария идут через поток"
+        " записи."
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 0